@@ -0,0 +1,96 @@
+import math
+import random
+
+import numpy as np
+from ngio import PixelSize
+
+from ome_zarr_converters_tools._tile import Point, Tile, Vector
+
+LAYOUTS = ["grid", "free", "jitter", "sparse"]
+TILE_SHAPE = (1, 1, 1, 2048, 2048)
+PIXEL_SIZE_XY = 0.325
+
+
+class DummyLoader:
+    def __init__(self, shape):
+        self.shape = shape
+
+    def load(self):
+        return np.zeros(self.shape, dtype="uint8")
+
+    @property
+    def dtype(self):
+        return "uint8"
+
+
+def _grid_shape(num_tiles: int) -> tuple[int, int]:
+    """Return an (almost) square grid with num_tiles positions."""
+    grid_size_x = max(1, round(math.sqrt(num_tiles)))
+    grid_size_y = max(1, math.ceil(num_tiles / grid_size_x))
+    return grid_size_x, grid_size_y
+
+
+def generate_layout(
+    layout: str,
+    num_tiles: int,
+    overlap: float = 0.9,
+    invert_x: bool = False,
+    invert_y: bool = False,
+    swap_xy: bool = False,
+    seed: int = 0,
+) -> list[Tile]:
+    """Generate the tiles of a synthetic acquisition.
+
+    - grid: a regular grid with overlapping tiles.
+    - free: tiles at random positions (about one tile per grid position).
+    - jitter: a regular grid with +- 300 nm of stage jitter.
+    - sparse: a regular grid with a missing column and 10% missing tiles.
+
+    As for the `tests/utils.py` generators, invert_x, invert_y and swap_xy
+    generate the positions of a microscope with the given axes conventions, so
+    the stitching pipe must be run with the same options.
+    """
+    rng = random.Random(seed)
+    length_x = TILE_SHAPE[4] * PIXEL_SIZE_XY
+    length_y = TILE_SHAPE[3] * PIXEL_SIZE_XY
+    if swap_xy:
+        length_x, length_y = length_y, length_x
+
+    grid_size_x, grid_size_y = _grid_shape(num_tiles)
+    if layout == "sparse":
+        # Add room for the missing positions
+        grid_size_y = max(1, math.ceil(num_tiles / (0.9 * max(grid_size_x - 1, 1))))
+
+    positions = []
+    for i in range(grid_size_x):
+        for j in range(grid_size_y):
+            x = i * overlap * length_x
+            y = j * overlap * length_y
+            if layout == "free":
+                x = rng.uniform(0, grid_size_x * overlap * length_x)
+                y = rng.uniform(0, grid_size_y * overlap * length_y)
+            elif layout == "jitter":
+                x += rng.uniform(-0.3, 0.3)
+                y += rng.uniform(-0.3, 0.3)
+            elif layout == "sparse" and (i == 1 or rng.random() < 0.1):
+                continue
+            positions.append((round(x, 3), round(y, 3)))
+    positions = positions[:num_tiles]
+
+    tiles = []
+    for x, y in positions:
+        if invert_x:
+            x = -x
+        if invert_y:
+            y = -y
+        if swap_xy:
+            x, y = y, x
+        tiles.append(
+            Tile(
+                top_l=Point(x=x, y=y),
+                diag=Vector(x=length_x, y=length_y, z=1, t=1, c=1),
+                pixel_size=PixelSize(x=PIXEL_SIZE_XY, y=PIXEL_SIZE_XY, z=1),
+                data_loader=DummyLoader(TILE_SHAPE),
+            )
+        )
+    return tiles
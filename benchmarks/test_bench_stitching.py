@@ -0,0 +1,136 @@
+"""Benchmarks of the stitching pipe, one benchmark per stage of the pipe.
+
+Run them with `pytest benchmarks`, see `benchmarks/README.md` for how to
+store a baseline and fail on regressions.
+"""
+
+import os
+
+import pytest
+from layouts import LAYOUTS, generate_layout
+
+from ome_zarr_converters_tools._grid_utils import check_if_regular_grid
+from ome_zarr_converters_tools._stitching import (
+    _normalize_tiles,
+    check_tiles_coplanar,
+    remove_pixel_gaps,
+    resolve_tiles_overlap,
+    standard_stitching_pipe,
+    tiles_to_pixel_space,
+)
+from ome_zarr_converters_tools._tile_collection import TileCollection
+
+MAX_TILES = int(os.getenv("BENCHMARK_MAX_TILES", 20_000))
+NUM_TILES = [n for n in (4, 100, 2_500, 20_000) if n <= MAX_TILES]
+# The free mode resolution is iterative, the largest layouts take minutes
+MAX_FREE_TILES = min(1_000, MAX_TILES)
+
+VARIANTS = {
+    "plain": {},
+    "swap_xy": {"swap_xy": True},
+    "invert_xy": {"invert_x": True, "invert_y": True},
+}
+
+STAGES = [
+    "from_tiles",
+    "normalize",
+    "grid_detection",
+    "resolve",
+    "to_pixel_space",
+    "remove_pixel_gaps",
+    "pipe",
+]
+
+
+def _cases():
+    for layout in LAYOUTS:
+        for num_tiles in NUM_TILES:
+            if layout == "free" and num_tiles > MAX_FREE_TILES:
+                continue
+            for variant in VARIANTS:
+                # The variants only change the first stages, keep them small
+                if variant != "plain" and num_tiles > 2_500:
+                    continue
+                yield pytest.param(
+                    layout, num_tiles, variant, id=f"{layout}-{num_tiles}-{variant}"
+                )
+
+
+@pytest.fixture(scope="module")
+def stage_inputs():
+    """Compute (once) the input of every stage for a layout."""
+    cache = {}
+
+    def _get(layout: str, num_tiles: int, variant: str) -> dict:
+        key = (layout, num_tiles, variant)
+        if key in cache:
+            return cache[key]
+
+        options = VARIANTS[variant]
+        mode = "free" if layout == "free" else "grid"
+        tiles = generate_layout(layout, num_tiles, **options)
+        collection = TileCollection.from_tiles(tiles)
+        normalized = _normalize_tiles(collection, **options)
+        resolved, _ = resolve_tiles_overlap(normalized, mode=mode)
+        inputs = {
+            "mode": mode,
+            "options": options,
+            "tiles": tiles,
+            "collection": collection,
+            "normalized": normalized,
+            "resolved": resolved,
+            "pixel": tiles_to_pixel_space(resolved),
+        }
+        cache[key] = inputs
+        return inputs
+
+    return _get
+
+
+def _stage_function(stage: str, inputs: dict):
+    """Return the function running one stage of the pipe and its arguments."""
+    mode, options = inputs["mode"], inputs["options"]
+    match stage:
+        case "from_tiles":
+            return TileCollection.from_tiles, (inputs["tiles"],)
+        case "normalize":
+
+            def _normalize(collection):
+                check_tiles_coplanar(collection)
+                return _normalize_tiles(collection, **options)
+
+            return _normalize, (inputs["collection"],)
+        case "grid_detection":
+            return check_if_regular_grid, (inputs["normalized"],)
+        case "resolve":
+            return (
+                lambda tiles: resolve_tiles_overlap(tiles, mode=mode),
+                (inputs["normalized"],),
+            )
+        case "to_pixel_space":
+            return tiles_to_pixel_space, (inputs["resolved"],)
+        case "remove_pixel_gaps":
+            return remove_pixel_gaps, (inputs["pixel"],)
+        case "pipe":
+            return (
+                lambda tiles: standard_stitching_pipe(tiles, mode=mode, **options),
+                (inputs["tiles"],),
+            )
+    raise ValueError(f"Unknown stage {stage}")
+
+
+@pytest.mark.parametrize("stage", STAGES)
+@pytest.mark.parametrize("layout, num_tiles, variant", list(_cases()))
+def test_stitching_stage(benchmark, stage_inputs, stage, layout, num_tiles, variant):
+    inputs = stage_inputs(layout, num_tiles, variant)
+    if stage == "remove_pixel_gaps" and inputs["mode"] != "grid":
+        pytest.skip("The pixel gaps are only removed in grid mode.")
+
+    func, args = _stage_function(stage, inputs)
+    benchmark.group = f"{stage}-{layout}"
+    benchmark.extra_info.update(
+        {"stage": stage, "layout": layout, "num_tiles": num_tiles, "variant": variant}
+    )
+    # Large inputs take seconds, a few rounds are enough
+    rounds = max(1, min(20, 2_000 // num_tiles))
+    benchmark.pedantic(func, args=args, rounds=rounds, warmup_rounds=1)
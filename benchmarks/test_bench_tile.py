@@ -0,0 +1,43 @@
+"""Micro benchmarks of the tile geometry."""
+
+from ngio import PixelSize
+
+from ome_zarr_converters_tools._tile import Point, Tile, Vector
+
+
+def _tile() -> Tile:
+    return Tile(
+        top_l=Point(1234.567, 89.25),
+        diag=Vector(665.6, 665.6, 1, 1, 1),
+        pixel_size=PixelSize(x=0.325, y=0.325, z=1),
+        shape=(1, 1, 1, 2048, 2048),
+    )
+
+
+def test_point_plus_vector(benchmark):
+    point, vector = Point(1234.567, 89.25), Vector(665.6, 665.6, 1.0, 1, 1)
+    benchmark(lambda: point + vector)
+
+
+def test_point_minus_point(benchmark):
+    point_a, point_b = Point(1234.567, 89.25), Point(-0.125, 1e-3)
+    benchmark(lambda: point_a - point_b)
+
+
+def test_tile_init(benchmark):
+    benchmark(_tile)
+
+
+def test_tile_move_by(benchmark):
+    tile, vector = _tile(), Vector(-1234.567, 10.5)
+    benchmark(tile.move_by, vector)
+
+
+def test_tile_to_pixel_space(benchmark):
+    benchmark(_tile().to_pixel_space)
+
+
+def test_tile_overlap(benchmark):
+    tile = _tile()
+    other = tile.move_by(Vector(600.0, 10.0))
+    benchmark(tile.is_overlappingXY, other)
@@ -11,6 +11,7 @@ from ome_zarr_converters_tools._task_common_models import (
 from ome_zarr_converters_tools._task_compute_tools import generic_compute_task
 from ome_zarr_converters_tools._task_init_tools import build_parallelization_list
 from ome_zarr_converters_tools._tile import OriginDict, Point, Tile, Vector
+from ome_zarr_converters_tools._tile_collection import TileCollection
 from ome_zarr_converters_tools._tiled_image import (
     PathBuilder,
     PlatePathBuilder,
@@ -34,6 +35,7 @@ __all__ = [
     "Point",
     "SimplePathBuilder",
     "Tile",
+    "TileCollection",
     "TiledImage",
     "Vector",
     "build_parallelization_list",
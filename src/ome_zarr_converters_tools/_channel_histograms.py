@@ -0,0 +1,147 @@
+"""Histograms of the channels of an image, accumulated while it is written."""
+
+import math
+import threading
+
+import numpy as np
+
+# The number of bins of the adaptive histograms
+_NUM_ADAPTIVE_BINS = 4096
+
+
+class ChannelHistogram:
+    """The histogram of the positive values of a channel.
+
+    As in `Image.set_channel_percentiles` the zeros (the background of the
+    image) are not counted. Integer dtypes of up to 16 bits use one fixed bin
+    per value, so the percentiles are exact. Other dtypes (floats and larger
+    integers) use a fixed number of bins of equal width, a power of two: the
+    bins cover the values seen so far, and are merged two by two when a value
+    falls outside of them. The percentiles are then exact up to a bin width.
+
+    The values can be added from several threads.
+    """
+
+    def __init__(self, dtype: str | np.dtype, num_bins: int = _NUM_ADAPTIVE_BINS):
+        """Initialize an empty histogram.
+
+        Args:
+            dtype (str | np.dtype): The dtype of the channel.
+            num_bins (int): The number of bins of the adaptive histogram, not
+                used for the integer dtypes of up to 16 bits.
+        """
+        dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._fixed = dtype.kind in "ui" and dtype.itemsize <= 2
+        if self._fixed:
+            info = np.iinfo(dtype)
+            self._offset = -int(info.min)
+            self._counts = np.zeros(int(info.max) + self._offset + 1, dtype=np.int64)
+        else:
+            self._num_bins = num_bins
+            self._counts = np.zeros(num_bins, dtype=np.int64)
+            # Bin k covers [(first + k) * width, (first + k + 1) * width)
+            self._width = 0.0
+            self._first = 0
+            self._min = math.inf
+            self._max = -math.inf
+
+    def add(self, data: np.ndarray) -> None:
+        """Count the values of an array."""
+        if self._fixed:
+            values = data.ravel()
+            if self._offset:
+                values = values.astype(np.int64) + self._offset
+            counts = np.bincount(values, minlength=len(self._counts))
+            with self._lock:
+                self._counts += counts
+            return None
+
+        values = data[(data > 1e-16) & np.isfinite(data)].astype(np.float64)
+        if values.size == 0:
+            return None
+        with self._lock:
+            self._add_values(values)
+
+    def _add_values(self, values: np.ndarray) -> None:
+        """Count positive values in the adaptive bins."""
+        low, high = float(values.min()), float(values.max())
+        self._min, self._max = min(self._min, low), max(self._max, high)
+        if self._width == 0.0:
+            span = max(high - low, high * 2**-20)
+            self._width = 2.0 ** math.ceil(math.log2(span / self._num_bins))
+            self._first = math.floor(low / self._width)
+        self._fit(self._min, self._max)
+        indices = np.floor(values / self._width).astype(np.int64) - self._first
+        self._counts += np.bincount(indices, minlength=self._num_bins)
+
+    def _fit(self, low: float, high: float) -> None:
+        """Move and merge the bins until they cover [low, high]."""
+        while True:
+            first = math.floor(low / self._width)
+            last = math.floor(high / self._width)
+            if last - first < self._num_bins:
+                break
+            # Merge the bins two by two
+            indices = (self._first + np.arange(self._num_bins)) // 2
+            self._first //= 2
+            merged = np.zeros_like(self._counts)
+            np.add.at(merged, indices - self._first, self._counts)
+            self._counts = merged
+            self._width *= 2
+
+        shift = first - self._first
+        if shift != 0:
+            counts = np.zeros_like(self._counts)
+            if shift > 0:
+                counts[: self._num_bins - shift] = self._counts[shift:]
+            else:
+                counts[-shift:] = self._counts[: self._num_bins + shift]
+            self._counts = counts
+            self._first = first
+
+    def percentile(self, q: float) -> float:
+        """Return a percentile of the values, with the "nearest" method.
+
+        Returns 0 if no value was counted.
+        """
+        counts = self._counts[self._offset + 1 :] if self._fixed else self._counts
+        total = int(counts.sum())
+        if total == 0:
+            return 0.0
+        rank = int(np.around((total - 1) * q / 100))
+        index = int(np.searchsorted(np.cumsum(counts), rank, side="right"))
+        if self._fixed:
+            return float(index + 1)
+        if rank == 0:
+            return self._min
+        if rank == total - 1:
+            return self._max
+        center = (self._first + index + 0.5) * self._width
+        return min(max(center, self._min), self._max)
+
+
+class ChannelHistograms:
+    """The histograms of the channels of an image, built from its chunks."""
+
+    def __init__(self, num_channels: int, dtype: str | np.dtype):
+        """Initialize the empty histograms."""
+        self._histograms = [ChannelHistogram(dtype) for _ in range(num_channels)]
+
+    def add(self, first_channel: int, data: np.ndarray) -> None:
+        """Count the values of a (t, c, z, y, x) chunk of the image.
+
+        Args:
+            first_channel (int): The index of the first channel of the chunk.
+            data (np.ndarray): The data of the chunk.
+        """
+        for c in range(data.shape[1]):
+            self._histograms[first_channel + c].add(data[:, c])
+
+    def percentiles(
+        self, start_percentile: float, end_percentile: float
+    ) -> tuple[list[float], list[float]]:
+        """Return the start and end percentiles of each channel."""
+        starts = [h.percentile(start_percentile) for h in self._histograms]
+        ends = [h.percentile(end_percentile) for h in self._histograms]
+        return starts, ends
@@ -0,0 +1,180 @@
+"""Compression codecs of the written images, and a benchmark to choose them."""
+
+import argparse
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+from numcodecs import Blosc, Zstd
+from numcodecs.abc import Codec
+
+from ome_zarr_converters_tools._pkl_utils import load_tiled_image
+from ome_zarr_converters_tools._tiled_image import TiledImage
+
+CompressionCodec = Literal["default", "blosc-lz4", "blosc-zstd", "zstd", "none"]
+ShuffleMode = Literal["shuffle", "bitshuffle", "noshuffle"]
+
+_SHUFFLES = {
+    "shuffle": Blosc.SHUFFLE,
+    "bitshuffle": Blosc.BITSHUFFLE,
+    "noshuffle": Blosc.NOSHUFFLE,
+}
+
+
+def make_compressor(
+    codec: CompressionCodec, level: int = 5, shuffle: ShuffleMode = "shuffle"
+) -> Codec | None:
+    """Create the compressor of the zarr arrays.
+
+    Args:
+        codec (CompressionCodec): The codec. "default" is the zarr default
+            (blosc-lz4 with byte shuffle), "none" disables the compression.
+        level (int): The compression level, from 0 to 9 for the blosc codecs
+            and from 1 to 22 for zstd. Not used by "default" and "none".
+        shuffle (ShuffleMode): The shuffle filter of the blosc codecs.
+
+    Returns:
+        Codec | None: The compressor, None if the compression is disabled.
+    """
+    if shuffle not in _SHUFFLES:
+        raise ValueError(f"Unknown shuffle mode: {shuffle}")
+    match codec:
+        case "default":
+            return Blosc()
+        case "none":
+            return None
+        case "blosc-lz4" | "blosc-zstd":
+            if not 0 <= level <= 9:
+                raise ValueError("The blosc compression level must be in [0, 9].")
+            cname = codec.removeprefix("blosc-")
+            return Blosc(cname=cname, clevel=level, shuffle=_SHUFFLES[shuffle])
+        case "zstd":
+            if not 1 <= level <= 22:
+                raise ValueError("The zstd compression level must be in [1, 22].")
+            return Zstd(level=level)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+@dataclass
+class CodecBenchmark:
+    """The performance of a codec on a sample of tiles.
+
+    Attributes:
+        codec (str): The codec.
+        ratio (float): The compression ratio (raw size / compressed size).
+        compress_mb_s (float): The compression throughput, in MB/s of raw data.
+        decompress_mb_s (float): The decompression throughput, in MB/s of raw
+            data.
+    """
+
+    codec: str
+    ratio: float
+    compress_mb_s: float
+    decompress_mb_s: float
+
+
+def benchmark_codecs(
+    samples: Sequence[np.ndarray],
+    codecs: Sequence[CompressionCodec] = ("blosc-lz4", "blosc-zstd", "zstd", "none"),
+    level: int = 5,
+    shuffle: ShuffleMode = "shuffle",
+    repeats: int = 3,
+) -> list[CodecBenchmark]:
+    """Measure the compression ratio and throughput of codecs on data samples.
+
+    Each sample is compressed as a whole, so the samples should be about the
+    size of the chunks of the image (e.g. a tile).
+
+    Args:
+        samples (Sequence[np.ndarray]): The data samples.
+        codecs (Sequence[CompressionCodec]): The codecs to benchmark.
+        level (int): The compression level of the codecs.
+        shuffle (ShuffleMode): The shuffle filter of the blosc codecs.
+        repeats (int): The number of times each sample is compressed and
+            decompressed, the fastest time is kept.
+
+    Returns:
+        list[CodecBenchmark]: The performance of each codec.
+    """
+    samples = [np.ascontiguousarray(sample) for sample in samples]
+    raw_mb = sum(sample.nbytes for sample in samples) / 1e6
+    results = []
+    for codec in codecs:
+        compressor = make_compressor(codec, level=level, shuffle=shuffle)
+        compressed_bytes = 0
+        compress_time = decompress_time = 0.0
+        for sample in samples:
+            times, decode_times = [], []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                encoded = sample if compressor is None else compressor.encode(sample)
+                times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                if compressor is not None:
+                    compressor.decode(encoded)
+                decode_times.append(time.perf_counter() - start)
+            compressed_bytes += np.frombuffer(encoded, dtype=np.uint8).nbytes
+            compress_time += min(times)
+            decompress_time += min(decode_times)
+        results.append(
+            CodecBenchmark(
+                codec=codec,
+                ratio=raw_mb * 1e6 / compressed_bytes,
+                compress_mb_s=raw_mb / max(compress_time, 1e-9),
+                decompress_mb_s=raw_mb / max(decompress_time, 1e-9),
+            )
+        )
+    return results
+
+
+def sample_tiles(tiled_image: TiledImage, num_tiles: int = 4) -> list[np.ndarray]:
+    """Load a sample of tiles, evenly spread over the tiles of an image."""
+    tiles = tiled_image.tiles
+    if len(tiles) == 0:
+        raise ValueError("No tiles in the TiledImage object.")
+    indices = np.linspace(0, len(tiles) - 1, min(num_tiles, len(tiles)))
+    return [np.asarray(tiles[i].load()) for i in sorted(set(indices.astype(int)))]
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Benchmark the compression codecs on the tiles of a pickled TiledImage.
+
+    The manifest of the TiledImages is created by `build_parallelization_list`,
+    in the `_tmp_converter_dir` directory next to the plates.
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Report the compression ratio and throughput of each codec on a "
+            "sample of tiles, to choose the compression of an assay."
+        )
+    )
+    parser.add_argument(
+        "pickle_path", type=Path, help="A manifest or a pickled TiledImage."
+    )
+    parser.add_argument(
+        "--index",
+        type=int,
+        default=None,
+        help="The index of the TiledImage in the manifest.",
+    )
+    parser.add_argument("--num-tiles", type=int, default=4)
+    parser.add_argument("--level", type=int, default=5)
+    parser.add_argument("--shuffle", choices=list(_SHUFFLES), default="shuffle")
+    args = parser.parse_args(argv)
+
+    tiled_image = load_tiled_image(args.pickle_path, index=args.index)
+    samples = sample_tiles(tiled_image, num_tiles=args.num_tiles)
+    results = benchmark_codecs(samples, level=args.level, shuffle=args.shuffle)
+    print(f"{'codec':<12}{'ratio':>8}{'compress MB/s':>16}{'decompress MB/s':>18}")
+    for result in results:
+        print(
+            f"{result.codec:<12}{result.ratio:>8.2f}"
+            f"{result.compress_mb_s:>16.1f}{result.decompress_mb_s:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
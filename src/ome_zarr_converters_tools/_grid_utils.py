@@ -4,22 +4,17 @@ from dataclasses import dataclass
 
 import numpy as np
 
-from ome_zarr_converters_tools._tile import Tile
+from ome_zarr_converters_tools._tile import Tile, TileSpace
+from ome_zarr_converters_tools._tile_collection import TileCollection, X, Y
 
 
-def __first_if_allclose(values: list[float]) -> tuple[bool, float]:
-    """Return the first value if all values are close."""
-    if np.allclose(values, values[0]):
-        return True, values[0]
-    return False, 0.0
-
-
-def _find_grid_size(tiles: list[Tile], offset_x, offset_y) -> tuple[int, int]:
+def _find_grid_size(
+    tiles: list[Tile] | TileCollection, offset_x, offset_y
+) -> tuple[int, int]:
     """Find the grid size of a list of tiles."""
-    x = [tile.top_l.x for tile in tiles]
-    y = [tile.top_l.y for tile in tiles]
-    num_x = int(np.round(max(x) / offset_x)) + 1
-    num_y = int(np.round(max(y) / offset_y)) + 1
+    tiles = TileCollection.from_tiles(tiles)
+    num_x = int(np.round(np.max(tiles.top_l[:, X]) / offset_x)) + 1
+    num_y = int(np.round(np.max(tiles.top_l[:, Y]) / offset_y)) + 1
     return num_x, num_y
 
 
@@ -30,8 +25,8 @@ class GridSetup:
     Attributes:
         size_x (float): Size of each tile in the x direction.
         size_y (float): Size of each tile in the y direction.
-        offset_x (float): Offset of each tile in the x direction.
-        offset_y (float): Offset of each tile in the y direction.
+        offset_x (float): Offset of each tile in the x direction (x pitch).
+        offset_y (float): Offset of each tile in the y direction (y pitch).
         num_x (int): Number of tiles in the x direction.
         num_y (int): Number of tiles in the y direction.
 
@@ -45,76 +40,194 @@ class GridSetup:
     num_y: int = 0
 
 
-def check_if_regular_grid(tiles: list[Tile]) -> tuple[str | None, GridSetup]:
-    """Find the grid size of a list of tiles."""
+def _grid_tolerance(
+    pixel_size: np.ndarray, length: float, tolerance_px: float
+) -> float:
+    """Return the absolute tolerance used to cluster the positions on one axis.
+
+    The tolerance is `tolerance_px` pixels, but never more than 0.5% of the
+    tile length. So that a tile at most one tolerance away from its grid
+    position on both axes is always snapped by `resolve_grid_tiles_overlap`.
+    """
+    tolerance = tolerance_px * float(np.median(pixel_size))
+    return min(tolerance, abs(length) / 200)
+
+
+def _cluster_positions(
+    values: np.ndarray, tolerance: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cluster 1D positions that are closer than the tolerance.
+
+    Returns:
+        The sorted centers of the clusters, and the cluster label of each value.
+    """
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    breaks = np.diff(sorted_values) > tolerance
+    sorted_labels = np.concatenate([[0], np.cumsum(breaks)])
+    labels = np.empty_like(sorted_labels)
+    labels[order] = sorted_labels
+    centers = np.bincount(sorted_labels, weights=sorted_values) / np.bincount(
+        sorted_labels
+    )
+    return centers, labels
+
+
+def _most_common_index(labels: np.ndarray) -> int:
+    """Return the index of the first element with the most common label."""
+    counts = np.bincount(labels)
+    return int(np.argmax(counts[labels] == counts.max()))
+
+
+def _find_pitch(
+    values: np.ndarray,
+    tolerance: float,
+    axis: str,
+    length: float,
+    min_pitch: float = 0.0,
+) -> tuple[str | None, float]:
+    """Find the pitch of a regular 1D lattice, allowing missing positions.
+
+    The positions are clustered, and the pitch is fitted on the cluster
+    centers assuming that the gaps between them are multiples of the pitch
+    (the smallest gap is used as first guess). Each position must be within
+    the tolerance of its lattice position.
+
+    Args:
+        values (np.ndarray): The positions of the tiles.
+        tolerance (float): The tolerance on the positions.
+        axis (str): The axis name, used in the error message.
+        length (float): The tile length, used as pitch if all the positions
+            are in a single cluster (a single row or column of tiles).
+        min_pitch (float): The minimum pitch accepted if the lattice has
+            missing positions. This avoids fitting a fine lattice on positions
+            that are not on a grid.
+
+    Returns:
+        An error message (None if the positions are on a lattice) and the pitch.
+    """
+    centers, labels = _cluster_positions(values, tolerance)
+    if len(centers) == 1:
+        # With the tile length as pitch, the jitter is always snapped to 0
+        return None, abs(length)
+
+    not_a_grid = f"Not all {axis} offsets are the same: "
+    steps = np.diff(centers)
+    relative = centers - centers[0]
+    pitch = float(steps.min())
+    # Least squares fit of the pitch on the lattice index, the index is then
+    # recomputed with the refined pitch to be robust to jitter on long axes
+    for _ in range(2):
+        lattice_index = np.rint(relative / pitch)
+        pitch = float(np.dot(relative, lattice_index) / np.sum(lattice_index**2))
+    has_holes = lattice_index[-1] != len(centers) - 1
+
+    residuals = np.abs(values - centers[0] - lattice_index[labels] * pitch)
+    if (
+        pitch <= tolerance
+        or (has_holes and pitch < min_pitch)
+        or np.any(residuals > tolerance)
+    ):
+        unique_offsets = np.unique(np.round(steps, 6))
+        return f"{not_a_grid}{unique_offsets}", 0.0
+    return None, pitch
+
+
+def check_if_regular_grid(
+    tiles: list[Tile] | TileCollection, tolerance_px: float = 5.0
+) -> tuple[str | None, GridSetup]:
+    """Check if the tiles are on a regular grid and find the grid setup.
+
+    The X and Y positions of the tiles are clustered with a tolerance of
+    `tolerance_px` pixels, so small stage jitter does not break the grid.
+    The pitch of each axis is fitted on the clusters, and every tile must be
+    within the tolerance of its grid position. Missing grid positions (even
+    whole rows or columns) are allowed, and so are a few tiles (less than
+    half) smaller than the grid tile size. Tiles larger than the grid tile
+    would overlap their neighbours once snapped on the grid, so they are
+    rejected (the auto mode then falls back to the free mode).
+
+    The tiles are expected to have the XY offset removed (the grid starts
+    at 0), as done in the standard stitching pipe.
+
+    Args:
+        tiles (list[Tile] | TileCollection): The tiles to check.
+        tolerance_px (float): The tolerance on the tiles positions in pixels.
+
+    Returns:
+        An error message (None if the tiles are on a regular grid) and the
+        grid setup, where offset_x and offset_y are the pitch of each axis.
+    """
+    tiles = TileCollection.from_tiles(tiles)
     if len(tiles) == 0:
         return "Empty list of tiles", GridSetup()
 
     if len(tiles) == 1:
         return "Only one tile", GridSetup()
 
+    if tiles.space == TileSpace.REAL:
+        pixel_size = tiles.pixel_size
+    else:
+        pixel_size = np.ones_like(tiles.pixel_size)
+
     # ------------------------------------------
-    # Test 1: Check if all lengths are the same
+    # Test 1: Find the grid tile size
     # ------------------------------------------
-    tiles_length_x = [bbox.bot_r.x - bbox.top_l.x for bbox in tiles]
-    if len(tiles_length_x) == 0:
-        return "Empty list of tiles", GridSetup()
-
-    if np.allclose(tiles_length_x, tiles_length_x[0]):
-        length_x = tiles_length_x[0]
-    else:
-        all_lengths = np.unique(tiles_length_x)
+    # A few smaller tiles are allowed, they are placed on the grid like the
+    # others. The grid tile size is the most common one.
+    size_tolerance = tolerance_px * float(np.median(pixel_size[:, [X, Y]]))
+    _, labels_x = _cluster_positions(tiles.diag[:, X], size_tolerance)
+    _, labels_y = _cluster_positions(tiles.diag[:, Y], size_tolerance)
+    labels = labels_x * (labels_y.max() + 1) + labels_y
+    reference = _most_common_index(labels)
+    if 2 * np.count_nonzero(labels == labels[reference]) < len(tiles):
+        all_lengths = np.unique(tiles.diag[:, [X, Y]], axis=0)
         return f"Not all lengths are the same: {all_lengths}", GridSetup()
 
-    tiles_length_y = [bbox.bot_r.y - bbox.top_l.y for bbox in tiles]
-    if len(tiles_length_y) == 0:
-        return "Empty list of tiles", GridSetup()
+    reference_tile = tiles[reference]
+    length_x = reference_tile.bot_r.x - reference_tile.top_l.x
+    length_y = reference_tile.bot_r.y - reference_tile.top_l.y
+    # The lengths in the size tolerance are clustered with the grid tile, but
+    # even a slightly larger tile would overlap its neighbours
+    lengths = tiles.diag[:, [X, Y]]
+    grid_lengths = np.array([length_x, length_y])
+    larger = np.any(
+        (lengths > grid_lengths) & ~np.isclose(lengths, grid_lengths), axis=1
+    )
+    if np.any(larger):
+        larger_lengths = np.unique(lengths[larger], axis=0)
+        return (
+            f"Some tiles are larger than the grid tile: {larger_lengths}",
+            GridSetup(),
+        )
+
+    tolerance_x = _grid_tolerance(pixel_size[:, X], length_x, tolerance_px)
+    tolerance_y = _grid_tolerance(pixel_size[:, Y], length_y, tolerance_px)
 
-    if np.allclose(tiles_length_y, tiles_length_y[0]):
-        length_y = tiles_length_y[0]
-    else:
-        all_lengths = np.unique(tiles_length_y)
-        return f"Not all lengths are the same: {all_lengths}", GridSetup()
     # ------------------------------------------
-    # Test 2: Check if all offsets are the same
+    # Test 2: Check if the positions are on a lattice
     # ------------------------------------------
-    # Find the tiles offsets
-    pos_top_l_x = [tile.top_l.x for tile in tiles]
-    pos_top_l_x = np.sort(pos_top_l_x)
-    offsets_x = np.diff(pos_top_l_x)
-    offsets_x = offsets_x[offsets_x > 1e-6].tolist()
-
-    if len(offsets_x) == 0:
-        offset_x = 1.0
-    elif np.allclose(offsets_x, offsets_x[0]):
-        offset_x = offsets_x[0]
-    else:
-        # Not all offsets are the same
-        unique_offsets = np.unique(offsets_x)
-        return f"Not all x offsets are the same: {unique_offsets}", GridSetup()
-
-    pos_top_l_y = [tile.top_l.y for tile in tiles]
-    pos_top_l_y = np.sort(pos_top_l_y)
-    offsets_y = np.diff(pos_top_l_y)
-    offsets_y = offsets_y[offsets_y > 1e-6].tolist()
-
-    if len(offsets_y) == 0:
-        offset_y = 1.0
-    elif np.allclose(offsets_y, offsets_y[0]):
-        offset_y = offsets_y[0]
-    else:
-        # Not all offsets are the same
-        unique_offsets = np.unique(offsets_y)
-        return f"Not all y offsets are the same: {unique_offsets}", GridSetup()
+    top_l = tiles.top_l
+    # Rows or columns can be missing, but a grid with holes must have a pitch
+    # of at least a quarter of the tile size (at most 75% overlap)
+    error_message, offset_x = _find_pitch(
+        top_l[:, X], tolerance_x, axis="x", length=length_x, min_pitch=length_x / 4
+    )
+    if error_message is not None:
+        return error_message, GridSetup()
+
+    error_message, offset_y = _find_pitch(
+        top_l[:, Y], tolerance_y, axis="y", length=length_y, min_pitch=length_y / 4
+    )
+    if error_message is not None:
+        return error_message, GridSetup()
+
     # ------------------------------------------
     # Test 3: Check the edge case where the grid is slanted
     # ------------------------------------------
-    for tile in tiles[1:]:
-        vec = tile.top_l - tiles[0].top_l
-        if vec.x < 1e-6 or vec.y < 1e-6:
-            # All good the grid is not slanted
-            break
-    else:
+    # The grid is slanted if no tile is on the same row or column of the first
+    vec = top_l[1:] - top_l[0]
+    if not np.any((vec[:, X] < tolerance_x) | (vec[:, Y] < tolerance_y)):
         return "The grid is slanted", GridSetup()
 
     # Return the grid setup
@@ -127,3 +240,52 @@ def check_if_regular_grid(tiles: list[Tile]) -> tuple[str | None, GridSetup]:
         num_x=num_x,
         num_y=num_y,
     )
+
+
+def _lattice_candidates(
+    tiles: TileCollection,
+    num_x: int,
+    num_y: int,
+    offset_x: float,
+    offset_y: float,
+    max_dist: float,
+) -> list[tuple[int, int, list[int]]]:
+    """Find the tiles that might be within max_dist of each lattice position.
+
+    Each tile is assigned to the lattice position (i, j) closest to its top-left
+    corner in one vectorized step, the candidates of a position are the tiles
+    assigned to it or to its neighbours (enough to cover max_dist).
+    Positions without candidates are skipped.
+
+    Returns:
+        A list of (i, j, candidates) sorted by (i, j), with the candidates
+        indices sorted in the order of the tiles.
+    """
+    n = len(tiles)
+    valid_offsets = offset_x > 0 and offset_y > 0 and np.isfinite(max_dist)
+    if valid_offsets:
+        # A tile within max_dist of (i, j) is at most max_dist / offset + 0.5
+        # positions away from its closest lattice position. The distances are
+        # rounded to the coordinates precision (at most 0.05 for floats), the
+        # extra 0.5 is a safe upper bound for that rounding.
+        radius_x = int(np.ceil((max_dist + 0.5) / offset_x + 0.5))
+        radius_y = int(np.ceil((max_dist + 0.5) / offset_y + 0.5))
+
+    if not valid_offsets or (2 * radius_x + 1) * (2 * radius_y + 1) > n:
+        # The neighbourhood covers more than all the tiles
+        all_tiles = list(range(n))
+        return [(i, j, all_tiles) for i in range(num_x) for j in range(num_y)]
+
+    lattice_x = np.rint(tiles.top_l[:, X] / offset_x).astype(np.int64).tolist()
+    lattice_y = np.rint(tiles.top_l[:, Y] / offset_y).astype(np.int64).tolist()
+    buckets: dict[tuple[int, int], list[int]] = {}
+    for idx, key in enumerate(zip(lattice_x, lattice_y, strict=True)):
+        buckets.setdefault(key, []).append(idx)
+
+    positions: dict[tuple[int, int], list[int]] = {}
+    for (bx, by), bucket in buckets.items():
+        for i in range(max(bx - radius_x, 0), min(bx + radius_x + 1, num_x)):
+            for j in range(max(by - radius_y, 0), min(by + radius_y + 1, num_y)):
+                positions.setdefault((i, j), []).extend(bucket)
+
+    return [(i, j, sorted(positions[i, j])) for i, j in sorted(positions)]
@@ -0,0 +1,157 @@
+"""Cache of the stitched layouts shared by images with the same tiles geometry."""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+
+from ome_zarr_converters_tools._tile_collection import TileCollection
+
+logger = logging.getLogger(__name__)
+
+# Bump this version when the stitching results change, to invalidate the
+# layouts persisted on disk by older versions.
+_LAYOUT_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class LayoutCacheEntry:
+    """A stitched layout.
+
+    Attributes:
+        indices (np.ndarray): (m,) index of the input tile of each output tile.
+        top_l (np.ndarray): (m, 5) top-left corners of the output tiles.
+        diag (np.ndarray): (m, 5) diagonal vectors of the output tiles.
+    """
+
+    indices: np.ndarray
+    top_l: np.ndarray
+    diag: np.ndarray
+
+
+def layout_fingerprint(tiles: TileCollection, **options: object) -> str:
+    """Compute the fingerprint of the geometry of a collection of tiles.
+
+    The fingerprint depends on the position, size, shape and pixel size of each
+    tile (in order) and on the stitching options, but not on the tiles origin
+    or data loaders. The tiles are expected to be translation normalized (as
+    done by the standard stitching pipe), so images with the same layout
+    relative to their origin share the same fingerprint.
+    """
+    hasher = hashlib.sha256()
+    header = f"v{_LAYOUT_CACHE_VERSION}|{tiles.space}|{sorted(options.items())}"
+    hasher.update(header.encode())
+    for array, dtype in (
+        (tiles.top_l, "<f8"),
+        (tiles.diag, "<f8"),
+        (tiles.shape, "<i8"),
+        (tiles.pixel_size, "<f8"),
+    ):
+        hasher.update(np.ascontiguousarray(array, dtype=dtype).tobytes())
+    return hasher.hexdigest()
+
+
+class LayoutCache:
+    """In memory LRU cache of stitched layouts, optionally persisted on disk.
+
+    When a cache directory is given, each layout is also stored in a `.npz`
+    file named after its fingerprint, so that the layouts can be shared between
+    processes (e.g. the compute tasks of the wells of a plate).
+    """
+
+    def __init__(self, maxsize: int = 128, cache_dir: str | Path | None = None):
+        """Initialize the cache.
+
+        Args:
+            maxsize (int): The maximum number of layouts kept in memory.
+            cache_dir (str | Path | None): Optional directory where the layouts
+                are persisted.
+        """
+        if maxsize < 1:
+            raise ValueError("The cache size must be at least 1.")
+        self._maxsize = maxsize
+        self._cache_dir = None if cache_dir is None else Path(cache_dir)
+        self._entries: OrderedDict[str, LayoutCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> Path | None:
+        """Return the directory where the layouts are persisted."""
+        return self._cache_dir
+
+    def __len__(self) -> int:
+        """Return the number of layouts in memory."""
+        return len(self._entries)
+
+    def get(self, key: str) -> LayoutCacheEntry | None:
+        """Return the layout with the given fingerprint, None if not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: LayoutCacheEntry) -> None:
+        """Add a layout to the cache."""
+        self._remember(key, entry)
+        self._save(key, entry)
+
+    def _remember(self, key: str, entry: LayoutCacheEntry) -> None:
+        """Add a layout to the in memory cache, evicting the oldest one."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path | None:
+        if self._cache_dir is None:
+            return None
+        return self._cache_dir / f"{key}.npz"
+
+    def _load(self, key: str) -> LayoutCacheEntry | None:
+        """Load a layout from the cache directory."""
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return LayoutCacheEntry(
+                    indices=data["indices"], top_l=data["top_l"], diag=data["diag"]
+                )
+        except Exception as e:
+            logger.warning(f"Could not load the cached layout {path}: {e}")
+            return None
+
+    def _save(self, key: str, entry: LayoutCacheEntry) -> None:
+        """Persist a layout in the cache directory."""
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, other processes might be reading
+            tmp_path = path.with_name(f".{key}.{uuid4()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, indices=entry.indices, top_l=entry.top_l, diag=entry.diag)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist the layout in {path}: {e}")
+
+
+@cache
+def get_layout_cache(cache_dir: str | None = None) -> LayoutCache:
+    """Return the layout cache of this process for the given directory."""
+    return LayoutCache(cache_dir=cache_dir)
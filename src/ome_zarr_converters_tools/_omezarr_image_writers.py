@@ -1,17 +1,43 @@
 """OME-Zarr Image Writers."""
 
-import copy
-from collections.abc import Callable
+import itertools
+import logging
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Literal
 
-from ngio import OmeZarrContainer, PixelSize, RoiPixels, create_empty_ome_zarr
+import numpy as np
+import zarr
+from ngio import (
+    Image,
+    OmeZarrContainer,
+    PixelSize,
+    RoiPixels,
+    create_empty_ome_zarr,
+    open_ome_zarr_container,
+)
 from ngio.tables import RoiTable
+from numcodecs.abc import Codec
 
+from ome_zarr_converters_tools._channel_histograms import ChannelHistograms
+from ome_zarr_converters_tools._compression import (
+    CompressionCodec,
+    ShuffleMode,
+    make_compressor,
+)
+from ome_zarr_converters_tools._progress import ConversionProgress
+from ome_zarr_converters_tools._pyramid import PyramidBuilder
 from ome_zarr_converters_tools._tile import Tile
+from ome_zarr_converters_tools._tile_collection import TileCollection
+from ome_zarr_converters_tools._tile_loading import TileDataCache
 from ome_zarr_converters_tools._tiled_image import TiledImage
 
+logger = logging.getLogger(__name__)
 
-def _find_shape(tiles: list[Tile]) -> tuple[int, int, int, int, int]:
+
+def _find_shape(tiles: list[Tile] | TileCollection) -> tuple[int, int, int, int, int]:
     """Find the shape of the image."""
     shape_x = max(int(tile.bot_r.x) for tile in tiles)
     shape_y = max(int(tile.bot_r.y) for tile in tiles)
@@ -20,7 +46,7 @@ def _find_shape(tiles: list[Tile]) -> tuple[int, int, int, int, int]:
 
 
 def _find_chunk_shape(
-    tiles: list[Tile],
+    tiles: list[Tile] | TileCollection,
     max_xy_chunk: int = 4096,
     z_chunk: int = 1,
     c_chunk: int = 1,
@@ -35,20 +61,99 @@ def _find_chunk_shape(
     return chunk_t, chunk_c, chunk_z, chunk_y, chunk_x
 
 
-def _find_dtype(tiles: list[Tile]) -> str:
+# Default uncompressed size of the chunks in the "auto" chunking mode
+_DEFAULT_TARGET_CHUNK_BYTES = 16 * 1024**2
+
+
+def _even_chunk(size: int, chunk: int) -> int:
+    """Return the smallest chunk splitting size in as many chunks as chunk does."""
+    num_chunks = -(-size // chunk)
+    return -(-size // num_chunks)
+
+
+def _plan_chunk_shape(
+    tile_shape: tuple[int, ...],
+    shape: tuple[int, ...],
+    dtype: str,
+    target_bytes: int = _DEFAULT_TARGET_CHUNK_BYTES,
+) -> tuple[int, int, int, int, int]:
+    """Plan the (t, c, z, y, x) chunk shape of level 0, for a size in bytes.
+
+    The chunks hold a single time point and channel. In XY they are the tile
+    shape, halved or doubled until a chunk is close to the target size, so that
+    the chunk boundaries stay aligned with the tiles of a regular grid. The z
+    chunk then fills the chunk up to the target size, split evenly along z.
+
+    Args:
+        tile_shape (tuple[int, ...]): The (t, c, z, y, x) shape of the tiles.
+        shape (tuple[int, ...]): The (t, c, z, y, x) shape of the image.
+        dtype (str): The dtype of the image.
+        target_bytes (int): The target uncompressed size of a chunk.
+    """
+    # The target number of pixels of a chunk
+    target = max(target_bytes // np.dtype(dtype).itemsize, 1)
+    *_, shape_z, shape_y, shape_x = shape
+    chunk_y, chunk_x = min(tile_shape[3], shape_y), min(tile_shape[4], shape_x)
+    while chunk_y * chunk_x > target and max(chunk_y, chunk_x) > 1:
+        if chunk_y >= chunk_x:
+            chunk_y = -(-chunk_y // 2)
+        else:
+            chunk_x = -(-chunk_x // 2)
+    # Grow the 2D chunks (or the 3D chunks with the whole z stack)
+    while chunk_y * chunk_x * shape_z * 4 <= target and (
+        chunk_y < shape_y or chunk_x < shape_x
+    ):
+        chunk_y, chunk_x = min(chunk_y * 2, shape_y), min(chunk_x * 2, shape_x)
+    chunk_z = min(shape_z, max(1, target // (chunk_y * chunk_x)))
+    return 1, 1, _even_chunk(shape_z, chunk_z), chunk_y, chunk_x
+
+
+def _plan_level_chunks(
+    chunks: tuple[int, ...],
+    shape: tuple[int, ...],
+    dtype: str,
+    target_bytes: int = _DEFAULT_TARGET_CHUNK_BYTES,
+) -> tuple[int, ...]:
+    """Plan the chunk shape of a lower resolution level of the pyramid.
+
+    The levels are downsampled in XY only, so with the chunks of level 0 the
+    chunks of the lower levels get smaller and smaller in XY. Instead, their z
+    chunk is grown (up to the whole z stack) to keep them close to the target
+    size.
+
+    Args:
+        chunks (tuple[int, ...]): The chunk shape of level 0, in the on disk
+            axes (the z, y and x axes last).
+        shape (tuple[int, ...]): The shape of the level, in the on disk axes.
+        dtype (str): The dtype of the image.
+        target_bytes (int): The target uncompressed size of a chunk.
+    """
+    target = max(target_bytes // np.dtype(dtype).itemsize, 1)
+    level_chunks = [min(c, s) for c, s in zip(chunks, shape, strict=True)]
+    chunk_z, chunk_y, chunk_x = level_chunks[-3:]
+    chunk_z = max(chunk_z, min(shape[-3], target // (chunk_y * chunk_x)))
+    chunk_z = _even_chunk(shape[-3], chunk_z)
+    return (*level_chunks[:-3], chunk_z, chunk_y, chunk_x)
+
+
+def _find_dtype(tiles: list[Tile] | TileCollection) -> str:
     """Find the dtype of the image."""
     return tiles[0].dtype()
 
 
 def apply_stitching_pipe(
-    tiled_image: TiledImage, stiching_pipe: Callable[[list[Tile]], list[Tile]]
-) -> list[Tile]:
-    """Apply a stitching pipe to a list of tiles."""
-    tiles = tiled_image.tiles
+    tiled_image: TiledImage,
+    stiching_pipe: Callable[[TileCollection], TileCollection],
+) -> TileCollection:
+    """Apply a stitching pipe to the tiles of a TiledImage.
+
+    Tiles and collections are immutable, so the pipe never modifies the tiles
+    of the TiledImage, and the data loaders are shared by reference.
+    """
+    tiles = tiled_image.tile_collection
     if len(tiles) == 0:
         raise ValueError("No tiles in the TiledImage object.")
 
-    tiles = copy.deepcopy(tiles)
     tiles = stiching_pipe(tiles)
 
     if len(tiles) != len(tiled_image.tiles):
@@ -59,7 +164,7 @@ def apply_stitching_pipe(
 
 def init_empty_ome_zarr_image(
     zarr_url: str | Path,
-    tiles: list[Tile],
+    tiles: list[Tile] | TileCollection,
     pixel_size: PixelSize,
     channel_names: list[str] | None,
     wavelength_ids: list[str] | None,
@@ -69,17 +174,42 @@ def init_empty_ome_zarr_image(
     c_chunk: int = 1,
     t_chunk: int = 1,
     overwrite: bool = False,
+    chunking_mode: Literal["fixed", "auto"] = "fixed",
+    target_chunk_bytes: int = _DEFAULT_TARGET_CHUNK_BYTES,
+    compression: CompressionCodec = "default",
+    compression_level: int = 5,
+    shuffle: ShuffleMode = "shuffle",
 ) -> OmeZarrContainer:
-    """Initialize an empty OME-Zarr image."""
+    """Initialize an empty OME-Zarr image.
+
+    With the "fixed" chunking mode, the chunks are given by `max_xy_chunk`,
+    `z_chunk`, `c_chunk` and `t_chunk`, and are the same on all the levels of
+    the pyramid. With the "auto" chunking mode, these are ignored and the
+    chunks of each level are planned for an uncompressed size of about
+    `target_chunk_bytes` (see `_plan_chunk_shape` and `_plan_level_chunks`).
+
+    The arrays are compressed with the `compression` codec, at the
+    `compression_level` and with the `shuffle` filter (see `make_compressor`).
+    """
+    if chunking_mode not in ("fixed", "auto"):
+        raise ValueError(f"Unknown chunking mode: {chunking_mode}")
+    # Check the compression options before creating the image
+    compressor = make_compressor(compression, compression_level, shuffle)
     on_disk_axis = ("t", "c", "z", "y", "x")
     on_disk_shape = _find_shape(tiles)
-    chunk_shape = _find_chunk_shape(
-        tiles,
-        max_xy_chunk=max_xy_chunk,
-        z_chunk=z_chunk,
-        c_chunk=c_chunk,
-        t_chunk=t_chunk,
-    )
+    tile_dtype = _find_dtype(tiles)
+    if chunking_mode == "auto":
+        chunk_shape = _plan_chunk_shape(
+            tiles[0].shape, on_disk_shape, tile_dtype, target_bytes=target_chunk_bytes
+        )
+    else:
+        chunk_shape = _find_chunk_shape(
+            tiles,
+            max_xy_chunk=max_xy_chunk,
+            z_chunk=z_chunk,
+            c_chunk=c_chunk,
+            t_chunk=t_chunk,
+        )
 
     # Chunk shape should be smaller or equal to the on disk shape
     chunk_shape = tuple(
@@ -95,9 +225,7 @@ def init_empty_ome_zarr_image(
     if pixel_size is None:
         raise ValueError("Pixel size is not defined in the TiledImage object.")
 
-    tile_dtype = _find_dtype(tiles)
-
-    return create_empty_ome_zarr(
+    ome_zarr_container = create_empty_ome_zarr(
         store=zarr_url,
         shape=on_disk_shape,
         axes_names=on_disk_axis,
@@ -111,24 +239,737 @@ def init_empty_ome_zarr_image(
         overwrite=overwrite,
         levels=num_levels,
     )
+    _recreate_empty_levels(
+        zarr_url,
+        ome_zarr_container,
+        chunks=chunk_shape,
+        dtype=tile_dtype,
+        target_bytes=target_chunk_bytes if chunking_mode == "auto" else None,
+        compressor=compressor,
+    )
+    return ome_zarr_container
 
 
-def write_tiles_as_rois(ome_zarr_container: OmeZarrContainer, tiles: list[Tile]):
-    """Write the tiles as ROIs in the image."""
-    image = ome_zarr_container.get_image()
-    pixel_size = image.pixel_size
+def _recreate_empty_levels(
+    zarr_url: str | Path,
+    ome_zarr_container: OmeZarrContainer,
+    chunks: tuple[int, ...],
+    dtype: str,
+    target_bytes: int | None,
+    compressor: Codec | None,
+) -> None:
+    """Set the chunks and the compressor of the (still empty) levels.
+
+    The levels already created with these chunks and compressor are kept.
+
+    Args:
+        zarr_url (str | Path): The url of the image.
+        ome_zarr_container (OmeZarrContainer): The container of the image.
+        chunks (tuple[int, ...]): The chunks of level 0.
+        dtype (str): The dtype of the image.
+        target_bytes (int | None): If given, the chunks of the lower resolution
+            levels are planned for this size (see `_plan_level_chunks`).
+        compressor (Codec | None): The compressor of the levels, None for no
+            compression.
+    """
+    group = zarr.open_group(store=str(zarr_url), mode="r+")
+    for i, path in enumerate(ome_zarr_container.levels_paths):
+        array = group[path]
+        level_chunks = array.chunks
+        if target_bytes is not None and i > 0:
+            level_chunks = _plan_level_chunks(chunks, array.shape, dtype, target_bytes)
+        if level_chunks == array.chunks and compressor == array.compressor:
+            continue
+        group.zeros(
+            name=path,
+            shape=array.shape,
+            dtype=array.dtype,
+            chunks=level_chunks,
+            compressor=compressor,
+            dimension_separator="/",
+            overwrite=True,
+        )
+
+
+# Default maximum size of the loaded tiles data kept in memory while writing
+_DEFAULT_MAX_CACHE_BYTES = 2 * 1024**3
+
+# With a memory budget, the target size of the chunks in the "auto" chunking
+# mode is at most the budget divided by this
+_CHUNKS_PER_MEMORY_BUDGET = 16
+
+
+@dataclass(frozen=True)
+class _MemoryPlan:
+    """The writer settings fitting a memory budget.
+
+    Attributes:
+        num_workers (int): The number of threads writing the chunks.
+        prefetch_depth (int): The number of blocks loaded ahead of the writes.
+        max_cache_bytes (int): The size of the tiles data cache.
+        incremental_pyramid (bool): Whether the pyramid can be built while
+            level 0 is written.
+    """
+
+    num_workers: int
+    prefetch_depth: int
+    max_cache_bytes: int
+    incremental_pyramid: bool
+
+
+def _plan_memory(
+    max_bytes: int,
+    worker_bytes: int,
+    block_bytes: int,
+    pyramid_bytes: int,
+    num_workers: int,
+    prefetch_depth: int,
+) -> _MemoryPlan:
+    """Fit the number of workers, the prefetch depth and the cache in a budget.
+
+    The incremental pyramid is kept if its buffers take at most half of the
+    budget, otherwise the pyramid is consolidated from level 0 once written.
+    Then the workers take at most half of the rest, the prefetched blocks at
+    most half of what is left, and the cache of the tiles data the remainder.
+
+    Args:
+        max_bytes (int): The memory budget.
+        worker_bytes (int): The memory used by each worker: the chunk it
+            assembles and the tiles data it uses.
+        block_bytes (int): The size of the largest block of tiles data.
+        pyramid_bytes (int): The size of the chunks of the lower resolution
+            levels kept by the incremental pyramid builder.
+        num_workers (int): The maximum number of workers.
+        prefetch_depth (int): The maximum prefetch depth.
+    """
+    incremental_pyramid = pyramid_bytes <= max_bytes // 2
+    available = max_bytes - (pyramid_bytes if incremental_pyramid else 0)
+    num_workers = max(1, min(num_workers, available // max(2 * worker_bytes, 1)))
+    available -= num_workers * worker_bytes
+    if available < 0:
+        logger.warning(
+            f"The memory budget of {max_bytes / 1024**2:.1f}MB is too small to "
+            f"write a chunk ({worker_bytes / 1024**2:.1f}MB), it will be exceeded."
+        )
+    prefetch_depth = min(prefetch_depth, max(0, available // max(2 * block_bytes, 1)))
+    max_cache_bytes = max(0, available - prefetch_depth * block_bytes)
+    return _MemoryPlan(
+        num_workers=num_workers,
+        prefetch_depth=prefetch_depth,
+        max_cache_bytes=max_cache_bytes,
+        incremental_pyramid=incremental_pyramid,
+    )
+
+
+def _pyramid_buffer_bytes(levels: Sequence[zarr.Array], stream: bool) -> int:
+    """Estimate the size of the chunks kept by the incremental pyramid builder.
+
+    The chunks of the lower resolution levels are completed once the next
+    rows of chunks of the previous level are written, so about one row of
+    chunks of each level is kept: along x, and also along t, c and z unless
+    the tiles are streamed in t, c and z blocks.
+    """
+    nbytes = 0
+    for level in levels[1:]:
+        *shape_tcz, _, shape_x = level.shape
+        *chunks_tcz, chunk_y, _ = level.chunks
+        row = chunks_tcz if stream else shape_tcz
+        nbytes += int(np.prod(row)) * chunk_y * shape_x * level.dtype.itemsize
+    return nbytes
+
+
+def _tile_chunks(tile: Tile, chunks: tuple[int, ...]) -> list[tuple[int, int, int]]:
+    """Return the (z, y, x) indices of the chunks a tile is written to.
+
+    The tile data can be off by one pixel from the tile shape (see `Tile.load`),
+    so the extent of the tile is padded by one pixel.
+    """
+    chunk_z, chunk_y, chunk_x = chunks[-3:]
+    _, _, s_z, s_y, s_x = tile.shape
+    ranges = []
+    for start, length, chunk in (
+        (int(tile.top_l.z), s_z, chunk_z),
+        (int(tile.top_l.y), s_y, chunk_y),
+        (int(tile.top_l.x), s_x, chunk_x),
+    ):
+        first = max(start, 0) // chunk
+        last = max(start + length, 0) // chunk
+        ranges.append(range(first, last + 1))
+    return [(z, y, x) for z in ranges[0] for y in ranges[1] for x in ranges[2]]
+
+
+@dataclass(frozen=True)
+class _ChunkRegion:
+    """A chunk of the image, in (t, c, z, y, x) even if the image has no time axis.
+
+    Attributes:
+        start (tuple[int, ...]): The (t, c, z, y, x) start of the chunk.
+        stop (tuple[int, ...]): The (t, c, z, y, x) stop of the chunk.
+        tiles (tuple[int, ...]): The indices of the tiles covering the chunk,
+            in the order they are written.
+    """
+
+    start: tuple[int, ...]
+    stop: tuple[int, ...]
+    tiles: tuple[int, ...]
+
+
+def _plan_chunk_writes(
+    tiles: list[Tile] | TileCollection,
+    shape: tuple[int, ...],
+    chunks: tuple[int, ...],
+    stream: bool = False,
+) -> list[_ChunkRegion]:
+    """Map each chunk of the image to the tiles covering it.
+
+    Args:
+        tiles (list[Tile] | TileCollection): The tiles to write, in pixel space.
+        shape (tuple[int, ...]): The (t, c, z, y, x) shape of the image.
+        chunks (tuple[int, ...]): The (t, c, z, y, x) chunk shape of the image.
+        stream (bool): Whether the tiles are loaded in blocks following the t, c
+            and z chunks. The chunks are then ordered by (t, c, z, y, x), so the
+            blocks can be released after a few rows of chunks. Otherwise they
+            are ordered by (y, x, t, c, z), so the whole tiles can be released
+            after a few rows of chunks.
+
+    Returns:
+        list[_ChunkRegion]: The chunks covered by at least one tile.
+    """
+    shape_zyx, chunks_zyx = shape[-3:], chunks[-3:]
+    columns: dict[tuple[int, int, int], list[int]] = {}
+    for i, tile in enumerate(tiles):
+        for key in _tile_chunks(tile, chunks):
+            if all(
+                k * c < s for k, c, s in zip(key, chunks_zyx, shape_zyx, strict=True)
+            ):
+                columns.setdefault(key, []).append(i)
+
+    num_t, num_c = (-(-s // c) for s, c in zip(shape[:2], chunks[:2], strict=True))
+    keys = [
+        (t, c, *column)
+        for column in columns
+        for t in range(num_t)
+        for c in range(num_c)
+    ]
+    if stream:
+        keys.sort()
+    else:
+        keys.sort(key=lambda k: (k[3], k[4], k[0], k[1], k[2]))
+
+    plan = []
+    for chunk_key in keys:
+        start = tuple(k * c for k, c in zip(chunk_key, chunks, strict=True))
+        stop = tuple(
+            min(a + c, s) for a, c, s in zip(start, chunks, shape, strict=True)
+        )
+        plan.append(_ChunkRegion(start, stop, tuple(columns[chunk_key[2:]])))
+    return plan
+
+
+def _overlaps(
+    region: _ChunkRegion, tile_start: tuple[int, ...], tile_shape: tuple[int, ...]
+) -> bool:
+    """Check if a tile overlaps a region."""
+    return all(
+        max(start, t_start) < min(stop, t_start + length)
+        for start, stop, t_start, length in zip(
+            region.start, region.stop, tile_start, tile_shape, strict=True
+        )
+    )
+
+
+class _ChunkWriter:
+    """Assemble the chunks of an image from the tiles and write them.
+
+    The tiles are loaded in blocks identified by a key: `(i,)` for the whole
+    tile `i`, or `(i, t, c, z)` for the block of the tile in the t, c and z
+    chunk `(t, c, z)`, when the tile data loader supports region loading.
+
+    If a `pyramid` builder is set, the written chunks are added to it to build
+    the other levels of the pyramid. If `histograms` are set, the values of the
+    written chunks are counted in them. If a `progress` manifest is set, the
+    written chunks are recorded in it.
+    """
+
+    def __init__(
+        self,
+        image: Image,
+        tiles: list[Tile] | TileCollection,
+        squeeze_t: bool,
+    ):
+        self.image = image
+        self.dtype: str = image.dtype
+        self._level_0 = _skip_empty_chunks(image.zarr_array)
+        self._tiles = tiles
+        self._squeeze_t = squeeze_t
+        if squeeze_t:
+            self.shape = (1, *image.shape)
+            self.chunks = (1, *image.chunks)
+        else:
+            self.shape, self.chunks = image.shape, image.chunks
+        self.tiles_start = [
+            (0, 0, int(tile.top_l.z), int(tile.top_l.y), int(tile.top_l.x))
+            for tile in tiles
+        ]
+        self._tiles_shape = [tile.shape for tile in tiles]
+        self._stream = [tile.supports_region_loading for tile in tiles]
+        # The (t, c, z, y, x) shape of the loaded tiles
+        self.shapes: dict[int, tuple[int, ...]] = {}
+        self.pyramid: PyramidBuilder | None = None
+        self.histograms: ChannelHistograms | None = None
+        self.progress: ConversionProgress | None = None
+
+    def on_disk_index(self, region: _ChunkRegion) -> tuple[int, ...]:
+        """Return the index of the chunk of a region, in the on disk axes."""
+        index = tuple(
+            start // chunk
+            for start, chunk in zip(region.start, self.chunks, strict=True)
+        )
+        return index[1:] if self._squeeze_t else index
+
+    @property
+    def stream(self) -> bool:
+        """Check if all the tiles are loaded in blocks."""
+        return all(self._stream)
+
+    def block_key(self, i: int, region: _ChunkRegion) -> tuple[int, ...] | None:
+        """Return the key of the block of a tile needed by a region.
+
+        Returns None if the tile does not cover the z planes of the region.
+        """
+        if not self._stream[i]:
+            return (i,)
+        z_start, s_z = self.tiles_start[i][2], self._tiles_shape[i][2]
+        if max(region.start[2], z_start) >= min(region.stop[2], z_start + s_z):
+            return None
+        t, c, z = (
+            start // chunk
+            for start, chunk in zip(region.start[:3], self.chunks[:3], strict=True)
+        )
+        return (i, t, c, z)
+
+    def _block_slices(self, key: tuple[int, ...]) -> tuple[slice, slice, slice]:
+        """Return the (t, c, z) slices of a block, relative to its tile."""
+        i, *indices = key
+        z_start, s_z = self.tiles_start[i][2], self._tiles_shape[i][2]
+        slices = []
+        for index, chunk, offset, length in zip(
+            indices,
+            self.chunks[:3],
+            (0, 0, z_start),
+            (*self.shape[:2], s_z),
+            strict=True,
+        ):
+            start = max(index * chunk - offset, 0)
+            stop = min((index + 1) * chunk - offset, length)
+            slices.append(slice(start, stop))
+        return slices[0], slices[1], slices[2]
+
+    def load(self, key: tuple[int, ...]) -> np.ndarray:
+        """Load a block of tile data, in (t, c, z, y, x)."""
+        i = key[0]
+        tile = self._tiles[i]
+        if len(key) == 1:
+            data = np.asarray(tile.load())
+            self.shapes[i] = data.shape
+            return data
+
+        t, c, z = self._block_slices(key)
+        data = np.asarray(tile.load_region(t=t, c=c, z=z))
+        self.shapes[i] = self._tiles_shape[i][:3] + data.shape[3:]
+        return data
+
+    def block_nbytes(self, key: tuple[int, ...]) -> int:
+        """Return the expected size of a block of tile data."""
+        shape = self._tiles_shape[key[0]]
+        if len(key) > 1:
+            t, c, z = self._block_slices(key)
+            shape = (t.stop - t.start, c.stop - c.start, z.stop - z.start, *shape[3:])
+        return int(np.prod(shape)) * np.dtype(self.dtype).itemsize
+
+    def _block_start(self, key: tuple[int, ...]) -> tuple[int, ...]:
+        """Return the (t, c, z, y, x) start of a block in the image."""
+        tile_start = self.tiles_start[key[0]]
+        if len(key) == 1:
+            return tile_start
+        t, c, z = self._block_slices(key)
+        return (t.start, c.start, tile_start[2] + z.start, *tile_start[3:])
+
+    def write(
+        self,
+        region: _ChunkRegion,
+        region_index: int,
+        blocks: Sequence[tuple[int, ...]],
+        cache: TileDataCache,
+    ) -> None:
+        """Assemble a chunk of the image from its tiles and write it."""
+        size = tuple(b - a for a, b in zip(region.start, region.stop, strict=True))
+        patch = np.zeros(size, dtype=self.image.dtype)
+        for key in blocks:
+            shape = self.shapes.get(key[0])
+            if shape is not None and not _overlaps(
+                region, self.tiles_start[key[0]], shape
+            ):
+                # The region was planned with the padded extent of the tile
+                cache.discard(key, region_index)
+                continue
+
+            data = cache.acquire(key)
+            try:
+                src, dst = [], []
+                for start, stop, block_start, length in zip(
+                    region.start,
+                    region.stop,
+                    self._block_start(key),
+                    data.shape,
+                    strict=True,
+                ):
+                    low = max(start, block_start)
+                    high = min(stop, block_start + length)
+                    src.append(slice(low - block_start, high - block_start))
+                    dst.append(slice(low - start, high - start))
+                # Later tiles overwrite the previous ones, as when writing in order
+                patch[tuple(dst)] = data[tuple(src)]
+            finally:
+                cache.release(key, region_index)
+
+        slices = {
+            axis: slice(a, b)
+            for axis, a, b in zip("tczyx", region.start, region.stop, strict=True)
+        }
+        if self.histograms is not None:
+            self.histograms.add(region.start[1], patch)
+        chunk_start = region.start
+        if self._squeeze_t:
+            patch = patch[0]
+            del slices["t"]
+            chunk_start = chunk_start[1:]
+        self._level_0[tuple(slices.values())] = patch
+        if self.pyramid is not None:
+            self.pyramid.add(chunk_start, patch)
+        if self.progress is not None:
+            self.progress.record_chunk(self.on_disk_index(region))
+
+
+def _set_channel_windows(
+    ome_zarr_container: OmeZarrContainer, starts: list[float], ends: list[float]
+) -> None:
+    """Set the start and end of the channels, keeping their other metadata."""
+    channels = ome_zarr_container.image_meta.channels_meta.channels
+    ome_zarr_container.set_channel_meta(
+        labels=[channel.label for channel in channels],
+        wavelength_id=[channel.wavelength_id for channel in channels],
+        colors=[channel.channel_visualisation.color for channel in channels],
+        active=[channel.channel_visualisation.active for channel in channels],
+        start=starts,
+        end=ends,
+    )
 
+
+def write_tiles_as_rois(
+    ome_zarr_container: OmeZarrContainer,
+    tiles: list[Tile] | TileCollection,
+    num_workers: int = 1,
+    max_cache_bytes: int = _DEFAULT_MAX_CACHE_BYTES,
+    prefetch_depth: int = 2,
+    pyramid_mode: Literal["incremental", "consolidate"] = "incremental",
+    percentile_mode: Literal["histogram", "sample"] = "sample",
+    max_memory_bytes: int | None = None,
+    progress: ConversionProgress | None = None,
+):
+    """Write the tiles as ROIs in the image.
+
+    The tiles are not written one by one, since the chunks of the image are
+    rarely aligned with the tiles, and writing a part of a chunk means reading,
+    modifying and rewriting it. Instead each chunk is assembled in memory from
+    the tiles covering it and written once. The empty chunks (only zeros) are
+    not written, since they read as zeros: this saves the creation of a file
+    per chunk on sparse images.
+
+    If the data loaders of the tiles implement `load_region` (see
+    `RegionTileLoader`), the tiles are streamed in blocks following the t, c
+    and z chunks of the image, so the memory used scales with the chunks and
+    not with the tiles. Otherwise each tile is loaded whole.
+
+    Args:
+        ome_zarr_container (OmeZarrContainer): The container of the image.
+        tiles (list[Tile] | TileCollection): The tiles to write, in pixel space.
+        num_workers (int): The number of threads assembling and writing the
+            chunks. Each chunk is written once, so the output does not depend
+            on the number of workers. With more than one worker, the data
+            loaders must be thread safe.
+        max_cache_bytes (int): The maximum size of the loaded tiles data kept in
+            memory for the chunks still to write. When exceeded, tiles are
+            loaded again when needed. The tiles in use are always kept.
+        prefetch_depth (int): The number of tiles (or blocks) loaded ahead of
+            the chunks being written, so that loading and writing overlap. 0
+            disables the prefetching. With a single worker, two tiles are never
+            loaded at the same time, so the data loaders do not need to be
+            thread safe.
+        pyramid_mode (Literal["incremental", "consolidate"]): How the other
+            levels of the pyramid are built. "incremental" builds them from the
+            chunks of level 0 as they are written, without reading level 0
+            back (see `PyramidBuilder`). "consolidate" builds them once level 0
+            is written, with `Image.consolidate`. Both give the same pyramid,
+            "consolidate" is used if the levels cannot be built incrementally.
+        percentile_mode (Literal["histogram", "sample"]): How the percentiles
+            of the channels (the contrast limits) are computed. "sample" (the
+            default) computes them from the lowest resolution level of the
+            pyramid, read back once written. "histogram" computes them from
+            histograms of the chunks counted as they are written (see
+            `ChannelHistogram`), exact for the integer dtypes of up to 16 bits
+            and up to a small bin width otherwise. Since they are computed from
+            level 0, the contrast limits differ from the "sample" ones.
+        max_memory_bytes (int | None): The memory budget of the writer. If
+            given, the number of workers, the prefetch depth and the cache size
+            are reduced to fit the chunks being written, the tiles data and the
+            buffers of the incremental pyramid in the budget (see
+            `_plan_memory`), and the pyramid is consolidated from level 0 if
+            its buffers do not fit.
+        progress (ConversionProgress | None): The progress manifest of the
+            conversion. If given, the written chunks and the completed stages
+            are recorded in it, and those already recorded (by an interrupted
+            conversion) are skipped. The pyramid and the percentiles of a
+            resumed conversion are built from level 0 once written (see
+            `finalize_ome_zarr_image`).
+    """
+    if num_workers < 1:
+        raise ValueError("The number of workers must be at least 1.")
+    if pyramid_mode not in ("incremental", "consolidate"):
+        raise ValueError(f"Unknown pyramid mode: {pyramid_mode}")
+    if percentile_mode not in ("histogram", "sample"):
+        raise ValueError(f"Unknown percentile mode: {percentile_mode}")
+
+    image = ome_zarr_container.get_image()
     squeeze_t = not ome_zarr_container.is_time_series
+    writer = _ChunkWriter(image, tiles, squeeze_t=squeeze_t)
+    writer.progress = progress
+    plan, blocks = _plan_writer(writer, tiles)
+    num_chunks = len(plan)
+    stages = set()
+    if progress is not None:
+        stages = progress.stages()
+        plan, blocks = _skip_written_chunks(writer, plan, blocks, progress)
+        if "tiles" in stages:
+            plan, blocks = [], []
+    # The pyramid and the histograms need all the chunks of level 0
+    resumed = len(plan) < num_chunks
+    if resumed:
+        logger.info(
+            f"Resuming the conversion of {image}: "
+            f"{num_chunks - len(plan)} of {num_chunks} chunks already written."
+        )
+    levels = _levels(ome_zarr_container)
+    if max_memory_bytes is not None:
+        memory_plan = _fit_memory(
+            writer,
+            blocks,
+            levels if pyramid_mode == "incremental" else None,
+            max_memory_bytes=max_memory_bytes,
+            num_workers=num_workers,
+            prefetch_depth=prefetch_depth,
+        )
+        num_workers = memory_plan.num_workers
+        prefetch_depth = memory_plan.prefetch_depth
+        max_cache_bytes = memory_plan.max_cache_bytes
+        if not memory_plan.incremental_pyramid:
+            pyramid_mode = "consolidate"
+
+    # Set order to 0 if the image has the time axis
+    order: Literal[0, 1] = 1 if squeeze_t else 0
+    if pyramid_mode == "incremental" and not resumed:
+        if PyramidBuilder.is_supported(levels):
+            writer.pyramid = PyramidBuilder(
+                levels,
+                written_chunks=[writer.on_disk_index(region) for region in plan],
+                order=order,
+            )
+        else:
+            logger.info(f"The pyramid of {image} is consolidated from level 0.")
+    if percentile_mode == "histogram" and not resumed:
+        writer.histograms = ChannelHistograms(writer.shape[1], dtype=image.dtype)
+
+    _write_chunks(
+        writer,
+        plan,
+        blocks,
+        num_workers=num_workers,
+        max_cache_bytes=max_cache_bytes,
+        prefetch_depth=prefetch_depth,
+    )
+    if progress is not None and "tiles" not in stages:
+        progress.record_stage("tiles")
+
+    finalize_ome_zarr_image(
+        ome_zarr_container,
+        pyramid_mode=pyramid_mode,
+        percentile_mode=percentile_mode,
+        num_workers=num_workers,
+        build_pyramid=writer.pyramid is None,
+        histograms=writer.histograms,
+        progress=progress,
+    )
+    if "tables" not in stages:
+        table = fov_roi_table(tiles, image.pixel_size, shapes=writer.shapes)
+        ome_zarr_container.add_table("FOV_ROI_table", table=table)
+        if progress is not None:
+            progress.record_stage("tables")
+    return image
+
+
+def _skip_written_chunks(
+    writer: _ChunkWriter,
+    plan: list[_ChunkRegion],
+    blocks: list[list[tuple[int, ...]]],
+    progress: ConversionProgress,
+) -> tuple[list[_ChunkRegion], list[list[tuple[int, ...]]]]:
+    """Remove the chunks recorded as written from the plan."""
+    done = progress.chunks_done()
+    if not done:
+        return plan, blocks
+    keep = [i for i, r in enumerate(plan) if writer.on_disk_index(r) not in done]
+    return [plan[i] for i in keep], [blocks[i] for i in keep]
+
+
+def _skip_empty_chunks(array: zarr.Array) -> zarr.Array:
+    """Reopen an array so that its empty chunks (only zeros) are not written.
+
+    The chunks equal to the fill value read as such, so zarr skips them (and
+    removes them if they were written before) with `write_empty_chunks=False`.
+    """
+    return zarr.Array(
+        array.store,
+        path=array.path,
+        chunk_store=array.chunk_store,
+        write_empty_chunks=False,
+    )
+
+
+def _levels(ome_zarr_container: OmeZarrContainer) -> list[zarr.Array]:
+    """Return the arrays of the levels of the pyramid, from level 0."""
+    return [
+        _skip_empty_chunks(ome_zarr_container.get_image(path=path).zarr_array)
+        for path in ome_zarr_container.levels_paths
+    ]
 
-    # Create the well ROI
+
+def _plan_writer(
+    writer: _ChunkWriter, tiles: list[Tile] | TileCollection
+) -> tuple[list[_ChunkRegion], list[list[tuple[int, ...]]]]:
+    """Plan the chunks to write, and the blocks of tiles data each one needs."""
+    plan = _plan_chunk_writes(
+        tiles, shape=writer.shape, chunks=writer.chunks, stream=writer.stream
+    )
+    blocks = [
+        [key for i in region.tiles if (key := writer.block_key(i, region))]
+        for region in plan
+    ]
+    return plan, blocks
+
+
+def _fit_memory(
+    writer: _ChunkWriter,
+    blocks: list[list[tuple[int, ...]]],
+    levels: list[zarr.Array] | None,
+    max_memory_bytes: int,
+    num_workers: int,
+    prefetch_depth: int,
+) -> _MemoryPlan:
+    """Fit the writer settings in a memory budget (see `_plan_memory`).
+
+    The levels are given if the pyramid is built incrementally.
+    """
+    block_bytes = {key: writer.block_nbytes(key) for unit in blocks for key in unit}
+    chunk_bytes = int(np.prod(writer.chunks)) * np.dtype(writer.dtype).itemsize
+    # The chunk assembled, and the block zoomed for the pyramid
+    worker_bytes = 2 * chunk_bytes + max(
+        (sum(block_bytes[key] for key in unit) for unit in blocks), default=0
+    )
+    pyramid_bytes = 0
+    if levels is not None:
+        pyramid_bytes = _pyramid_buffer_bytes(levels, stream=writer.stream)
+    memory_plan = _plan_memory(
+        max_memory_bytes,
+        worker_bytes=worker_bytes,
+        block_bytes=max(block_bytes.values(), default=0),
+        pyramid_bytes=pyramid_bytes,
+        num_workers=num_workers,
+        prefetch_depth=prefetch_depth,
+    )
+    logger.info(f"Memory plan of {writer.image}: {memory_plan}")
+    return memory_plan
+
+
+def _write_chunks(
+    writer: _ChunkWriter,
+    plan: list[_ChunkRegion],
+    blocks: list[list[tuple[int, ...]]],
+    num_workers: int,
+    max_cache_bytes: int,
+    prefetch_depth: int,
+) -> None:
+    """Assemble and write the planned chunks, loading the tiles data once."""
+    with TileDataCache(
+        writer.load,  # type: ignore[arg-type]
+        work_units=blocks,
+        max_bytes=max_cache_bytes,
+        prefetch_depth=prefetch_depth,
+        num_loaders=num_workers,
+        serialize_loads=num_workers == 1,
+    ) as cache:
+        if num_workers == 1:
+            for index, region in enumerate(plan):
+                writer.write(region, index, blocks[index], cache)
+        else:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [
+                    executor.submit(writer.write, region, index, blocks[index], cache)
+                    for index, region in enumerate(plan)
+                ]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
+    logger.info(f"Tiles of {writer.image} written: {cache.stats.summary()}")
+
+
+def _set_channel_percentiles(
+    ome_zarr_container: OmeZarrContainer, histograms: ChannelHistograms | None
+) -> None:
+    """Set the 1 and 99.9 percentiles of the channels as their contrast limits.
+
+    They are computed from the histograms if given, otherwise from the lowest
+    resolution level of the pyramid.
+    """
+    if histograms is None:
+        ome_zarr_container.set_channel_percentiles(
+            start_percentile=1, end_percentile=99.9
+        )
+    else:
+        starts, ends = histograms.percentiles(1, 99.9)
+        _set_channel_windows(ome_zarr_container, starts, ends)
+
+
+def fov_roi_table(
+    tiles: list[Tile] | TileCollection,
+    pixel_size: PixelSize,
+    shapes: dict[int, tuple[int, ...]] | None = None,
+) -> RoiTable:
+    """Build the table of the ROIs of the tiles.
+
+    Args:
+        tiles (list[Tile] | TileCollection): The tiles, in pixel space.
+        pixel_size (PixelSize): The pixel size of the image.
+        shapes (dict[int, tuple[int, ...]] | None): The (t, c, z, y, x) shape
+            of the loaded tiles, which can be off by one pixel from the tile
+            shape (see `Tile.load`). The tile shape is used for the others.
+    """
+    shapes = shapes or {}
     _fov_rois = []
     for i, tile in enumerate(tiles):
-        # Create the ROI for the tile
-        # Load the whole tile and set the data in the image
-        tile_data = tile.load()
-        _, _, s_z, s_y, s_x = tile_data.shape
-
-        tile_data = tile_data[0] if squeeze_t else tile_data
+        _, _, s_z, s_y, s_x = shapes.get(i, tile.shape)
         roi_pix = RoiPixels(
             name=f"FOV_{i}",
             x=int(tile.top_l.x),
@@ -139,32 +980,223 @@ def write_tiles_as_rois(ome_zarr_container: OmeZarrContainer, tiles: list[Tile])
             z_length=s_z,
             **tile.origin._asdict(),
         )
-        roi = roi_pix.to_roi(pixel_size=pixel_size)
-        _fov_rois.append(roi)
-        image.set_roi(roi=roi, patch=tile_data)
+        _fov_rois.append(roi_pix.to_roi(pixel_size=pixel_size))
+    return RoiTable(rois=_fov_rois)
 
-    # Set order to 0 if the image has the time axis
-    order = 1 if squeeze_t else 0
-    image.consolidate(order=order)
-    ome_zarr_container.set_channel_percentiles(start_percentile=1, end_percentile=99.9)
-    table = RoiTable(rois=_fov_rois)
-    ome_zarr_container.add_table("FOV_ROI_table", table=table)
+
+def write_tiles_region(
+    ome_zarr_container: OmeZarrContainer,
+    tiles: list[Tile] | TileCollection,
+    start: Sequence[int],
+    stop: Sequence[int],
+    num_workers: int = 1,
+    max_cache_bytes: int = _DEFAULT_MAX_CACHE_BYTES,
+    prefetch_depth: int = 2,
+    max_memory_bytes: int | None = None,
+    progress: ConversionProgress | None = None,
+) -> None:
+    """Write the chunks of level 0 in a region of the image, from the tiles.
+
+    This writes a part of an image split in work units (see
+    `plan_work_units`): the region must be aligned with the chunks, so that the
+    work units never write the same chunk, and the tiles must include all the
+    tiles overlapping the region, in the order they are written. The other
+    levels, the percentiles and the tables are left to
+    `finalize_ome_zarr_image`, once all the regions are written.
+
+    Args:
+        ome_zarr_container (OmeZarrContainer): The container of the image.
+        tiles (list[Tile] | TileCollection): The tiles, in pixel space.
+        start (Sequence[int]): The (t, c, z, y, x) start of the region.
+        stop (Sequence[int]): The (t, c, z, y, x) stop of the region.
+        num_workers (int): The number of threads writing the chunks.
+        max_cache_bytes (int): The maximum size of the loaded tiles data kept in
+            memory.
+        prefetch_depth (int): The number of tiles (or blocks) loaded ahead.
+        max_memory_bytes (int | None): The memory budget of the writer.
+        progress (ConversionProgress | None): The progress manifest of the
+            conversion, to record the written chunks in and skip those already
+            recorded.
+    """
+    if num_workers < 1:
+        raise ValueError("The number of workers must be at least 1.")
+    image = ome_zarr_container.get_image()
+    writer = _ChunkWriter(image, tiles, squeeze_t=not ome_zarr_container.is_time_series)
+    writer.progress = progress
+    plan, blocks = _plan_writer(writer, tiles)
+    inside = [
+        i
+        for i, region in enumerate(plan)
+        if all(a <= r < b for a, r, b in zip(start, region.start, stop, strict=True))
+    ]
+    plan = [plan[i] for i in inside]
+    blocks = [blocks[i] for i in inside]
+    if progress is not None:
+        plan, blocks = _skip_written_chunks(writer, plan, blocks, progress)
+    if max_memory_bytes is not None:
+        memory_plan = _fit_memory(
+            writer,
+            blocks,
+            levels=None,
+            max_memory_bytes=max_memory_bytes,
+            num_workers=num_workers,
+            prefetch_depth=prefetch_depth,
+        )
+        num_workers = memory_plan.num_workers
+        prefetch_depth = memory_plan.prefetch_depth
+        max_cache_bytes = memory_plan.max_cache_bytes
+    _write_chunks(
+        writer,
+        plan,
+        blocks,
+        num_workers=num_workers,
+        max_cache_bytes=max_cache_bytes,
+        prefetch_depth=prefetch_depth,
+    )
+
+
+def finalize_ome_zarr_image(
+    ome_zarr_container: OmeZarrContainer,
+    pyramid_mode: Literal["incremental", "consolidate"] = "incremental",
+    percentile_mode: Literal["histogram", "sample"] = "sample",
+    num_workers: int = 1,
+    build_pyramid: bool = True,
+    histograms: ChannelHistograms | None = None,
+    progress: ConversionProgress | None = None,
+) -> Image:
+    """Build the pyramid and the percentiles of an image once level 0 is written.
+
+    Level 0 is read back once, chunk by chunk: the chunks are added to a
+    `PyramidBuilder` and counted in the `ChannelHistograms`, so the result is
+    the same as when they are built while writing (see `write_tiles_as_rois`).
+    Level 0 is not read back if the pyramid and the histograms are not needed.
+
+    Args:
+        ome_zarr_container (OmeZarrContainer): The container of the image.
+        pyramid_mode (Literal["incremental", "consolidate"]): How the other
+            levels of the pyramid are built.
+        percentile_mode (Literal["histogram", "sample"]): How the percentiles
+            of the channels are computed.
+        num_workers (int): The number of threads reading level 0.
+        build_pyramid (bool): Whether to build the pyramid, False if it was
+            already built while writing level 0.
+        histograms (ChannelHistograms | None): The histograms of the channels
+            counted while writing level 0, if any.
+        progress (ConversionProgress | None): The progress manifest of the
+            conversion. The stages already recorded in it are skipped, and the
+            stages completed are recorded.
+    """
+    if pyramid_mode not in ("incremental", "consolidate"):
+        raise ValueError(f"Unknown pyramid mode: {pyramid_mode}")
+    if percentile_mode not in ("histogram", "sample"):
+        raise ValueError(f"Unknown percentile mode: {percentile_mode}")
+
+    image = ome_zarr_container.get_image()
+    squeeze_t = not ome_zarr_container.is_time_series
+    order: Literal[0, 1] = 1 if squeeze_t else 0
+    stages = progress.stages() if progress is not None else set()
+    build_pyramid = build_pyramid and "pyramid" not in stages
+    set_percentiles = "percentiles" not in stages
+    count_values = (
+        set_percentiles and percentile_mode == "histogram" and histograms is None
+    )
+    levels = _levels(ome_zarr_container)
+    level_0 = levels[0]
+    indices = list(
+        itertools.product(
+            *(
+                range(-(-s // c))
+                for s, c in zip(level_0.shape, level_0.chunks, strict=True)
+            )
+        )
+    )
+    pyramid = None
+    if (
+        build_pyramid
+        and pyramid_mode == "incremental"
+        and PyramidBuilder.is_supported(levels)
+    ):
+        pyramid = PyramidBuilder(levels, written_chunks=indices, order=order)
+    counted = None
+    if count_values:
+        num_channels = level_0.shape[0 if squeeze_t else 1]
+        counted = ChannelHistograms(num_channels, dtype=level_0.dtype)
+
+    def read_chunk(index: tuple[int, ...]) -> None:
+        start = tuple(i * c for i, c in zip(index, level_0.chunks, strict=True))
+        region = tuple(
+            slice(a, min(a + c, s))
+            for a, c, s in zip(start, level_0.chunks, level_0.shape, strict=True)
+        )
+        data = level_0[region]
+        if counted is not None:
+            if squeeze_t:
+                counted.add(start[0], data[None])
+            else:
+                counted.add(start[1], data)
+        if pyramid is not None:
+            pyramid.add(start, data)
+
+    if pyramid is not None or counted is not None:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            for _ in executor.map(read_chunk, indices):
+                pass
+
+    if build_pyramid and pyramid is None:
+        image.consolidate(order=order)
+    if progress is not None and "pyramid" not in stages:
+        progress.record_stage("pyramid")
+    if set_percentiles:
+        if percentile_mode == "histogram":
+            histograms = histograms if histograms is not None else counted
+        else:
+            histograms = None
+        _set_channel_percentiles(ome_zarr_container, histograms)
+        if progress is not None:
+            progress.record_stage("percentiles")
     return image
 
 
-def write_tiled_image(
+def init_tiled_image(
     zarr_url: Path | str,
     tiled_image: TiledImage,
-    stiching_pipe: Callable[[list[Tile]], list[Tile]],
+    stiching_pipe: Callable[[TileCollection], TileCollection],
     num_levels: int = 5,
     max_xy_chunk: int = 4096,
     z_chunk: int = 10,
     c_chunk: int = 1,
     t_chunk: int = 1,
     overwrite: bool = False,
-) -> dict[str, bool]:
-    """Build a tiled ome-zarr image from a TiledImage object."""
+    chunking_mode: Literal["fixed", "auto"] = "fixed",
+    target_chunk_bytes: int = _DEFAULT_TARGET_CHUNK_BYTES,
+    compression: CompressionCodec = "default",
+    compression_level: int = 5,
+    shuffle: ShuffleMode = "shuffle",
+    max_memory_bytes: int | None = None,
+) -> tuple[OmeZarrContainer, TileCollection]:
+    """Stitch the tiles of a TiledImage, and create its empty ome-zarr image.
+
+    The well ROI table is added to the image, and an empty progress manifest
+    (see `ConversionProgress`). If the image has a progress manifest, its
+    conversion was interrupted: unless `overwrite` is set, the image is opened
+    to resume the conversion instead of created again.
+
+    With a memory budget (`max_memory_bytes`), the target size of the chunks in
+    the "auto" chunking mode is reduced to fit several chunks in the budget.
+
+    Returns:
+        tuple[OmeZarrContainer, TileCollection]: The container of the image,
+            and the stitched tiles in pixel space.
+    """
     tiles = apply_stitching_pipe(tiled_image, stiching_pipe)
+    progress = ConversionProgress(zarr_url)
+    if not overwrite and progress.exists():
+        logger.info(f"Resuming the interrupted conversion of {zarr_url}.")
+        return open_ome_zarr_container(zarr_url), tiles
+    if max_memory_bytes is not None:
+        target_chunk_bytes = min(
+            target_chunk_bytes, max_memory_bytes // _CHUNKS_PER_MEMORY_BUDGET
+        )
 
     zarr_url = Path(zarr_url)
     zarr_url.mkdir(parents=True, exist_ok=True)
@@ -185,12 +1217,80 @@ def write_tiled_image(
         c_chunk=c_chunk,
         t_chunk=t_chunk,
         overwrite=overwrite,
+        chunking_mode=chunking_mode,
+        target_chunk_bytes=target_chunk_bytes,
+        compression=compression,
+        compression_level=compression_level,
+        shuffle=shuffle,
     )
+    progress.start()
     well_roi = ome_zarr_container.build_image_roi_table("Well")
     ome_zarr_container.add_table("well_ROI_table", table=well_roi)
+    return ome_zarr_container, tiles
+
+
+def write_tiled_image(
+    zarr_url: Path | str,
+    tiled_image: TiledImage,
+    stiching_pipe: Callable[[TileCollection], TileCollection],
+    num_levels: int = 5,
+    max_xy_chunk: int = 4096,
+    z_chunk: int = 10,
+    c_chunk: int = 1,
+    t_chunk: int = 1,
+    overwrite: bool = False,
+    num_workers: int = 1,
+    prefetch_depth: int = 2,
+    pyramid_mode: Literal["incremental", "consolidate"] = "incremental",
+    percentile_mode: Literal["histogram", "sample"] = "sample",
+    chunking_mode: Literal["fixed", "auto"] = "fixed",
+    target_chunk_bytes: int = _DEFAULT_TARGET_CHUNK_BYTES,
+    compression: CompressionCodec = "default",
+    compression_level: int = 5,
+    shuffle: ShuffleMode = "shuffle",
+    max_memory_bytes: int | None = None,
+) -> dict[str, bool]:
+    """Build a tiled ome-zarr image from a TiledImage object.
+
+    The progress of the conversion is recorded in the image until it is
+    finalized, so that an interrupted conversion is resumed by a new one with
+    `overwrite` unset, skipping the chunks and the stages already written.
+
+    With a memory budget (`max_memory_bytes`), the chunks and the writer
+    settings are fitted to it (see `init_tiled_image` and
+    `write_tiles_as_rois`).
+    """
+    ome_zarr_container, tiles = init_tiled_image(
+        zarr_url=zarr_url,
+        tiled_image=tiled_image,
+        stiching_pipe=stiching_pipe,
+        num_levels=num_levels,
+        max_xy_chunk=max_xy_chunk,
+        z_chunk=z_chunk,
+        c_chunk=c_chunk,
+        t_chunk=t_chunk,
+        overwrite=overwrite,
+        chunking_mode=chunking_mode,
+        target_chunk_bytes=target_chunk_bytes,
+        compression=compression,
+        compression_level=compression_level,
+        shuffle=shuffle,
+        max_memory_bytes=max_memory_bytes,
+    )
+    progress = ConversionProgress(zarr_url)
 
     # Write the tiles as ROIs in the image
-    image = write_tiles_as_rois(ome_zarr_container=ome_zarr_container, tiles=tiles)
+    image = write_tiles_as_rois(
+        ome_zarr_container=ome_zarr_container,
+        tiles=tiles,
+        num_workers=num_workers,
+        prefetch_depth=prefetch_depth,
+        pyramid_mode=pyramid_mode,
+        percentile_mode=percentile_mode,
+        max_memory_bytes=max_memory_bytes,
+        progress=progress,
+    )
+    progress.clear()
 
     im_list_types = {"is_3D": image.is_3d, "has_time": image.is_time_series}
     return im_list_types
@@ -1,9 +1,25 @@
-"""Utils for serializing and deserializing tiled images to/from pickle files."""
+"""Utils for serializing and deserializing tiled images to/from pickle files.
+
+The tiled images of a conversion are stored in a single manifest file, to
+avoid creating one small file per compute task. The manifest holds:
+
+- a header: a magic string and the number of tiled images `n`,
+- the `n + 1` byte offsets of the records (little endian uint64),
+- the records, each a pickled TiledImage.
+
+A compute task memory-maps the manifest and unpickles only its own record.
+Once done, it creates a marker file for its record in the `<manifest>.done`
+directory, and the task completing the last record removes the manifest.
+"""
 
 import logging
+import mmap
 import os
 import pickle
+import shutil
+import struct
 import time
+from collections.abc import Sequence
 from pathlib import Path
 from uuid import uuid4
 
@@ -11,6 +27,10 @@ from ome_zarr_converters_tools._tiled_image import TiledImage
 
 logger = logging.getLogger(__name__)
 
+_MANIFEST_MAGIC = b"OZCTMAN1"
+_MANIFEST_HEADER = struct.Struct("<8sQ")
+_OFFSET = struct.Struct("<Q")
+
 
 def create_pkl(pickle_dir: Path, tiled_image: TiledImage) -> Path:
     """Create a pickle file for the tiled image."""
@@ -23,11 +43,77 @@ def create_pkl(pickle_dir: Path, tiled_image: TiledImage) -> Path:
     return tile_pickle_path
 
 
-def load_tiled_image(pickle_path: Path) -> TiledImage:
+def create_manifest(pickle_dir: Path, tiled_images: Sequence[TiledImage]) -> Path:
+    """Create a manifest file holding all the tiled images.
+
+    The records are pickled and written one at a time, and the offsets are
+    written once all the records are. The file is only moved to its final
+    path once complete and synced, so the compute tasks never see a partial
+    manifest.
+
+    Args:
+        pickle_dir (Path): The directory of the manifest.
+        tiled_images (Sequence[TiledImage]): The tiled images, a compute task
+            loads one by its index in this order.
+
+    Returns:
+        Path: The path of the manifest.
+    """
+    pickle_dir.mkdir(parents=True, exist_ok=True)
+    num_records = len(tiled_images)
+    offsets_start = _MANIFEST_HEADER.size
+    offsets = [offsets_start + _OFFSET.size * (num_records + 1)]
+
+    manifest_path = pickle_dir / f"{uuid4()}.manifest"
+    partial_path = manifest_path.with_suffix(".partial")
+    with open(partial_path, "wb") as f:
+        f.seek(offsets[0])
+        for tiled_image in tiled_images:
+            offsets.append(offsets[-1] + f.write(pickle.dumps(tiled_image)))
+        f.seek(0)
+        f.write(_MANIFEST_HEADER.pack(_MANIFEST_MAGIC, num_records))
+        f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial_path, manifest_path)
+
+    logger.info(f"Manifest of {num_records} tiled images created: {manifest_path}")
+    return manifest_path
+
+
+def _read_header(buffer: bytes | mmap.mmap, manifest_path: Path) -> int:
+    """Check the header of a manifest and return its number of records."""
+    magic, num_records = _MANIFEST_HEADER.unpack_from(buffer, 0)
+    if magic != _MANIFEST_MAGIC:
+        raise ValueError(f"Not a manifest of tiled images: {manifest_path}")
+    return int(num_records)
+
+
+def _load_record(manifest_path: Path, index: int) -> object:
+    """Unpickle a record of a manifest, reading only its bytes."""
+    with (
+        open(manifest_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        num_records = _read_header(buffer, manifest_path)
+        if not 0 <= index < num_records:
+            raise IndexError(
+                f"Index {index} out of range for the {num_records} tiled images "
+                f"of {manifest_path}"
+            )
+        position = _MANIFEST_HEADER.size + _OFFSET.size * index
+        (start,) = _OFFSET.unpack_from(buffer, position)
+        (stop,) = _OFFSET.unpack_from(buffer, position + _OFFSET.size)
+        return pickle.loads(buffer[start:stop])
+
+
+def load_tiled_image(pickle_path: Path, index: int | None = None) -> TiledImage:
     """Load the pickled TiledImage object.
 
     Args:
-        pickle_path (Path): Path to the pickled file.
+        pickle_path (Path): Path to the pickled file, or to the manifest.
+        index (int | None): The index of the TiledImage in the manifest. If
+            None, `pickle_path` is a single pickled TiledImage.
 
     Returns:
         TiledImage: The loaded TiledImage object.
@@ -39,12 +125,15 @@ def load_tiled_image(pickle_path: Path) -> TiledImage:
 
     for t in range(num_retries):
         try:
-            with open(pickle_path, "rb") as f:
-                tiled_image = pickle.load(f)
-                if not isinstance(tiled_image, TiledImage):
-                    raise ValueError(
-                        f"Pickled object is not a TiledImage: {type(tiled_image)}"
-                    )
+            if index is None:
+                with open(pickle_path, "rb") as f:
+                    tiled_image = pickle.load(f)
+            else:
+                tiled_image = _load_record(pickle_path, index)
+            if not isinstance(tiled_image, TiledImage):
+                raise ValueError(
+                    f"Pickled object is not a TiledImage: {type(tiled_image)}"
+                )
             return tiled_image
         except FileNotFoundError:
             logger.error(f"Pickled file does not exist: {pickle_path}")
@@ -57,14 +146,52 @@ def load_tiled_image(pickle_path: Path) -> TiledImage:
     )
 
 
-def remove_pkl(pickle_path: Path):
+def _done_dir(manifest_path: Path) -> Path:
+    return manifest_path.with_suffix(".done")
+
+
+def remove_manifest_record(manifest_path: Path, index: int) -> None:
+    """Mark a record of the manifest as done, and remove the manifest once all are.
+
+    Each record is marked by creating its own marker file, so the tasks never
+    write to a shared file. The removal of the manifest is claimed with an
+    exclusive file creation, so a single task removes it.
+
+    Args:
+        manifest_path (Path): Path to the manifest.
+        index (int): The index of the record done.
+    """
+    try:
+        with open(manifest_path, "rb") as f:
+            num_records = _read_header(f.read(_MANIFEST_HEADER.size), manifest_path)
+    except FileNotFoundError:
+        # Removed by the compute task of another record
+        return
+    done_dir = _done_dir(manifest_path)
+    done_dir.mkdir(exist_ok=True)
+    (done_dir / f"{index}.done").touch()
+    # A single listing of the markers, rather than a lookup per record
+    num_done = sum(name.endswith(".done") for name in os.listdir(done_dir))
+    if num_done < num_records:
+        return
+    try:
+        fd = os.open(done_dir / "remove.claim", os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        # Removed by the compute task of another record
+        return
+    os.close(fd)
+    shutil.rmtree(done_dir, ignore_errors=True)
+    remove_pkl(manifest_path)
+
+
+def remove_pkl(pickle_path: Path) -> None:
     """Clean up the pickled file and the directory if it is empty.
 
     Args:
         pickle_path (Path): Path to the pickled file.
     """
     try:
-        pickle_path.unlink()
+        pickle_path.unlink(missing_ok=True)
         if not list(pickle_path.parent.iterdir()):
             # Remove the parent directory if it is empty
             pickle_path.parent.rmdir()
@@ -78,13 +205,11 @@ def remove_pkl(pickle_path: Path):
         )
 
 
-def remove_pkl_dir(pickle_dir: Path):
+def remove_pkl_dir(pickle_dir: Path) -> None:
     """Remove the directory containing the pickled files."""
     try:
         if pickle_dir.exists():
-            for pkl_file in pickle_dir.iterdir():
-                pkl_file.unlink()
-            pickle_dir.rmdir()
+            shutil.rmtree(pickle_dir)
     except Exception as e:
         logger.error(
             f"An error occurred while removing the pickled directory: {e} "
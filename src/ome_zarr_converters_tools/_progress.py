@@ -0,0 +1,87 @@
+"""Progress manifest of a conversion, to resume it after a failure."""
+
+import logging
+import shutil
+import threading
+from pathlib import Path
+from typing import Literal
+
+logger = logging.getLogger(__name__)
+
+Stage = Literal["tiles", "pyramid", "percentiles", "tables"]
+
+STAGES: tuple[Stage, ...] = ("tiles", "pyramid", "percentiles", "tables")
+
+# The directory, inside the image, holding the progress manifest
+_PROGRESS_DIR = ".conversion_progress"
+
+
+class ConversionProgress:
+    """The progress of the conversion of an image, stored inside the image.
+
+    The manifest records the chunks of level 0 written and the stages of the
+    conversion completed. It exists only while the conversion is in progress:
+    it is created with the empty image and removed once the image is
+    finalized. An image with a manifest is an interrupted conversion, which
+    can be resumed.
+
+    The written chunks are appended to a log file, one line per chunk, so
+    recording a chunk is cheap and an interrupted write loses at most the
+    chunks being written. Several writers (e.g. the work units of a split
+    image) record their chunks in separate log files.
+    """
+
+    def __init__(self, zarr_url: str | Path, writer_id: str = ""):
+        """Initialize the progress of an image.
+
+        Args:
+            zarr_url (str | Path): The url of the image.
+            writer_id (str): The id of the writer, naming its chunks log file.
+        """
+        self._dir = Path(zarr_url) / _PROGRESS_DIR
+        self._chunks_log = self._dir / f"chunks{writer_id}.log"
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Check if the conversion of the image is in progress."""
+        return self._dir.exists()
+
+    def start(self) -> None:
+        """Create an empty manifest, for a new conversion."""
+        self.clear()
+        self._dir.mkdir(parents=True)
+
+    def clear(self) -> None:
+        """Remove the manifest, once the image is finalized."""
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def chunks_done(self) -> set[tuple[int, ...]]:
+        """Return the indices of the chunks of level 0 written, by all writers."""
+        done = set()
+        for log in self._dir.glob("chunks*.log"):
+            for line in log.read_text().splitlines():
+                try:
+                    done.add(tuple(int(i) for i in line.split(",")))
+                except ValueError:
+                    # A line cut by an interruption
+                    continue
+        return done
+
+    def record_chunk(self, index: tuple[int, ...]) -> None:
+        """Record that a chunk of level 0 is written."""
+        line = ",".join(str(i) for i in index) + "\n"
+        with self._lock, open(self._chunks_log, "a") as f:
+            f.write(line)
+
+    def stages(self) -> set[str]:
+        """Return the stages of the conversion completed."""
+        stages_log = self._dir / "stages.log"
+        if not stages_log.exists():
+            return set()
+        return set(stages_log.read_text().split())
+
+    def record_stage(self, stage: Stage) -> None:
+        """Record that a stage of the conversion is completed."""
+        with self._lock, open(self._dir / "stages.log", "a") as f:
+            f.write(f"{stage}\n")
+        logger.debug(f"Stage {stage} of {self._dir.parent} completed.")
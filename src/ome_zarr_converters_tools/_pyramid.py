@@ -0,0 +1,326 @@
+"""Incremental construction of the pyramid levels while level 0 is written."""
+
+import itertools
+import threading
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from typing import Literal
+
+import numpy as np
+import zarr
+from ngio.common import numpy_zoom
+
+
+def _index_range(start: int, stop: int, size: int) -> range:
+    """Return the indices of the blocks of `size` overlapping [start, stop)."""
+    if stop <= start:
+        return range(0)
+    return range(start // size, (stop - 1) // size + 1)
+
+
+def _zoomed_size(size: int, scale: float) -> int:
+    """Return the size of a block axis once zoomed (singleton axes are kept)."""
+    if size == 1:
+        return 1
+    return round(size * scale)
+
+
+class _ZoomGeometry:
+    """The blocks used to zoom a level of the pyramid into the next one.
+
+    This follows the dask implementation of the pyramid consolidation in ngio:
+    the source level is split in blocks of a size close to its chunks and
+    matching the scale, each block is zoomed independently, and the zoomed
+    blocks are stacked and cropped to the shape of the target level.
+    """
+
+    def __init__(self, source: zarr.Array, target: zarr.Array):
+        self.source_shape: tuple[int, ...] = source.shape
+        self.source_chunks: tuple[int, ...] = source.chunks
+        self.target_shape: tuple[int, ...] = target.shape
+        self.target_chunks: tuple[int, ...] = target.chunks
+        scale = np.array(target.shape) / np.array(source.shape)
+        blocks = np.maximum(1, np.round(np.array(source.chunks) * scale) / scale)
+        blocks = blocks.astype(int)
+        self.scale = scale
+        self.blocks: tuple[int, ...] = tuple(int(b) for b in blocks)
+        self.block_out: tuple[int, ...] = tuple(
+            int(b) for b in np.ceil(blocks * scale).astype(int)
+        )
+
+    def is_supported(self) -> bool:
+        """Check if the zoomed blocks tile the target level without gaps.
+
+        Otherwise the zoomed blocks do not land where the dask implementation
+        expects them, and the pyramid must be consolidated from level 0.
+        """
+        for source, block, out, target, scale in zip(
+            self.source_shape,
+            self.blocks,
+            self.block_out,
+            self.target_shape,
+            self.scale,
+            strict=True,
+        ):
+            covered = 0
+            for k in range(-(-source // block)):
+                if k * out >= target:
+                    break
+                size = _zoomed_size(min(block, source - k * block), scale)
+                last = (k + 1) * block >= source
+                if size != out and not last:
+                    return False
+                covered += min(size, target - k * out)
+            if covered != target:
+                return False
+        return True
+
+    def blocks_of_source_chunk(self, index: tuple[int, ...]) -> list[tuple[int, ...]]:
+        """Return the blocks overlapping a chunk of the source level."""
+        ranges = [
+            _index_range(i * c, min((i + 1) * c, s), b)
+            for i, c, s, b in zip(
+                index, self.source_chunks, self.source_shape, self.blocks, strict=True
+            )
+        ]
+        return list(itertools.product(*ranges))
+
+    def block_source(self, index: tuple[int, ...]) -> tuple[slice, ...]:
+        """Return the region of the source level zoomed by a block."""
+        return tuple(
+            slice(k * b, min((k + 1) * b, s))
+            for k, b, s in zip(index, self.blocks, self.source_shape, strict=True)
+        )
+
+    def block_target(self, index: tuple[int, ...]) -> tuple[slice, ...]:
+        """Return the region of the target level covered by a zoomed block."""
+        region = []
+        for k, block, out, source, target, scale in zip(
+            index,
+            self.blocks,
+            self.block_out,
+            self.source_shape,
+            self.target_shape,
+            self.scale,
+            strict=True,
+        ):
+            size = _zoomed_size(min(block, source - k * block), scale)
+            start = min(k * out, target)
+            region.append(slice(start, min(start + size, target)))
+        return tuple(region)
+
+
+def _chunks_of_region(
+    region: tuple[slice, ...], chunks: tuple[int, ...]
+) -> list[tuple[int, ...]]:
+    """Return the chunks overlapping a region."""
+    ranges = [
+        _index_range(s.start, s.stop, c) for s, c in zip(region, chunks, strict=True)
+    ]
+    return list(itertools.product(*ranges))
+
+
+def _chunk_region(
+    index: tuple[int, ...], chunks: tuple[int, ...], shape: tuple[int, ...]
+) -> tuple[slice, ...]:
+    return tuple(
+        slice(i * c, min((i + 1) * c, s))
+        for i, c, s in zip(index, chunks, shape, strict=True)
+    )
+
+
+def _paste(
+    dst: np.ndarray,
+    dst_region: tuple[slice, ...],
+    src: np.ndarray,
+    src_region: tuple[slice, ...],
+) -> None:
+    """Copy the overlap of two regions, in the same coordinates, from src to dst."""
+    dst_slices, src_slices = [], []
+    for d, s in zip(dst_region, src_region, strict=True):
+        low, high = max(d.start, s.start), min(d.stop, s.stop)
+        if low >= high:
+            return None
+        dst_slices.append(slice(low - d.start, high - d.start))
+        src_slices.append(slice(low - s.start, high - s.start))
+    dst[tuple(dst_slices)] = src[tuple(src_slices)]
+
+
+class PyramidBuilder:
+    """Build the pyramid levels from the chunks of level 0, as they are written.
+
+    Each level is built from the previous one in blocks, exactly as
+    `Image.consolidate` does with dask, but from the chunks in memory instead
+    of reading level 0 back from the storage. A block is zoomed as soon as all
+    the chunks it overlaps are written: the blocks aligned with the chunks are
+    zoomed right away, the blocks on the seams between chunks wait for the
+    neighbouring chunks. A chunk of a level is written once all the blocks
+    covering it are zoomed, and is in turn used to build the next level.
+
+    The chunks of level 0 never added are empty (zeros). The empty chunks of
+    the other levels are not written if the arrays are opened with
+    `write_empty_chunks=False`, since they read as zeros.
+
+    The builder is thread safe, the chunks can be added from several writers.
+    """
+
+    def __init__(
+        self,
+        levels: Sequence[zarr.Array],
+        written_chunks: Iterable[tuple[int, ...]],
+        order: Literal[0, 1, 2] = 1,
+    ):
+        """Initialize the builder.
+
+        Args:
+            levels (Sequence[zarr.Array]): The arrays of the pyramid levels,
+                from level 0.
+            written_chunks (Iterable[tuple[int, ...]]): The indices of the
+                chunks of level 0 that will be added.
+            order (Literal[0, 1, 2]): The order of the interpolation.
+        """
+        self._levels = list(levels)
+        self._order = order
+        self._geometries = [
+            _ZoomGeometry(source, target)
+            for source, target in itertools.pairwise(self._levels)
+        ]
+        self._lock = threading.Lock()
+
+        num_zooms = len(self._geometries)
+        # The data of the chunks of each level still needed by a block
+        self._sources: list[dict[tuple[int, ...], np.ndarray]] = [
+            {} for _ in range(num_zooms)
+        ]
+        # The number of blocks still to zoom using each chunk
+        self._source_users: list[Counter[tuple[int, ...]]] = []
+        # The number of chunks still missing to zoom each block
+        self._missing_sources: list[Counter[tuple[int, ...]]] = []
+        # The number of blocks still to zoom to complete each chunk of a level
+        self._missing_blocks: list[Counter[tuple[int, ...]]] = []
+        self._targets: list[dict[tuple[int, ...], np.ndarray]] = [
+            {} for _ in range(num_zooms)
+        ]
+
+        written = set(written_chunks)
+        for geometry in self._geometries:
+            users: Counter[tuple[int, ...]] = Counter()
+            missing: Counter[tuple[int, ...]] = Counter()
+            for index in written:
+                blocks = geometry.blocks_of_source_chunk(index)
+                users[index] = len(blocks)
+                missing.update(blocks)
+            missing_blocks: Counter[tuple[int, ...]] = Counter()
+            for block in missing:
+                region = geometry.block_target(block)
+                missing_blocks.update(_chunks_of_region(region, geometry.target_chunks))
+            self._source_users.append(users)
+            self._missing_sources.append(missing)
+            self._missing_blocks.append(missing_blocks)
+            written = set(missing_blocks)
+
+    @staticmethod
+    def is_supported(levels: Sequence[zarr.Array]) -> bool:
+        """Check if the pyramid of the given levels can be built incrementally."""
+        return all(
+            _ZoomGeometry(source, target).is_supported()
+            for source, target in itertools.pairwise(levels)
+        )
+
+    @property
+    def done(self) -> bool:
+        """Check if all the chunks of all the levels were written."""
+        return not any(self._missing_blocks)
+
+    def add(self, start: tuple[int, ...], data: np.ndarray) -> None:
+        """Add a chunk of level 0, once written.
+
+        Args:
+            start (tuple[int, ...]): The start of the chunk in level 0.
+            data (np.ndarray): The data of the whole chunk.
+        """
+        chunks = self._levels[0].chunks
+        index = tuple(a // c for a, c in zip(start, chunks, strict=True))
+        self._add(0, index, data)
+
+    def _add(self, level: int, index: tuple[int, ...], data: np.ndarray) -> None:
+        """Add a written chunk of a level, and zoom the blocks it completes."""
+        if level >= len(self._geometries):
+            return None
+
+        geometry = self._geometries[level]
+        ready = []
+        with self._lock:
+            self._sources[level][index] = data
+            missing = self._missing_sources[level]
+            for block in geometry.blocks_of_source_chunk(index):
+                missing[block] -= 1
+                if missing[block] == 0:
+                    del missing[block]
+                    ready.append((block, self._assemble_block(level, block)))
+
+        for block, source in ready:
+            if any(s.start >= s.stop for s in geometry.block_target(block)):
+                # The zoomed block is cropped out of the next level
+                continue
+            zoomed = numpy_zoom(source, scale=tuple(geometry.scale), order=self._order)
+            for chunk, chunk_data in self._add_block(level, block, zoomed):
+                region = _chunk_region(
+                    chunk, geometry.target_chunks, geometry.target_shape
+                )
+                self._levels[level + 1][region] = chunk_data
+                self._add(level + 1, chunk, chunk_data)
+
+    def _assemble_block(self, level: int, block: tuple[int, ...]) -> np.ndarray:
+        """Assemble the source data of a block, and release the chunks used."""
+        geometry = self._geometries[level]
+        region = geometry.block_source(block)
+        source = np.zeros(
+            tuple(s.stop - s.start for s in region), dtype=self._levels[level].dtype
+        )
+        sources, users = self._sources[level], self._source_users[level]
+        for chunk in _chunks_of_region(region, geometry.source_chunks):
+            data = sources.get(chunk)
+            if data is None:
+                # An empty chunk
+                continue
+            chunk_region = _chunk_region(
+                chunk, geometry.source_chunks, geometry.source_shape
+            )
+            _paste(source, region, data, chunk_region)
+            users[chunk] -= 1
+            if users[chunk] == 0:
+                del users[chunk]
+                del sources[chunk]
+        return source
+
+    def _add_block(
+        self, level: int, block: tuple[int, ...], zoomed: np.ndarray
+    ) -> list[tuple[tuple[int, ...], np.ndarray]]:
+        """Paste a zoomed block in the next level, and return the chunks completed."""
+        geometry = self._geometries[level]
+        region = geometry.block_target(block)
+        zoomed_region = tuple(
+            slice(s.start, s.start + size)
+            for s, size in zip(region, zoomed.shape, strict=True)
+        )
+        completed = []
+        with self._lock:
+            targets, missing = self._targets[level], self._missing_blocks[level]
+            for chunk in _chunks_of_region(region, geometry.target_chunks):
+                chunk_region = _chunk_region(
+                    chunk, geometry.target_chunks, geometry.target_shape
+                )
+                data = targets.get(chunk)
+                if data is None:
+                    data = np.zeros(
+                        tuple(s.stop - s.start for s in chunk_region),
+                        dtype=self._levels[level + 1].dtype,
+                    )
+                    targets[chunk] = data
+                _paste(data, chunk_region, zoomed, zoomed_region)
+                missing[chunk] -= 1
+                if missing[chunk] == 0:
+                    del missing[chunk]
+                    completed.append((chunk, targets.pop(chunk)))
+        return completed
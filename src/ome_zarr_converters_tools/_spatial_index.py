@@ -0,0 +1,98 @@
+"""Uniform grid hash to find the tiles overlapping in the XY plane."""
+
+import math
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+
+from ome_zarr_converters_tools._tile import Tile
+
+CellRange = tuple[int, int, int, int]
+
+
+class TileGridIndex:
+    """Spatial index of the XY bounding boxes of a list of tiles.
+
+    The XY plane is divided in square cells, and each tile is registered in all
+    the cells touched by its (closed) bounding box. Two tiles can only overlap
+    if they share at least one cell, so a query only needs to look at the tiles
+    in the cells touched by the query tile.
+
+    The tiles are identified by their position in the list used to build the
+    index, and they can be moved with `update`.
+    """
+
+    def __init__(self, tiles: Sequence[Tile], cell_size: float | None = None):
+        """Build the index.
+
+        Args:
+            tiles (Sequence[Tile]): The tiles to index.
+            cell_size (float | None): The size of the cells, by default the
+                median of the tiles XY sizes. So that each tile touches at
+                most four cells.
+        """
+        if cell_size is None:
+            cell_size = _median_tile_size(tiles)
+        if not cell_size > 0 or not math.isfinite(cell_size):
+            cell_size = 1.0
+        self._cell_size = cell_size
+        self._cells: defaultdict[tuple[int, int], set[int]] = defaultdict(set)
+        self._ranges: list[CellRange] = []
+        for idx, tile in enumerate(tiles):
+            cell_range = self._cell_range(tile)
+            self._ranges.append(cell_range)
+            for cell in _iter_cells(cell_range):
+                self._cells[cell].add(idx)
+
+    def _cell_range(self, tile: Tile) -> CellRange:
+        """Return the range of cells touched by the tile bounding box."""
+        top_l, bot_r = tile.top_l, tile.bot_r
+        return (
+            math.floor(top_l.x / self._cell_size),
+            math.floor(bot_r.x / self._cell_size),
+            math.floor(top_l.y / self._cell_size),
+            math.floor(bot_r.y / self._cell_size),
+        )
+
+    def update(self, idx: int, tile: Tile) -> None:
+        """Move the idx-th tile to the position of the given tile."""
+        old_range, new_range = self._ranges[idx], self._cell_range(tile)
+        if old_range == new_range:
+            return None
+
+        for cell in _iter_cells(old_range):
+            cell_tiles = self._cells[cell]
+            cell_tiles.discard(idx)
+            if not cell_tiles:
+                del self._cells[cell]
+        for cell in _iter_cells(new_range):
+            self._cells[cell].add(idx)
+        self._ranges[idx] = new_range
+
+    def query(self, tile: Tile) -> set[int]:
+        """Return the indices of the tiles that might overlap with the tile.
+
+        The result is a superset of the overlapping tiles, the exact check is
+        left to the caller.
+        """
+        candidates: set[int] = set()
+        for cell in _iter_cells(self._cell_range(tile)):
+            cell_tiles = self._cells.get(cell)
+            if cell_tiles:
+                candidates.update(cell_tiles)
+        return candidates
+
+
+def _median_tile_size(tiles: Sequence[Tile]) -> float:
+    """Return the median of the XY sizes of the tiles."""
+    sizes = sorted(max(tile.diag.x, tile.diag.y) for tile in tiles)
+    if not sizes:
+        return 1.0
+    return float(sizes[len(sizes) // 2])
+
+
+def _iter_cells(cell_range: CellRange) -> Iterator[tuple[int, int]]:
+    """Iterate over the cells in a range."""
+    min_x, max_x, min_y, max_y = cell_range
+    for cx in range(min_x, max_x + 1):
+        for cy in range(min_y, max_y + 1):
+            yield cx, cy
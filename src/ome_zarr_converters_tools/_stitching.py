@@ -1,6 +1,5 @@
 """Utility functions for the tiles module."""
 
-import copy
 from typing import Literal
 
 import numpy as np
@@ -8,17 +7,42 @@ import numpy as np
 from ome_zarr_converters_tools._grid_utils import (
     GridSetup,
     _find_grid_size,
+    _lattice_candidates,
+    _most_common_index,
     check_if_regular_grid,
 )
-from ome_zarr_converters_tools._tile import Point, Tile, TileSpace, Vector
+from ome_zarr_converters_tools._layout_cache import (
+    LayoutCache,
+    LayoutCacheEntry,
+    layout_fingerprint,
+)
+from ome_zarr_converters_tools._spatial_index import TileGridIndex
+from ome_zarr_converters_tools._tile import (
+    Point,
+    Tile,
+    TileSpace,
+    Vector,
+    _round_ops_array,
+)
+from ome_zarr_converters_tools._tile_collection import C, T, TileCollection, X, Y, Z
 
 
-def check_tiles_coplanar(tiles: list[Tile]) -> None:
+def check_tiles_coplanar(
+    tiles: list[Tile] | TileCollection, z_tol: float = 1e-6
+) -> None:
     """Check if all the Tiles are coplanar on the XY plane."""
+    tiles = TileCollection.from_tiles(tiles)
     if len(tiles) == 0:
         return None
 
-    if all(tiles[0].is_coplanar(tile) for tile in tiles):
+    top_l, diag = tiles.top_l, tiles.diag
+    z_ok = np.all(np.abs(top_l[:, Z] - top_l[0, Z]) <= z_tol) and np.all(
+        np.abs(diag[:, Z] - diag[0, Z]) <= z_tol
+    )
+    ct_ok = np.all(top_l[:, [C, T]] == top_l[0, [C, T]]) and np.all(
+        diag[:, [C, T]] == diag[0, [C, T]]
+    )
+    if z_ok and ct_ok:
         return None
 
     raise ValueError(
@@ -28,83 +52,94 @@ def check_tiles_coplanar(tiles: list[Tile]) -> None:
     )
 
 
-def _min_point(tiles: list[Tile]) -> Point:
-    """Find the minimum point of a list of tiles."""
-    min_x = min([tile.top_l.x for tile in tiles])
-    min_y = min([tile.top_l.y for tile in tiles])
-    return Point(min_x, min_y, z=0, c=0, t=0)
+def _offset_xy(top_l: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the x and y coordinates relative to the minimum point.
+
+    The subtraction follows the same rounding as `Point.__sub__`.
+    """
+    min_x = float(np.min(top_l[:, X]))
+    min_y = float(np.min(top_l[:, Y]))
+    return (
+        _round_ops_array(top_l[:, X], min_x, -1),
+        _round_ops_array(top_l[:, Y], min_y, -1),
+    )
+
+
+def _distance_order(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """Return the stable order of the tiles by XY distance.
+
+    The lengths are computed on Python floats as in `Vector.lengthXY`, NumPy
+    square and sqrt differ from the libm pow in the last digit for a few
+    values, and that would be enough to swap two almost equidistant tiles.
+    """
+    lengths = [
+        (x**2 + y**2) ** 0.5 for x, y in zip(dx.tolist(), dy.tolist(), strict=True)
+    ]
+    return np.argsort(np.array(lengths, dtype=np.float64), kind="stable")
 
 
-def sort_tiles_by_distance(tiles: list[Tile]) -> list[Tile]:
+def sort_tiles_by_distance(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Sort a list of tiles by distance from the origin."""
-    min_point = _min_point(tiles)
-    return sorted(tiles, key=lambda x: (x.top_l - min_point).lengthXY())
+    tiles = TileCollection.from_tiles(tiles)
+    return tiles.take(_distance_order(*_offset_xy(tiles.top_l)))
 
 
-def remove_tiles_offset_xy(tiles: list[Tile]) -> list[Tile]:
+def remove_tiles_offset_xy(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Remove the offset from a list of tiles in the XY dimensions."""
-    min_point = _min_point(tiles)
-    offset_vector = Vector(-min_point.x, -min_point.y, z=0, c=0, t=0)
-    return [tile.move_by(vec=offset_vector) for tile in tiles]
+    tiles = TileCollection.from_tiles(tiles)
+    top_l = tiles.top_l.copy()
+    top_l[:, X], top_l[:, Y] = _offset_xy(tiles.top_l)
+    # Moving by a vector with z=0 still rounds z to its own precision
+    top_l[:, Z] = _round_ops_array(top_l[:, Z], 0, 1)
+    return tiles.derive(top_l=top_l)
 
 
-def remove_tiles_offset_zt(tiles: list[Tile]) -> list[Tile]:
+def remove_tiles_offset_zt(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Remove the offset from a list of tiles in the Z and T dimensions."""
-    return [
-        tile.move_by(vec=Vector(x=0, y=0, z=-tile.top_l.z, t=-tile.top_l.t))
-        for tile in tiles
-    ]
+    tiles = TileCollection.from_tiles(tiles)
+    top_l = tiles.top_l.copy()
+    top_l[:, [Z, T]] = 0
+    return tiles.derive(top_l=top_l)
 
 
-def tiles_to_pixel_space(tiles: list[Tile]) -> list[Tile]:
+def tiles_to_pixel_space(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Convert a list of tiles from real space to pixel space."""
-    return [tile.to_pixel_space() for tile in tiles]
+    return TileCollection.from_tiles(tiles).to_pixel_space()
 
 
-def tiles_to_real_space(tiles: list[Tile]) -> list[Tile]:
+def tiles_to_real_space(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Convert a list of tiles from pixel space to real space."""
-    return [tile.to_real_space() for tile in tiles]
+    return TileCollection.from_tiles(tiles).to_real_space()
 
 
-def swap_xy_tiles(tiles: list[Tile]):
+def swap_xy_tiles(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Swap x and y of the tiles."""
-    swapped_tiles = []
-    for tile in tiles:
-        top_l = Point(
-            tile.top_l.y, tile.top_l.x, z=tile.top_l.z, c=tile.top_l.c, t=tile.top_l.t
-        )
-        diag = Vector(
-            tile.diag.y, tile.diag.x, z=tile.diag.z, c=tile.diag.c, t=tile.diag.t
-        )
-        swapped_tiles.append(tile.derive_from_diag(top_l, diag))
-    return swapped_tiles
+    tiles = TileCollection.from_tiles(tiles)
+    return tiles.derive(
+        top_l=tiles.top_l[:, [Y, X, Z, C, T]], diag=tiles.diag[:, [Y, X, Z, C, T]]
+    )
 
 
-def invert_x_tiles(tiles: list[Tile]) -> list[Tile]:
+def invert_x_tiles(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Invert the x coordinate of the tiles."""
-    inverted_tiles = []
-    for tile in tiles:
-        top_l = Point(
-            -tile.top_l.x, tile.top_l.y, z=tile.top_l.z, c=tile.top_l.c, t=tile.top_l.t
-        )
-        inverted_tiles.append(tile.derive_from_diag(top_l, tile.diag))
-    return inverted_tiles
+    tiles = TileCollection.from_tiles(tiles)
+    top_l = tiles.top_l.copy()
+    top_l[:, X] = -top_l[:, X]
+    return tiles.derive(top_l=top_l)
 
 
-def invert_y_tiles(tiles: list[Tile]) -> list[Tile]:
+def invert_y_tiles(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Invert the y coordinate of the tiles."""
-    inverted_tiles = []
-    for tile in tiles:
-        top_l = Point(
-            tile.top_l.x, -tile.top_l.y, z=tile.top_l.z, c=tile.top_l.c, t=tile.top_l.t
-        )
-        inverted_tiles.append(tile.derive_from_diag(top_l, tile.diag))
-    return inverted_tiles
+    tiles = TileCollection.from_tiles(tiles)
+    top_l = tiles.top_l.copy()
+    top_l[:, Y] = -top_l[:, Y]
+    return tiles.derive(top_l=top_l)
 
 
-def reset_tiles_origin(tiles: list[Tile]) -> list[Tile]:
+def reset_tiles_origin(tiles: list[Tile] | TileCollection) -> TileCollection:
     """Reset the tiles to their original position."""
-    return [tile.reset_origin() for tile in tiles]
+    tiles = TileCollection.from_tiles(tiles)
+    return tiles.derive(origin=tiles.top_l[:, [X, Y, Z]])
 
 
 def _remove_tile_XY_overalap(
@@ -135,62 +170,106 @@ def _remove_tile_XY_overalap(
     return best_moved_bbox
 
 
-def resolve_random_tiles_overlap(tiles: list[Tile], eps: float = 1e-6) -> list[Tile]:
-    """Remove the overlap from any list of tiles."""
-    tiles = copy.deepcopy(tiles)
+def resolve_random_tiles_overlap(
+    tiles: list[Tile] | TileCollection, eps: float = 1e-6
+) -> TileCollection:
+    """Remove the overlap from any list of tiles.
+
+    At each pass the tiles are sorted by distance from the origin, and each
+    tile moves the first of the following tiles that overlaps with it.
+    The overlap candidates are found with a spatial index, so a pass costs
+    close to O(n log n) instead of checking every pair of tiles.
+    """
+    collection = TileCollection.from_tiles(tiles)
     n_overlap = np.inf
     while n_overlap > 0:
-        tiles = sort_tiles_by_distance(tiles)
+        collection = sort_tiles_by_distance(collection)
+        tiles = collection.to_tiles()
+        top_l = collection.top_l.copy()
+        index = TileGridIndex(tiles)
         n_overlap = 0
         for i in range(len(tiles)):
             tile = tiles[i]
-            for j in range(i + 1, len(tiles)):
+            candidates = sorted(j for j in index.query(tile) if j > i)
+            for j in candidates:
                 query_tile = tiles[j]
                 if tile.is_overlappingXY(query_tile, eps=eps):
                     bbox_no = _remove_tile_XY_overalap(tile, query_tile, speed=1)
                     tiles[j] = bbox_no
+                    top_l[j] = _point_row(bbox_no.top_l)
+                    index.update(j, bbox_no)
                     n_overlap += 1
                     break
-    return tiles
+        # The tiles are only moved, so the rows (and the data loaders and
+        # indices) of the collection are kept
+        collection = collection.derive(top_l=top_l)
+    return collection
+
+
+def _point_row(point: Point) -> tuple[float, float, float, int, int]:
+    """Return the (x, y, z, c, t) row of a point in a `TileCollection`."""
+    return (point.x, point.y, point.z, point.c, point.t)
+
+
+def _closest_tile(
+    point: Point, tiles: list[Tile], candidates: list[int]
+) -> tuple[int, float]:
+    """Return the index of the first of the candidate tiles closest to the point.
+
+    Returns:
+        The index of the closest tile and its distance from the point.
+    """
+    distances = [(point - tiles[idx].top_l).lengthXY() for idx in candidates]
+    closest = int(np.argmin(distances))
+    return candidates[closest], distances[closest]
 
 
-def resolve_grid_tiles_overlap(tiles: list[Tile], grid_setup: GridSetup) -> list[Tile]:
+def resolve_grid_tiles_overlap(
+    tiles: list[Tile] | TileCollection, grid_setup: GridSetup
+) -> TileCollection:
     """Remove overlap from a list of tiles that follow a regular grid."""
-    tiles = sort_tiles_by_distance(tiles)
+    collection = sort_tiles_by_distance(tiles)
+    tiles = collection.to_tiles()
 
     z, c, t = tiles[0].top_l.z, tiles[0].top_l.c, tiles[0].top_l.t
 
-    output_tiles = []
+    # The snapped tiles keep their rows, only the top-left corner is moved
+    snapped: list[int] = []
+    top_l: list[tuple[float, float, float, int, int]] = []
     # The grid tolerance is set to 1% of the grid length
     grid_tolerance = min(grid_setup.length_x, grid_setup.length_y) / 100
-    for i in range(grid_setup.num_x):
-        for j in range(grid_setup.num_y):
-            # X-Y position in the input grid
-            x_in = i * grid_setup.offset_x
-            y_in = j * grid_setup.offset_y
-
-            # X-Y position in the output grid
-            x_out = i * grid_setup.length_x
-            y_out = j * grid_setup.length_y
-
-            # Find if a bounding box is close to the (x_in, y_in) position
-            point = Point(x_in, y_in, z=z, c=c, t=t)
-            distances = [(point - bbox.top_l).lengthXY() for bbox in tiles]
-            min_dist = np.min(distances)
-            closest_bbox = tiles[np.argmin(distances)]
-
-            if min_dist < grid_tolerance:
-                # Move the bounding box to the (x_out, y_out) position
-                top_l = Point(x_out, y_out, z=z, c=c, t=t)
-                new_tile = closest_bbox.derive_from_diag(top_l, diag=closest_bbox.diag)
-                output_tiles.append(new_tile)
-
-    if len(output_tiles) != len(tiles):
+    lattice = _lattice_candidates(
+        collection,
+        num_x=grid_setup.num_x,
+        num_y=grid_setup.num_y,
+        offset_x=grid_setup.offset_x,
+        offset_y=grid_setup.offset_y,
+        max_dist=grid_tolerance,
+    )
+    for i, j, candidates in lattice:
+        # X-Y position in the input grid
+        x_in = i * grid_setup.offset_x
+        y_in = j * grid_setup.offset_y
+
+        # X-Y position in the output grid
+        x_out = i * grid_setup.length_x
+        y_out = j * grid_setup.length_y
+
+        # Find if a bounding box is close to the (x_in, y_in) position
+        point = Point(x_in, y_in, z=z, c=c, t=t)
+        closest, min_dist = _closest_tile(point, tiles, candidates)
+
+        if min_dist < grid_tolerance:
+            # Move the bounding box to the (x_out, y_out) position
+            snapped.append(closest)
+            top_l.append((x_out, y_out, z, c, t))
+
+    if len(snapped) != len(tiles):
         raise ValueError("Something went wrong with the grid tiling resolution.")
-    return output_tiles
+    return collection.take(snapped).derive(top_l=np.array(top_l, dtype=np.float64))
 
 
-def _resolve_auto_mode(tiles: list[Tile]) -> tuple[list[Tile], str]:
+def _resolve_auto_mode(tiles: TileCollection) -> tuple[TileCollection, str]:
     """Resolve the overlap of a list of tiles."""
     error_message_or_none, grid_setup = check_if_regular_grid(tiles)
     if error_message_or_none is None:
@@ -198,7 +277,7 @@ def _resolve_auto_mode(tiles: list[Tile]) -> tuple[list[Tile], str]:
     return resolve_random_tiles_overlap(tiles), "free"
 
 
-def _resolve_grid_mode(tiles: list[Tile]) -> list[Tile]:
+def _resolve_grid_mode(tiles: TileCollection) -> TileCollection:
     """Resolve the overlap of a list of tiles."""
     error_message_or_none, grid_setup = check_if_regular_grid(tiles)
     if error_message_or_none is not None:
@@ -209,19 +288,21 @@ def _resolve_grid_mode(tiles: list[Tile]) -> list[Tile]:
     return resolve_grid_tiles_overlap(tiles, grid_setup)
 
 
-def _resolve_free_mode(tiles: list[Tile]) -> list[Tile]:
+def _resolve_free_mode(tiles: TileCollection) -> TileCollection:
     """Resolve the overlap of a list of tiles."""
     return resolve_random_tiles_overlap(tiles)
 
 
 def resolve_tiles_overlap(
-    tiles: list[Tile],
+    tiles: list[Tile] | TileCollection,
     mode: Literal["auto", "grid", "free", "none"] = "auto",
-) -> tuple[list[Tile], str]:
+) -> tuple[TileCollection, str]:
     """Remove the overlap from any list of tiles."""
     if mode not in ["auto", "grid", "free", "none"]:
         raise ValueError("Mode must be 'auto', 'grid', 'free', or 'none'")
 
+    tiles = TileCollection.from_tiles(tiles)
+
     match mode:
         case "auto":
             return _resolve_auto_mode(tiles)
@@ -233,14 +314,22 @@ def resolve_tiles_overlap(
             return tiles, "none"
 
 
-def remove_pixel_gaps(tiles: list[Tile], max_gap: int = 1) -> list[Tile]:
+def remove_pixel_gaps(
+    tiles: list[Tile] | TileCollection, max_gap: int = 1
+) -> TileCollection:
     """Remove evenutal pixel gaps from a grid of tiles."""
+    tiles = TileCollection.from_tiles(tiles)
     assert len(tiles) > 0, "The input list of tiles is empty"
-    assert tiles[0].space == TileSpace.PIXEL, "Tiles must be in pixel space"
+    assert tiles.space == TileSpace.PIXEL, "Tiles must be in pixel space"
 
-    offset_x = tiles[0].diag.x
-    offset_y = tiles[0].diag.y
-    num_x, num_y = _find_grid_size(tiles, offset_x, offset_y)
+    # The grid pitch is the most common tile size, tiles with a different
+    # size are snapped on the same lattice
+    collection, tiles = tiles, tiles.to_tiles()
+    _, sizes_x = np.unique(collection.diag[:, X], return_inverse=True)
+    _, sizes_y = np.unique(collection.diag[:, Y], return_inverse=True)
+    offset_x = tiles[_most_common_index(sizes_x)].diag.x
+    offset_y = tiles[_most_common_index(sizes_y)].diag.y
+    num_x, num_y = _find_grid_size(collection, offset_x, offset_y)
 
     z, c, t = tiles[0].top_l.z, tiles[0].top_l.c, tiles[0].top_l.t
     # The max_gap is set to the diagonal of the tiles
@@ -248,51 +337,129 @@ def remove_pixel_gaps(tiles: list[Tile], max_gap: int = 1) -> list[Tile]:
     # the max_gap will be sqrt(2) ~= 1.41 + eps
     max_gap = np.sqrt(max_gap**2 + max_gap**2) + 1e-6
 
-    out_tiles = []
-    for i in range(num_x):
-        for j in range(num_y):
-            x_in = i * offset_x
-            y_in = j * offset_y
-
-            point = Point(x_in, y_in, z=z, c=c, t=t)
-            distances = [(point - bbox.top_l).lengthXY() for bbox in tiles]
-            min_dist = np.min(distances)
-            closest_bbox = tiles[np.argmin(distances)]
-
-            if min_dist <= max_gap:
-                top_l = Point(x_in, y_in, z=z, c=c, t=t)
-                new_tile = closest_bbox.derive_from_diag(top_l, diag=closest_bbox.diag)
-                out_tiles.append(new_tile)
-    return out_tiles
+    snapped: list[int] = []
+    top_l: list[tuple[float, float, float, int, int]] = []
+    lattice = _lattice_candidates(
+        collection,
+        num_x=num_x,
+        num_y=num_y,
+        offset_x=offset_x,
+        offset_y=offset_y,
+        max_dist=max_gap,
+    )
+    for i, j, candidates in lattice:
+        x_in = i * offset_x
+        y_in = j * offset_y
+
+        point = Point(x_in, y_in, z=z, c=c, t=t)
+        closest, min_dist = _closest_tile(point, tiles, candidates)
+
+        if min_dist <= max_gap:
+            snapped.append(closest)
+            top_l.append((x_in, y_in, z, c, t))
+    return collection.take(snapped).derive(
+        top_l=np.array(top_l, dtype=np.float64).reshape(-1, 5)
+    )
 
 
-def standard_stitching_pipe(
-    tiles: list[Tile],
-    mode: Literal["auto", "grid", "free", "none"] = "auto",
+def _normalize_tiles(
+    tiles: TileCollection,
     swap_xy: bool = False,
     invert_x: bool = False,
     invert_y: bool = False,
-) -> list[Tile]:
-    """Standard stitching pipe for a list of tiles."""
-    # The standard stitching pipe will is implemented for
-    # coplanar tiles only.
-    check_tiles_coplanar(tiles)
-    tiles = copy.deepcopy(tiles)
+) -> TileCollection:
+    """Apply the transforms at the start of the standard stitching pipe.
+
+    This is equivalent to calling in sequence `swap_xy_tiles`, `invert_x_tiles`,
+    `invert_y_tiles`, `reset_tiles_origin` (if any of the previous is applied),
+    `sort_tiles_by_distance`, `remove_tiles_offset_xy` and
+    `remove_tiles_offset_zt`, but it builds a single new collection.
+    """
+    if len(tiles) == 0:
+        return tiles
+
+    top_l, diag, origin = tiles.top_l, tiles.diag, tiles.origin
     if swap_xy:
-        tiles = swap_xy_tiles(tiles)
+        top_l = top_l[:, [Y, X, Z, C, T]]
+        diag = diag[:, [Y, X, Z, C, T]]
+    else:
+        top_l = top_l.copy()
     if invert_x:
-        tiles = invert_x_tiles(tiles)
+        top_l[:, X] = -top_l[:, X]
     if invert_y:
-        tiles = invert_y_tiles(tiles)
-
+        top_l[:, Y] = -top_l[:, Y]
     if any([swap_xy, invert_x, invert_y]):
-        tiles = reset_tiles_origin(tiles)
+        origin = top_l[:, [X, Y, Z]]
+
+    # The offset computed for the sorting is the same removed from the tiles
+    top_l[:, X], top_l[:, Y] = _offset_xy(top_l)
+    top_l[:, [Z, T]] = 0
+    order = _distance_order(top_l[:, X], top_l[:, Y])
+    tiles = tiles.derive(
+        top_l=top_l, diag=diag if diag is not tiles.diag else None, origin=origin
+    )
+    return tiles.take(order)
 
-    tiles = sort_tiles_by_distance(tiles)
-    tiles = remove_tiles_offset_xy(tiles)
-    tiles = remove_tiles_offset_zt(tiles)
+
+def _resolve_normalized_tiles(
+    tiles: TileCollection, mode: Literal["auto", "grid", "free", "none"]
+) -> TileCollection:
+    """Second half of the standard stitching pipe, after `_normalize_tiles`."""
     tiles, _mode = resolve_tiles_overlap(tiles, mode=mode)
     tiles = tiles_to_pixel_space(tiles)
     if _mode == "grid":
         tiles = remove_pixel_gaps(tiles)
     return tiles
+
+
+def _resolve_layout(
+    tiles: TileCollection, mode: Literal["auto", "grid", "free", "none"]
+) -> LayoutCacheEntry:
+    """Resolve the tiles and find the input tile of each output tile.
+
+    The stitching transforms keep the index of the tiles, so the input tile of
+    each output tile is found by resetting the index to the tiles rows.
+    """
+    tracked = tiles.derive(tile_index=np.arange(len(tiles)))
+    resolved = _resolve_normalized_tiles(tracked, mode=mode)
+    return LayoutCacheEntry(
+        indices=resolved.tile_index.copy(),
+        top_l=resolved.top_l,
+        diag=resolved.diag,
+    )
+
+
+def standard_stitching_pipe(
+    tiles: list[Tile] | TileCollection,
+    mode: Literal["auto", "grid", "free", "none"] = "auto",
+    swap_xy: bool = False,
+    invert_x: bool = False,
+    invert_y: bool = False,
+    layout_cache: LayoutCache | None = None,
+) -> TileCollection:
+    """Standard stitching pipe for a list of tiles.
+
+    If a layout cache is given, the resolved layout is looked up using the
+    geometry of the tiles relative to their origin, and images with the same
+    layout (e.g. the wells of a plate) reuse it instead of recomputing it.
+    """
+    # The standard stitching pipe will is implemented for
+    # coplanar tiles only.
+    tiles = TileCollection.from_tiles(tiles)
+    check_tiles_coplanar(tiles)
+    tiles = _normalize_tiles(
+        tiles, swap_xy=swap_xy, invert_x=invert_x, invert_y=invert_y
+    )
+    if layout_cache is None:
+        return _resolve_normalized_tiles(tiles, mode=mode)
+
+    key = layout_fingerprint(
+        tiles, mode=mode, swap_xy=swap_xy, invert_x=invert_x, invert_y=invert_y
+    )
+    layout = layout_cache.get(key)
+    if layout is None:
+        layout = _resolve_layout(tiles, mode=mode)
+        layout_cache.put(key, layout)
+    return tiles.take(layout.indices).derive(
+        top_l=layout.top_l, diag=layout.diag, space=TileSpace.PIXEL
+    )
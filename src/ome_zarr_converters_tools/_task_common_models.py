@@ -22,11 +22,71 @@ class AdvancedComputeOptions(BaseModel):
             sometimes necessary to ensure correct image tiling and registration.
         invert_y (bool): Invert y axis coordinates in the metadata. This is
             sometimes necessary to ensure correct image tiling and registration.
+        chunking_mode (Literal["fixed", "auto"]): How the chunk shape is chosen.
+            "fixed" uses max_xy_chunk, z_chunk, c_chunk and t_chunk on all the
+            resolution levels. "auto" ignores them, and plans the chunks of each
+            level for an uncompressed size of about target_chunk_mb, keeping the
+            XY chunks aligned with the tiles where possible.
+        target_chunk_mb (float): The target uncompressed size of the chunks in
+            MB, in the "auto" chunking mode.
+        compression (Literal["default", "blosc-lz4", "blosc-zstd", "zstd",
+            "none"]): The compression codec of the image. "default" is the zarr
+            default (blosc-lz4 at level 5 with byte shuffle). zstd compresses
+            better but slower than lz4, "none" writes the chunks uncompressed.
+            The throughput and ratio of each codec on the tiles of an assay can
+            be compared with the `ome-zarr-benchmark-codecs` command.
+        compression_level (int): The compression level, from 0 to 9 for the
+            blosc codecs and from 1 to 22 for zstd.
+        shuffle (Literal["shuffle", "bitshuffle", "noshuffle"]): The shuffle
+            filter of the blosc codecs.
         max_xy_chunk (int): XY chunk size is set as the minimum of this value and the
             microscope tile size.
         z_chunk (int): Z chunk size.
         c_chunk (int): C chunk size.
         t_chunk (int): T chunk size.
+        layout_cache_dir (str | None): Optional directory where the stitched
+            layouts are cached (e.g. next to the zarr output). If set, images
+            with the same tiles geometry relative to their origin (e.g. the
+            wells of a plate) reuse the cached layout instead of stitching the
+            tiles again, and the layouts are also kept in memory within a
+            process. If not set, the layouts are not cached.
+        num_workers (int): The number of threads loading the tiles and writing
+            the chunks of an image. Each chunk is written once, so the output
+            does not depend on the number of workers. Use more than one worker
+            only if the data loaders of the converter are thread safe.
+        prefetch_depth (int): The number of tiles loaded ahead of the writes, so
+            that loading and writing overlap. The loading statistics (stall
+            times and prefetch queue occupancy) are logged for each image, to
+            tune it for the storage. 0 disables the prefetching.
+        max_memory_mb (float | None): The memory budget of the conversion of an
+            image, in MB. If set, the number of workers, the prefetch depth, the
+            size of the tiles data cache and (in the "auto" chunking mode) the
+            chunk size are reduced to fit in it, and the pyramid is
+            consolidated from the full resolution level if building it
+            incrementally does not fit. The peak resident memory of each task
+            is logged with the budget. Loaders returning whole tiles still load
+            them whole.
+        split_mode (Literal["none", "time", "channel", "z", "xy"]): Split the
+            conversion of each image in several parallel work units. "none"
+            converts each image in a single task. Otherwise the image is
+            created by the init task, and split in ranges of time points,
+            channels, z planes or bands of rows ("xy") aligned with the chunks.
+            Each work unit writes its part of the full resolution level, and
+            the last one to finish builds the pyramid and the percentiles.
+        target_unit_mb (float): The target uncompressed size of the full
+            resolution data written by each work unit in MB, when splitting.
+        pyramid_mode (Literal["incremental", "consolidate"]): How the lower
+            resolution levels are built. "incremental" builds them from the
+            chunks of the full resolution level as they are written, without
+            reading it back. "consolidate" builds them once the full resolution
+            level is written. Both give the same pyramid.
+        percentile_mode (Literal["histogram", "sample"]): How the contrast
+            limits of the channels (the 1 and 99.9 percentiles) are computed.
+            "sample" (the default) reads back the lowest resolution level once
+            written. "histogram" counts the values of the full resolution level
+            as it is written, exact for integer images of up to 16 bits and
+            binned otherwise (e.g. for float images), which gives different
+            contrast limits than "sample".
     """
 
     num_levels: int = Field(default=5, ge=1)
@@ -34,15 +94,62 @@ class AdvancedComputeOptions(BaseModel):
     swap_xy: bool = False
     invert_x: bool = False
     invert_y: bool = False
+    chunking_mode: Literal["fixed", "auto"] = "fixed"
+    target_chunk_mb: float = Field(default=16.0, gt=0)
+    compression: Literal["default", "blosc-lz4", "blosc-zstd", "zstd", "none"] = (
+        "default"
+    )
+    compression_level: int = Field(default=5, ge=0, le=22)
+    shuffle: Literal["shuffle", "bitshuffle", "noshuffle"] = "shuffle"
     max_xy_chunk: int = Field(default=4096, ge=1)
     z_chunk: int = Field(default=10, ge=1)
     c_chunk: int = Field(default=1, ge=1)
     t_chunk: int = Field(default=1, ge=1)
+    layout_cache_dir: str | None = None
+    num_workers: int = Field(default=1, ge=1)
+    prefetch_depth: int = Field(default=2, ge=0)
+    max_memory_mb: float | None = Field(default=None, gt=0)
+    split_mode: Literal["none", "time", "channel", "z", "xy"] = "none"
+    target_unit_mb: float = Field(default=4096.0, gt=0)
+    pyramid_mode: Literal["incremental", "consolidate"] = "incremental"
+    percentile_mode: Literal["histogram", "sample"] = "sample"
+
+
+class WorkUnit(BaseModel):
+    """A part of an image written by a compute task.
+
+    Attributes:
+        index (int): The index of the work unit.
+        num_units (int): The number of work units of the image.
+        start (tuple[int, ...]): The (t, c, z, y, x) start of the region
+            written by the work unit.
+        stop (tuple[int, ...]): The (t, c, z, y, x) stop of the region written
+            by the work unit.
+    """
+
+    index: int = Field(ge=0)
+    num_units: int = Field(ge=1)
+    start: tuple[int, ...] = Field(min_length=5, max_length=5)
+    stop: tuple[int, ...] = Field(min_length=5, max_length=5)
 
 
 class ConvertParallelInitArgs(BaseModel):
-    """Arguments for the compute task."""
+    """Arguments for the compute task.
+
+    Attributes:
+        tiled_image_pickled_path (str): The manifest holding the TiledImage to
+            convert, or a single pickled TiledImage.
+        tiled_image_index (int | None): The index of the TiledImage in the
+            manifest, None for a single pickled TiledImage.
+        overwrite (bool): Overwrite the existing image.
+        advanced_compute_options (AdvancedComputeOptions): The advanced compute
+            options.
+        work_unit (WorkUnit | None): The region of the image to write, None to
+            write the whole image.
+    """
 
     tiled_image_pickled_path: str
+    tiled_image_index: int | None = Field(default=None, ge=0)
     overwrite: bool
     advanced_compute_options: AdvancedComputeOptions
+    work_unit: WorkUnit | None = None
@@ -1,18 +1,140 @@
 """A generic task to convert a LIF plate to OME-Zarr."""
 
 import logging
+import sys
+from collections.abc import Callable
 from functools import partial
 from pathlib import Path
 
-from ome_zarr_converters_tools._omezarr_image_writers import write_tiled_image
-from ome_zarr_converters_tools._pkl_utils import load_tiled_image, remove_pkl
+from ngio import open_ome_zarr_container
+
+from ome_zarr_converters_tools._layout_cache import get_layout_cache
+from ome_zarr_converters_tools._omezarr_image_writers import (
+    finalize_ome_zarr_image,
+    write_tiled_image,
+    write_tiles_region,
+)
+from ome_zarr_converters_tools._pkl_utils import (
+    load_tiled_image,
+    remove_manifest_record,
+    remove_pkl,
+)
+from ome_zarr_converters_tools._progress import ConversionProgress
 from ome_zarr_converters_tools._stitching import standard_stitching_pipe
-from ome_zarr_converters_tools._task_common_models import ConvertParallelInitArgs
-from ome_zarr_converters_tools._tiled_image import PlatePathBuilder
+from ome_zarr_converters_tools._task_common_models import (
+    AdvancedComputeOptions,
+    ConvertParallelInitArgs,
+    WorkUnit,
+)
+from ome_zarr_converters_tools._tile_collection import TileCollection
+from ome_zarr_converters_tools._tiled_image import PlatePathBuilder, TiledImage
+from ome_zarr_converters_tools._work_units import (
+    claim_finalization,
+    mark_work_unit_done,
+    reset_work_units,
+    work_unit_done,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _peak_memory_bytes() -> int | None:
+    """Return the peak resident memory of the process, None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # In bytes on macOS, in kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _log_peak_memory(
+    tiled_image: TiledImage,
+    work_unit: WorkUnit | None,
+    options: AdvancedComputeOptions,
+) -> None:
+    """Log the peak memory of the task, and the memory budget if any."""
+    peak_memory = _peak_memory_bytes()
+    if peak_memory is None:
+        return
+    unit = "" if work_unit is None else f" (work unit {work_unit.index})"
+    message = f"Peak memory of {tiled_image}{unit}: {peak_memory / 1024**2:.0f}MB"
+    if options.max_memory_mb is not None:
+        message += f", with a budget of {options.max_memory_mb:.0f}MB"
+    logger.info(message)
+
+
+def _max_memory_bytes(options: AdvancedComputeOptions) -> int | None:
+    """Return the memory budget of the options in bytes, if any."""
+    if options.max_memory_mb is None:
+        return None
+    return int(options.max_memory_mb * 1024**2)
+
+
+def build_stitching_pipe(
+    options: AdvancedComputeOptions,
+) -> Callable[[TileCollection], TileCollection]:
+    """Build the stitching pipe of the tiles from the advanced options.
+
+    The stitched layouts are cached only if a layout cache directory is set.
+    """
+    layout_cache = None
+    if options.layout_cache_dir is not None:
+        layout_cache = get_layout_cache(options.layout_cache_dir)
+    return partial(
+        standard_stitching_pipe,
+        mode=options.tiling_mode,
+        swap_xy=options.swap_xy,
+        invert_x=options.invert_x,
+        invert_y=options.invert_y,
+        layout_cache=layout_cache,
+    )
+
+
+def _write_work_unit(
+    zarr_url: str,
+    tiled_image: TiledImage,
+    work_unit: WorkUnit,
+    options: AdvancedComputeOptions,
+) -> dict[str, bool] | None:
+    """Write a work unit of an image, and finalize the image if it is the last.
+
+    Returns:
+        dict[str, bool] | None: The types of the image if it was finalized.
+    """
+    ome_zarr_container = open_ome_zarr_container(zarr_url)
+    if work_unit_done(zarr_url, work_unit.index):
+        logger.info(f"Work unit {work_unit.index} of {zarr_url} already written.")
+    else:
+        write_tiles_region(
+            ome_zarr_container,
+            # The tiles of the work units are stitched by the init task
+            tiled_image.tile_collection,
+            start=work_unit.start,
+            stop=work_unit.stop,
+            num_workers=options.num_workers,
+            prefetch_depth=options.prefetch_depth,
+            max_memory_bytes=_max_memory_bytes(options),
+            progress=ConversionProgress(zarr_url, writer_id=f"_{work_unit.index}"),
+        )
+        mark_work_unit_done(zarr_url, work_unit.index)
+    if not claim_finalization(zarr_url, work_unit.num_units, work_unit.index):
+        return None
+    progress = ConversionProgress(zarr_url)
+    image = finalize_ome_zarr_image(
+        ome_zarr_container,
+        pyramid_mode=options.pyramid_mode,
+        percentile_mode=options.percentile_mode,
+        num_workers=options.num_workers,
+        progress=progress,
+    )
+    progress.clear()
+    reset_work_units(zarr_url)
+    return {"is_3D": image.is_3d, "has_time": image.is_time_series}
+
+
 def generic_compute_task(
     *,
     # Fractal parameters
@@ -21,39 +143,68 @@ def generic_compute_task(
 ):
     """Initialize the task to convert a LIF plate to OME-Zarr.
 
+    If the image is split in work units (see `build_parallelization_list`),
+    the task writes its work unit, and only the task finalizing the image
+    returns the image list update.
+
+    The progress of the conversion is recorded inside the image, so if the
+    task fails, running it again (with `overwrite=False`) resumes the
+    conversion. The pickled task input is only removed once the work is done.
+
     Args:
         zarr_url (str): URL to the OME-Zarr file.
         init_args (ConvertScanrInitArgs): Arguments for the initialization task.
     """
     pickle_path = Path(init_args.tiled_image_pickled_path)
-    tiled_image = load_tiled_image(pickle_path)
+    index = init_args.tiled_image_index
+    tiled_image = load_tiled_image(pickle_path, index=index)
 
+    options = init_args.advanced_compute_options
     try:
-        stitching_pipe = partial(
-            standard_stitching_pipe,
-            mode=init_args.advanced_compute_options.tiling_mode,
-            swap_xy=init_args.advanced_compute_options.swap_xy,
-            invert_x=init_args.advanced_compute_options.invert_x,
-            invert_y=init_args.advanced_compute_options.invert_y,
-        )
-
-        im_list_types = write_tiled_image(
-            zarr_url=zarr_url,
-            tiled_image=tiled_image,
-            stiching_pipe=stitching_pipe,
-            num_levels=init_args.advanced_compute_options.num_levels,
-            max_xy_chunk=init_args.advanced_compute_options.max_xy_chunk,
-            z_chunk=init_args.advanced_compute_options.z_chunk,
-            c_chunk=init_args.advanced_compute_options.c_chunk,
-            t_chunk=init_args.advanced_compute_options.t_chunk,
-            overwrite=init_args.overwrite,
-        )
+        if init_args.work_unit is not None:
+            im_list_types = _write_work_unit(
+                zarr_url, tiled_image, init_args.work_unit, options
+            )
+        else:
+            im_list_types = write_tiled_image(
+                zarr_url=zarr_url,
+                tiled_image=tiled_image,
+                stiching_pipe=build_stitching_pipe(options),
+                num_levels=options.num_levels,
+                max_xy_chunk=options.max_xy_chunk,
+                z_chunk=options.z_chunk,
+                c_chunk=options.c_chunk,
+                t_chunk=options.t_chunk,
+                overwrite=init_args.overwrite,
+                num_workers=options.num_workers,
+                prefetch_depth=options.prefetch_depth,
+                pyramid_mode=options.pyramid_mode,
+                percentile_mode=options.percentile_mode,
+                chunking_mode=options.chunking_mode,
+                target_chunk_bytes=int(options.target_chunk_mb * 1024**2),
+                compression=options.compression,
+                compression_level=options.compression_level,
+                shuffle=options.shuffle,
+                max_memory_bytes=_max_memory_bytes(options),
+            )
     except Exception as e:
-        remove_pkl(pickle_path)
-        logger.error(f"An error occurred while processing {tiled_image}.")
+        # The pickle is kept, to resume the conversion by running the task again
+        logger.error(
+            f"An error occurred while processing {tiled_image}. The task input "
+            f"{pickle_path} is kept to resume the conversion."
+        )
         logger.exception(e)
         raise e
 
+    if index is None:
+        remove_pkl(pickle_path)
+    else:
+        remove_manifest_record(pickle_path, index)
+    _log_peak_memory(tiled_image, init_args.work_unit, options)
+    if im_list_types is None:
+        # Another work unit finalizes the image
+        return {"image_list_updates": []}
+
     if isinstance(tiled_image.path_builder, PlatePathBuilder):
         plate_attributes = {
             "well": f"{tiled_image.path_builder.row}{tiled_image.path_builder.column}",
@@ -62,8 +213,6 @@ def generic_compute_task(
         }
         tiled_image.update_attributes(plate_attributes)
 
-    remove_pkl(pickle_path)
-
     return {
         "image_list_updates": [
             {
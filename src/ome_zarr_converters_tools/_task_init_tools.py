@@ -2,12 +2,131 @@
 
 from pathlib import Path
 
-from ome_zarr_converters_tools._pkl_utils import create_pkl, remove_pkl_dir
+import numpy as np
+
+from ome_zarr_converters_tools._omezarr_image_writers import (
+    fov_roi_table,
+    init_tiled_image,
+)
+from ome_zarr_converters_tools._pkl_utils import create_manifest, remove_pkl_dir
+from ome_zarr_converters_tools._progress import ConversionProgress
 from ome_zarr_converters_tools._task_common_models import (
     AdvancedComputeOptions,
     ConvertParallelInitArgs,
+    WorkUnit,
+)
+from ome_zarr_converters_tools._task_compute_tools import (
+    _max_memory_bytes,
+    build_stitching_pipe,
 )
 from ome_zarr_converters_tools._tiled_image import TiledImage
+from ome_zarr_converters_tools._work_units import (
+    plan_work_units,
+    reset_work_units,
+    tiles_in_region,
+)
+
+
+def split_tiled_image(
+    zarr_url: str,
+    tiled_image: TiledImage,
+    overwrite: bool,
+    advanced_compute_options: AdvancedComputeOptions,
+) -> list[tuple[TiledImage, WorkUnit]]:
+    """Create the image of a TiledImage, and split its conversion in work units.
+
+    The tiles are stitched and the empty image is created with its ROI tables,
+    then the image is split following `split_mode` and `target_unit_mb` (see
+    `plan_work_units`). If the conversion of the image was interrupted, the
+    existing image is kept and the work units already written are skipped.
+    Each work unit gets a TiledImage with the stitched tiles overlapping its
+    region, in pixel space.
+
+    Args:
+        zarr_url (str): The url of the image.
+        tiled_image (TiledImage): The tiled image to convert.
+        overwrite (bool): Overwrite the existing image.
+        advanced_compute_options (AdvancedComputeOptions): The advanced compute
+            options.
+
+    Returns:
+        list[tuple[TiledImage, WorkUnit]]: The TiledImage of each work unit, and
+            the region it writes.
+    """
+    options = advanced_compute_options
+    progress = ConversionProgress(zarr_url)
+    # An interrupted conversion is resumed with the work units already written
+    resume = not overwrite and progress.exists()
+    ome_zarr_container, tiles = init_tiled_image(
+        zarr_url=zarr_url,
+        tiled_image=tiled_image,
+        stiching_pipe=build_stitching_pipe(options),
+        num_levels=options.num_levels,
+        max_xy_chunk=options.max_xy_chunk,
+        z_chunk=options.z_chunk,
+        c_chunk=options.c_chunk,
+        t_chunk=options.t_chunk,
+        overwrite=overwrite,
+        chunking_mode=options.chunking_mode,
+        target_chunk_bytes=int(options.target_chunk_mb * 1024**2),
+        compression=options.compression,
+        compression_level=options.compression_level,
+        shuffle=options.shuffle,
+        max_memory_bytes=_max_memory_bytes(options),
+    )
+    image = ome_zarr_container.get_image()
+    if not resume:
+        ome_zarr_container.add_table(
+            "FOV_ROI_table", table=fov_roi_table(tiles, image.pixel_size)
+        )
+        progress.record_stage("tables")
+        reset_work_units(zarr_url)
+
+    shape, chunks = image.shape, image.chunks
+    if not ome_zarr_container.is_time_series:
+        shape, chunks = (1, *shape), (1, *chunks)
+    regions = plan_work_units(
+        shape,
+        chunks,
+        itemsize=np.dtype(image.dtype).itemsize,
+        split_mode=options.split_mode,
+        target_bytes=int(options.target_unit_mb * 1024**2),
+    )
+    work_units = []
+    for index, (start, stop) in enumerate(regions):
+        unit_image = TiledImage(
+            name=tiled_image.name,
+            path_builder=tiled_image.path_builder,
+            channel_names=tiled_image.channel_names,
+            wavelength_ids=tiled_image.wavelength_ids,
+            attributes=dict(tiled_image.attributes),
+        )
+        for i in tiles_in_region(tiles, start, stop):
+            unit_image.add_tile(tiles[i])
+        work_unit = WorkUnit(
+            index=index,
+            num_units=len(regions),
+            start=start,
+            stop=stop,
+        )
+        work_units.append((unit_image, work_unit))
+    return work_units
+
+
+def _plan_tiled_image(
+    zarr_dir: Path,
+    tiled_image: TiledImage,
+    overwrite: bool,
+    advanced_compute_options: AdvancedComputeOptions,
+) -> list[tuple[str, TiledImage, WorkUnit | None]]:
+    """Plan the compute tasks converting a TiledImage."""
+    zarr_url = str(zarr_dir / tiled_image.path)
+    if advanced_compute_options.split_mode == "none":
+        return [(zarr_url, tiled_image, None)]
+    work_units = split_tiled_image(
+        zarr_url, tiled_image, overwrite, advanced_compute_options
+    )
+    return [(zarr_url, unit_image, work_unit) for unit_image, work_unit in work_units]
 
 
 def build_parallelization_list(
@@ -19,13 +138,22 @@ def build_parallelization_list(
 ) -> list[dict]:
     """Build a list of dictionaries to parallelize the conversion.
 
+    Each TiledImage is converted by a single compute task, unless
+    `advanced_compute_options.split_mode` is set: then its image is created
+    here, and its conversion is split in several compute tasks (see
+    `split_tiled_image`).
+
+    The TiledImages of all the tasks are stored in a single manifest file
+    (see `create_manifest`), and the tasks are listed in the order of
+    `tiled_images`.
+
     Args:
         zarr_dir (str): The path to the zarr directory.
         tiled_images (list[TiledImage]): A list of tiled images objects to convert.
         overwrite (bool): Overwrite the existing zarr directory.
         advanced_compute_options (AdvancedComputeOptions): The advanced compute options.
         tmp_dir_name (str): The name of the temporary directory to store the
-            pickled tiled images.
+            manifest of the tiled images (see `create_manifest`).
     """
     parallelization_list = []
     if isinstance(zarr_dir, str):
@@ -37,16 +165,27 @@ def build_parallelization_list(
         # Reinitialize the directory
         remove_pkl_dir(pickle_dir)
 
-    for tile in tiled_images:
-        tile_pickle_path = create_pkl(pickle_dir=pickle_dir, tiled_image=tile)
-        zarr_url = str(zarr_dir / tile.path)
+    tasks = [
+        task
+        for tiled_image in tiled_images
+        for task in _plan_tiled_image(
+            zarr_dir, tiled_image, overwrite, advanced_compute_options
+        )
+    ]
+
+    manifest_path = create_manifest(
+        pickle_dir=pickle_dir, tiled_images=[task[1] for task in tasks]
+    )
+    for index, (zarr_url, _, work_unit) in enumerate(tasks):
         parallelization_list.append(
             {
                 "zarr_url": zarr_url,
                 "init_args": ConvertParallelInitArgs(
-                    tiled_image_pickled_path=str(tile_pickle_path),
+                    tiled_image_pickled_path=str(manifest_path),
+                    tiled_image_index=index,
                     overwrite=overwrite,
                     advanced_compute_options=advanced_compute_options,
+                    work_unit=work_unit,
                 ).model_dump(),
             }
         )
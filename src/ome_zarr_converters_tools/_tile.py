@@ -2,10 +2,11 @@
 
 from collections import namedtuple
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass
 from enum import Enum
+from functools import lru_cache
 from logging import getLogger
-from typing import Protocol
+from typing import Protocol, cast
 
 import numpy as np
 from dask.array.core import Array
@@ -14,35 +15,170 @@ from ngio import PixelSize
 logger = getLogger(__name__)
 
 
+# Scaled operands below this bound (and so their sum below 1e14) are exact in
+# float64, and the float sum is guaranteed to round back to the same decimal.
+_MAX_FIXED_POINT = 5e13
+_MAX_PREC = 24
+_POW10 = tuple(10.0**p for p in range(_MAX_PREC + 1))
+_INT_PREC = (0, True)
+
+
+@lru_cache(maxsize=2**16)
+def _find_float_prec(a: float) -> tuple[int, bool]:
+    """Find the number of decimals of the shortest representation of a float.
+
+    The second value is False if the float is printed in scientific notation.
+    In that case the precision is the legacy (string based) one, and the value
+    can not be used in the fixed-point fast path.
+    """
+    if a != 0.0 and not 1e-4 <= abs(a) < 1e16:
+        split_a = str(a).split(".")
+        if len(split_a) == 1:
+            return 0, False
+        return len(split_a[1]), False
+
+    # The shortest representation always has at least one decimal (e.g. "1.0").
+    # round(a, prec) == a holds for the first prec that round-trips the float.
+    for prec in range(1, _MAX_PREC):
+        if round(a, prec) == a:
+            return prec, True
+    return _MAX_PREC, False
+
+
 def _find_prec(a: float | int) -> int:
     """Find the precision of a float."""
     if isinstance(a, int):
         return 0
+    return _find_float_prec(a)[0]
 
-    split_a = str(a).split(".")
-    if len(split_a) == 1:
-        return 0
-    return len(split_a[1])
 
+def _round_ops(a: float | int, b: float | int, sign: int) -> float | int:
+    """Add (sign=1) or subtract (sign=-1) two numbers rounding to their precision.
 
-def _round_ops(a: float | int, b: float | int, op: Callable) -> float | int:
-    """Round and apply an operation to two numbers."""
-    prec_a, prec_b = _find_prec(a), _find_prec(b)
-    prec = max(prec_a, prec_b)
-    return round(op(a, b), prec)
+    The result is round(a + sign * b, prec), with prec the largest number of
+    decimals of the two operands. When both operands fit in a fixed-point
+    integer representation the sum is computed exactly on the scaled integers,
+    which gives the same result without the cost of the decimal rounding.
+    """
+    if a.__class__ is int:
+        if b.__class__ is int:
+            return a + sign * b
+        prec_a, exact_a = _INT_PREC
+    else:
+        prec_a, exact_a = _find_float_prec(a)
+    prec_b, exact_b = _INT_PREC if b.__class__ is int else _find_float_prec(b)
+    prec = prec_a if prec_a > prec_b else prec_b
+
+    if exact_a and exact_b:
+        scale = _POW10[prec]
+        scaled_a, scaled_b = a * scale, b * scale
+        if (
+            -_MAX_FIXED_POINT < scaled_a < _MAX_FIXED_POINT
+            and -_MAX_FIXED_POINT < scaled_b < _MAX_FIXED_POINT
+        ):
+            return (round(scaled_a) + sign * round(scaled_b)) / scale
+    return round(a + sign * b, prec)
+
+
+def _array_prec(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `_find_float_prec`, the precision is computed once per value."""
+    unique, inverse = np.unique(values, return_inverse=True)
+    info = [_find_float_prec(v) for v in unique.tolist()]
+    prec = np.array([p for p, _ in info], dtype=np.int64).reshape(-1)
+    exact = np.array([e for _, e in info], dtype=bool).reshape(-1)
+    return prec[inverse].reshape(values.shape), exact[inverse].reshape(values.shape)
+
+
+def _round_ops_array(
+    a: np.ndarray, b: np.ndarray | float | int, sign: int
+) -> np.ndarray:
+    """Vectorized version of `_round_ops` for an array of floats.
+
+    `b` can be an array of floats, a float or an int (with precision 0, as in
+    `_round_ops`). The result is bit-identical to calling `_round_ops` on each
+    element, the values outside of the fixed-point fast path fall back to it.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    prec_a, exact_a = _array_prec(a)
+    if isinstance(b, int):
+        prec_b, exact_b = np.zeros_like(prec_a), np.ones_like(exact_a)
+    else:
+        prec_b, exact_b = _array_prec(np.asarray(b, dtype=np.float64))
+    b_arr = np.broadcast_to(np.asarray(b, dtype=np.float64), a.shape)
+    prec = np.maximum(prec_a, prec_b)
+
+    scale = np.array(_POW10)[prec]
+    scaled_a, scaled_b = a * scale, b_arr * scale
+    fast = (
+        exact_a
+        & exact_b
+        & (np.abs(scaled_a) < _MAX_FIXED_POINT)
+        & (np.abs(scaled_b) < _MAX_FIXED_POINT)
+    )
+    # round() returns an int in the scalar version, adding 0.0 drops the -0.0
+    out = (np.rint(scaled_a) + sign * np.rint(scaled_b)) / scale + 0.0
+    for i in zip(*np.nonzero(~fast), strict=True):
+        out[i] = round(a[i].item() + sign * b_arr[i].item(), int(prec[i]))
+    return out
 
 
 def _round_add(a: float | int, b: float | int) -> float | int:
     """Round and add two numbers."""
-    return _round_ops(a, b, lambda x, y: x + y)
+    return _round_ops(a, b, 1)
 
 
 def _round_sub(a: float | int, b: float | int) -> float | int:
     """Round and subtract two numbers."""
-    return _round_ops(a, b, lambda x, y: x - y)
+    return _round_ops(a, b, -1)
+
+
+_new_object = object.__new__
+
+
+def _check_coordinates(
+    x: int | float, y: int | float, z: int | float, c: int, t: int
+) -> None:
+    """Validate the coordinates of a Point or a Vector."""
+    if not isinstance(c, int):
+        raise ValueError("Channel c must be an integer.")
+    if not isinstance(t, int):
+        raise ValueError("Time t must be an integer.")
+    if not isinstance(z, int | float):
+        raise ValueError("Z coordinate must be a number.")
+    if not isinstance(x, int | float):
+        raise ValueError("X coordinate must be a number.")
+    if not isinstance(y, int | float):
+        raise ValueError("Y coordinate must be a number.")
 
 
-@dataclass
+def _fields_setter(cls: type) -> Callable[..., None]:
+    """Return a function setting the (x, y, z, c, t) slots of a frozen class.
+
+    The slots descriptors are used directly, this bypasses the frozen
+    __setattr__ and it is much faster than object.__setattr__.
+    """
+    set_x, set_y, set_z, set_c, set_t = (
+        getattr(cls, name).__set__ for name in ("x", "y", "z", "c", "t")
+    )
+
+    def _set_fields(
+        obj: object,
+        x: float | int,
+        y: float | int,
+        z: float | int,
+        c: int,
+        t: int,
+    ) -> None:
+        set_x(obj, x)
+        set_y(obj, y)
+        set_z(obj, z)
+        set_c(obj, c)
+        set_t(obj, t)
+
+    return _set_fields
+
+
+@dataclass(frozen=True, slots=True, init=False)
 class Vector:
     """Basic 5D vector class."""
 
@@ -52,22 +188,35 @@ class Vector:
     c: int = 0
     t: int = 0
 
-    def __post_init__(self):
-        """Post-initialization checks."""
-        if not isinstance(self.c, int):
-            raise ValueError("Channel c must be an integer.")
-        if not isinstance(self.t, int):
-            raise ValueError("Time t must be an integer.")
-        if not isinstance(self.z, int | float):
-            raise ValueError("Z coordinate must be a number.")
-        if not isinstance(self.x, int | float):
-            raise ValueError("X coordinate must be a number.")
-        if not isinstance(self.y, int | float):
-            raise ValueError("Y coordinate must be a number.")
+    def __init__(
+        self,
+        x: int | float,
+        y: int | float,
+        z: int | float = 0.0,
+        c: int = 0,
+        t: int = 0,
+    ):
+        """Initialize the vector and validate the coordinates."""
+        _check_coordinates(x, y, z, c, t)
+        _set_vector_fields(self, x, y, z, c, t)
+
+    @classmethod
+    def _unchecked(
+        cls,
+        x: int | float,
+        y: int | float,
+        z: int | float = 0.0,
+        c: int = 0,
+        t: int = 0,
+    ) -> "Vector":
+        """Build a vector from already validated coordinates."""
+        vector = _new_object(cls)
+        _set_vector_fields(vector, x, y, z, c, t)
+        return vector
 
     def __add__(self, other: "Vector") -> "Vector":
         """Add two vectors."""
-        return Vector(
+        return Vector._unchecked(
             _round_add(self.x, other.x),
             _round_add(self.y, other.y),
             _round_add(self.z, other.z),
@@ -77,7 +226,7 @@ class Vector:
 
     def __sub__(self, other: "Vector") -> "Vector":
         """Subtract two vectors."""
-        return Vector(
+        return Vector._unchecked(
             _round_sub(self.x, other.x),
             _round_sub(self.y, other.y),
             _round_sub(self.z, other.z),
@@ -87,7 +236,7 @@ class Vector:
 
     def __mul__(self, scalar: float) -> "Vector":
         """Multiply a vector by a scalar."""
-        return Vector(
+        return Vector._unchecked(
             self.x * scalar,
             self.y * scalar,
             self.z * scalar,
@@ -98,7 +247,7 @@ class Vector:
     def normalizeXY(self) -> "Vector":
         """Normalize the vector."""
         length = self.lengthXY()
-        return Vector(
+        return Vector._unchecked(
             self.x / length,
             self.y / length,
             self.z,
@@ -123,7 +272,7 @@ class Vector:
         y = int(self.y / pixel_size.y)
         z = int(self.z / pixel_size.z)
         t = self.t  # Scaling in time is not supported yet
-        return Vector(x, y, z=z, c=self.c, t=t)
+        return Vector._unchecked(x, y, z=z, c=self.c, t=t)
 
     def to_real_space(self, pixel_size) -> "Vector":
         """Convert the vector to real space."""
@@ -131,10 +280,10 @@ class Vector:
         y = self.y * pixel_size.y
         z = self.z * pixel_size.z
         t = self.t  # Scaling in time is not supported yet
-        return Vector(x, y, z=z, c=self.c, t=t)
+        return Vector._unchecked(x, y, z=z, c=self.c, t=t)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, init=False)
 class Point:
     """Basic 5D point class."""
 
@@ -144,22 +293,35 @@ class Point:
     c: int = 0
     t: int = 0
 
-    def __post_init__(self):
-        """Post-initialization checks."""
-        if not isinstance(self.c, int):
-            raise ValueError("Channel c must be an integer.")
-        if not isinstance(self.t, int):
-            raise ValueError("Time t must be an integer.")
-        if not isinstance(self.z, int | float):
-            raise ValueError("Z coordinate must be a number.")
-        if not isinstance(self.x, int | float):
-            raise ValueError("X coordinate must be a number.")
-        if not isinstance(self.y, int | float):
-            raise ValueError("Y coordinate must be a number.")
+    def __init__(
+        self,
+        x: int | float,
+        y: int | float,
+        z: int | float = 0.0,
+        c: int = 0,
+        t: int = 0,
+    ):
+        """Initialize the point and validate the coordinates."""
+        _check_coordinates(x, y, z, c, t)
+        _set_point_fields(self, x, y, z, c, t)
+
+    @classmethod
+    def _unchecked(
+        cls,
+        x: int | float,
+        y: int | float,
+        z: int | float = 0.0,
+        c: int = 0,
+        t: int = 0,
+    ) -> "Point":
+        """Build a point from already validated coordinates."""
+        point = _new_object(cls)
+        _set_point_fields(point, x, y, z, c, t)
+        return point
 
     def __add__(self, other: Vector) -> "Point":
         """Add a vector to a point."""
-        return Point(
+        return Point._unchecked(
             _round_add(self.x, other.x),
             _round_add(self.y, other.y),
             _round_add(self.z, other.z),
@@ -169,7 +331,7 @@ class Point:
 
     def __sub__(self, other: "Point") -> "Vector":
         """Subtract two points."""
-        return Vector(
+        return Vector._unchecked(
             _round_sub(self.x, other.x),
             _round_sub(self.y, other.y),
             _round_sub(self.z, other.z),
@@ -183,7 +345,7 @@ class Point:
         y = int(self.y / pixel_size.y)
         z = int(self.z / pixel_size.z)
         t = self.t  # Scaling in time is not supported yet
-        return Point(x, y, z=z, c=self.c, t=t)
+        return Point._unchecked(x, y, z=z, c=self.c, t=t)
 
     def to_real_space(self, pixel_size: PixelSize) -> "Point":
         """Convert the point to real space."""
@@ -191,7 +353,11 @@ class Point:
         y = self.y * pixel_size.y
         z = self.z * pixel_size.z
         t = self.t  # Scaling in time is not supported yet
-        return Point(x, y, z=z, c=self.c, t=t)
+        return Point._unchecked(x, y, z=z, c=self.c, t=t)
+
+
+_set_vector_fields = _fields_setter(Vector)
+_set_point_fields = _fields_setter(Point)
 
 
 class TileLoader(Protocol):
@@ -207,6 +373,23 @@ class TileLoader(Protocol):
         ...
 
 
+class RegionTileLoader(TileLoader, Protocol):
+    """Tile loader that can also load a (t, c, z) sub-block of the tile.
+
+    Implementing `load_region` lets the writers stream large tiles (e.g. z-stacks
+    or time series) in blocks following the chunks of the output image, instead
+    of loading the whole tile at once.
+    """
+
+    def load_region(self, t: slice, c: slice, z: slice) -> np.ndarray | Array:
+        """Load a sub-block of the tile data in the format (t, c, z, y, x).
+
+        The slices are relative to the tile and have no step, the whole y and
+        x extent of the tile is loaded.
+        """
+        ...
+
+
 class TileSpace(Enum):
     """Tile space enumeration."""
 
@@ -225,6 +408,25 @@ OriginDict = namedtuple(
 )
 
 
+def _check_data_shape(
+    data_shape: tuple[int, ...], expected_shape: tuple[int, ...]
+) -> None:
+    """Check that the shape of the loaded data is the expected one."""
+    if expected_shape != data_shape:
+        max_diff = np.max(np.abs(np.array(expected_shape) - np.array(data_shape)))
+        if max_diff == 1:
+            logger.warning(
+                f"Data shape {data_shape} is off by 1 from tile "
+                f"shape {expected_shape}. This might be due to "
+                "rounding errors in the pixel size or tile position."
+            )
+        else:
+            raise ValueError(
+                f"Data shape {data_shape} does not match expected "
+                f"tile shape {expected_shape}."
+            )
+
+
 class Tile:
     """5D tile class.
 
@@ -232,8 +434,30 @@ class Tile:
 
     The origin attribute is used to keep track of the original tile position when
     moving
+
+    Tiles are immutable: deriving a tile (moving it, converting its space)
+    returns a new tile.
     """
 
+    __slots__ = (
+        "_bot_r",
+        "_data_loader",
+        "_diag",
+        "_origin",
+        "_pixel_size",
+        "_shape",
+        "_space",
+        "_top_l",
+    )
+    _top_l: Point
+    _diag: Vector
+    _pixel_size: PixelSize
+    _origin: OriginDict
+    _shape: tuple[int, int, int, int, int] | None
+    _space: TileSpace
+    _data_loader: TileLoader | None
+    _bot_r: Point | None
+
     def __init__(
         self,
         top_l: Point,
@@ -258,27 +482,64 @@ class Tile:
             space (TileSpace): The space of the tile (REAL or PIXEL).
             data_loader (TileLoader | None): A data loader to load the tile data.
         """
-        self._top_l = top_l
-
         if origin is None:
-            self._origin = OriginDict(
+            origin = OriginDict(
                 x_micrometer_original=top_l.x,
                 y_micrometer_original=top_l.y,
                 z_micrometer_original=top_l.z,
             )
-        else:
-            self._origin = origin
+        _set_tile_fields(
+            self, top_l, diag, pixel_size, origin, shape, space, data_loader
+        )
+        if shape is not None:
+            _set_tile_diag(self, self._align_diag_to_shape(shape))
+        self._validate()
 
-        self._data_loader = data_loader
-        self._shape = shape
-        self._space = space
-        self._pixel_size = pixel_size
+    @classmethod
+    def _unchecked(
+        cls,
+        top_l: Point,
+        diag: Vector,
+        pixel_size: PixelSize,
+        origin: OriginDict,
+        shape: tuple[int, int, int, int, int] | None,
+        space: TileSpace,
+        data_loader: TileLoader | None,
+    ) -> "Tile":
+        """Build a tile from already validated fields.
+
+        This skips the validation and the alignment of the diagonal to the shape,
+        so it must only be used when deriving a tile from a valid one.
+        """
+        tile = _new_object(cls)
+        _set_tile_fields(
+            tile, top_l, diag, pixel_size, origin, shape, space, data_loader
+        )
+        return tile
 
-        if shape is not None:
-            diag = self._align_diag_to_shape(shape)
-        self._diag = diag
+    def __setattr__(self, name: str, value: object) -> None:
+        """Tiles are immutable."""
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
 
-        self._validate()
+    def __delattr__(self, name: str) -> None:
+        """Tiles are immutable."""
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __getstate__(self) -> tuple[object, ...]:
+        """Return the fields of the tile, to pickle and copy it."""
+        return (
+            self._top_l,
+            self._diag,
+            self._pixel_size,
+            self._origin,
+            self._shape,
+            self._space,
+            self._data_loader,
+        )
+
+    def __setstate__(self, state: tuple[object, ...]) -> None:
+        """Restore the fields of an unpickled or copied tile."""
+        _set_tile_fields(self, *state)
 
     def __repr__(self) -> str:
         """String representation of the tile."""
@@ -339,7 +600,12 @@ class Tile:
     @property
     def bot_r(self) -> Point:
         """Return the bottom-right corner of the tile."""
-        return self._top_l + self._diag
+        # Tiles are immutable, so the corner is computed only once
+        bot_r = self._bot_r
+        if bot_r is None:
+            bot_r = self._top_l + self._diag
+            _set_tile_bot_r(self, bot_r)
+        return bot_r
 
     @property
     def origin(self) -> OriginDict:
@@ -381,28 +647,26 @@ class Tile:
 
     def derive_from_diag(self, top_l: Point, diag: Vector) -> "Tile":
         """Create a new tile keeping the origin."""
-        return Tile(
+        if self._shape is not None:
+            # The diagonal is always aligned to the shape, and the space is the
+            # same, so the aligned diagonal is the one of this tile.
+            diag = self._diag
+        elif diag is not self._diag:
+            self._validate_diag(diag)
+        self._validate_top_l(top_l)
+        return Tile._unchecked(
             top_l,
             diag,
             pixel_size=self._pixel_size,
             origin=self._origin,
-            data_loader=self._data_loader,
-            space=self._space,
             shape=self._shape,
+            space=self._space,
+            data_loader=self._data_loader,
         )
 
     def derive_from_points(self, top_l: Point, bot_r: Point) -> "Tile":
         """Create a new tile keeping the origin."""
-        diag = bot_r - top_l
-        return Tile(
-            top_l,
-            diag,
-            pixel_size=self._pixel_size,
-            origin=self._origin,
-            data_loader=self._data_loader,
-            space=self._space,
-            shape=self._shape,
-        )
+        return self.derive_from_diag(top_l, bot_r - top_l)
 
     def move_by(self, vec: Vector) -> "Tile":
         """Move the tile by a vector keeping the origin reference."""
@@ -412,22 +676,37 @@ class Tile:
         """Move the tile to a new point."""
         return self.derive_from_points(point, point + self.diag)
 
-    def _validate(self) -> None:
-        """Validate the tile properties."""
-        if self.top_l.c != 0:
+    @staticmethod
+    def _validate_top_l(top_l: Point) -> None:
+        """Validate the top-left corner of a tile."""
+        if top_l.c != 0:
             raise ValueError("Tile top-left corner must have channel c=0.")
-        if not isinstance(self.top_l.c, int):
+        if not isinstance(top_l.c, int):
             raise ValueError("Tile top-left corner channel c must be an integer.")
-        if self.diag.c < 0:
+
+    @staticmethod
+    def _validate_diag(diag: Vector) -> None:
+        """Validate the diagonal vector of a tile."""
+        if diag.c < 0:
             raise ValueError("Tile diagonal vector must have channel c >= 0.")
-        if not isinstance(self.diag.c, int):
+        if not isinstance(diag.c, int):
             raise ValueError("Tile diagonal vector channel c must be an integer.")
-        if not self.diag.is_all_positive():
+        if not diag.is_all_positive():
             raise ValueError("Tile diagonal vector must have all components positive.")
 
-    def _align_diag_to_shape(self, shape: tuple[int, int, int, int, int]) -> Vector:
+    def _validate(self) -> None:
+        """Validate the tile properties."""
+        self._validate_top_l(self.top_l)
+        self._validate_diag(self.diag)
+
+    def _align_diag_to_shape(
+        self,
+        shape: tuple[int, int, int, int, int],
+        space: TileSpace | None = None,
+    ) -> Vector:
         """Align the diagonal vector to the shape of the tile."""
-        if self.space == TileSpace.REAL:
+        space = self.space if space is None else space
+        if space == TileSpace.REAL:
             diag = Vector(
                 x=shape[4] * self.pixel_size.x,
                 y=shape[3] * self.pixel_size.y,
@@ -447,47 +726,53 @@ class Tile:
 
     def reset_origin(self) -> "Tile":
         """Reset the origin reference of the tile to the current position."""
-        return Tile(
-            top_l=self.top_l,
-            diag=self.diag,
+        origin = OriginDict(
+            x_micrometer_original=self._top_l.x,
+            y_micrometer_original=self._top_l.y,
+            z_micrometer_original=self._top_l.z,
+        )
+        return Tile._unchecked(
+            top_l=self._top_l,
+            diag=self._diag,
             pixel_size=self._pixel_size,
-            origin=None,
-            data_loader=self._data_loader,
-            space=self._space,
+            origin=origin,
             shape=self._shape,
+            space=self._space,
+            data_loader=self._data_loader,
         )
 
-    def to_pixel_space(self) -> "Tile":
-        """Convert the tile to pixel space."""
-        if self.space == TileSpace.PIXEL:
-            raise ValueError("Tile is already in pixel space")
-        top_l = self.top_l.to_pixel_space(pixel_size=self.pixel_size)
-        diag = self.diag.to_pixel_space(pixel_size=self.pixel_size)
-        return Tile(
+    def _to_space(self, space: TileSpace) -> "Tile":
+        """Convert the tile to the given space."""
+        if space == TileSpace.PIXEL:
+            top_l = self._top_l.to_pixel_space(pixel_size=self._pixel_size)
+            diag = self._diag.to_pixel_space(pixel_size=self._pixel_size)
+        else:
+            top_l = self._top_l.to_real_space(pixel_size=self._pixel_size)
+            diag = self._diag.to_real_space(pixel_size=self._pixel_size)
+
+        if self._shape is not None:
+            diag = self._align_diag_to_shape(self._shape, space=space)
+        return Tile._unchecked(
             top_l=top_l,
             diag=diag,
             pixel_size=self._pixel_size,
             origin=self._origin,
-            data_loader=self._data_loader,
-            space=TileSpace.PIXEL,
             shape=self._shape,
+            space=space,
+            data_loader=self._data_loader,
         )
 
+    def to_pixel_space(self) -> "Tile":
+        """Convert the tile to pixel space."""
+        if self.space == TileSpace.PIXEL:
+            raise ValueError("Tile is already in pixel space")
+        return self._to_space(TileSpace.PIXEL)
+
     def to_real_space(self) -> "Tile":
         """Convert the tile to real space."""
         if self.space == TileSpace.REAL:
             raise ValueError("Tile is already in real space")
-        top_l = self.top_l.to_real_space(pixel_size=self.pixel_size)
-        diag = self.diag.to_real_space(pixel_size=self.pixel_size)
-        return Tile(
-            top_l=top_l,
-            diag=diag,
-            pixel_size=self._pixel_size,
-            origin=self._origin,
-            data_loader=self._data_loader,
-            space=TileSpace.REAL,
-            shape=self._shape,
-        )
+        return self._to_space(TileSpace.REAL)
 
     def is_coplanar(self, other: "Tile", z_tol: float = 1e-6) -> bool:
         """Check if two tiles are coplanar on the XY plane.
@@ -516,16 +801,15 @@ class Tile:
 
     def cornersXY(self) -> list[Point]:
         """Return the 4 corners of the tiles box in the top-XY plane."""
+        top_l, bot_r = self._top_l, self.bot_r
         corners = [
-            (self.top_l.x, self.top_l.y),
-            (self.top_l.x, self.bot_r.y),
-            (self.bot_r.x, self.bot_r.y),
-            (self.bot_r.x, self.top_l.y),
+            (top_l.x, top_l.y),
+            (top_l.x, bot_r.y),
+            (bot_r.x, bot_r.y),
+            (bot_r.x, top_l.y),
         ]
 
-        return [
-            Point(x, y, self.top_l.z, self.top_l.c, self.top_l.t) for x, y in corners
-        ]
+        return [Point._unchecked(x, y, top_l.z, top_l.c, top_l.t) for x, y in corners]
 
     def areaXY(self) -> float:
         """BBBox area in the XY plane."""
@@ -582,27 +866,56 @@ class Tile:
         if self._data_loader is None:
             raise ValueError("No data loader provided.")
 
-        if self.space == TileSpace.REAL:
-            expected_shape = self.to_pixel_space().shape
-        else:
-            expected_shape = self.shape
-
         data = self._data_loader.load()
-        if expected_shape != data.shape:
-            max_diff = np.max(np.abs(np.array(expected_shape) - np.array(data.shape)))
-            if max_diff == 1:
-                logger.warning(
-                    f"Data shape {data.shape} is off by 1 from tile "
-                    f"shape {expected_shape}. This might be due to "
-                    "rounding errors in the pixel size or tile position."
-                )
-            else:
-                raise ValueError(
-                    f"Data shape {data.shape} does not match expected "
-                    f"tile shape {expected_shape}."
-                )
+        _check_data_shape(data.shape, self._expected_shape())
         return data
 
+    @property
+    def supports_region_loading(self) -> bool:
+        """Check if the data loader can load sub-blocks of the tile."""
+        return hasattr(self._data_loader, "load_region")
+
+    def load_region(
+        self,
+        t: slice = slice(None),
+        c: slice = slice(None),
+        z: slice = slice(None),
+    ) -> np.ndarray | Array:
+        """Load a (t, c, z) sub-block of the tile data.
+
+        If the data loader implements `load_region` (see `RegionTileLoader`) only
+        the sub-block is loaded, otherwise the whole tile is loaded and sliced.
+
+        Args:
+            t (slice): The time points to load, relative to the tile.
+            c (slice): The channels to load, relative to the tile.
+            z (slice): The z planes to load, relative to the tile.
+
+        Returns:
+            np.ndarray | Array: The sub-block, in the format (t, c, z, y, x).
+        """
+        if self._data_loader is None:
+            raise ValueError("No data loader provided.")
+        if not self.supports_region_loading:
+            return self.load()[t, c, z]
+
+        expected_shape = self._expected_shape()
+        # Normalize the slices to explicit start and stop
+        t, c, z = (
+            slice(*s.indices(n)[:2])
+            for s, n in zip((t, c, z), expected_shape[:3], strict=True)
+        )
+        data = cast("RegionTileLoader", self._data_loader).load_region(t=t, c=c, z=z)
+        block_shape = tuple(len(range(s.start, s.stop)) for s in (t, c, z))
+        _check_data_shape(data.shape, block_shape + expected_shape[3:])
+        return data
+
+    def _expected_shape(self) -> tuple[int, ...]:
+        """Return the expected shape of the tile data."""
+        if self.space == TileSpace.REAL:
+            return self.to_pixel_space().shape
+        return self.shape
+
     def dtype(self) -> str:
         """Return the dtype of the tile."""
         if self._data_loader is None:
@@ -619,3 +932,47 @@ class Tile:
         if len(_shape) != 5:
             raise ValueError(f"Shape {_shape} is not 5D.")
         return _shape
+
+
+def _tile_slot_setter(name: str) -> Callable[[Tile, object], None]:
+    """Return a function setting a slot of a tile, bypassing __setattr__."""
+    setter: Callable[[Tile, object], None] = getattr(Tile, name).__set__
+    return setter
+
+
+def _tile_fields_setter() -> Callable[..., None]:
+    """Return a function setting the slots of a tile, bypassing __setattr__."""
+    set_top_l, set_diag, set_pixel_size, set_origin = (
+        _tile_slot_setter(name)
+        for name in ("_top_l", "_diag", "_pixel_size", "_origin")
+    )
+    set_shape, set_space, set_data_loader, set_bot_r = (
+        _tile_slot_setter(name)
+        for name in ("_shape", "_space", "_data_loader", "_bot_r")
+    )
+
+    def _set_fields(
+        tile: Tile,
+        top_l: Point,
+        diag: Vector,
+        pixel_size: PixelSize,
+        origin: OriginDict,
+        shape: tuple[int, int, int, int, int] | None,
+        space: TileSpace,
+        data_loader: TileLoader | None,
+    ) -> None:
+        set_top_l(tile, top_l)
+        set_diag(tile, diag)
+        set_pixel_size(tile, pixel_size)
+        set_origin(tile, origin)
+        set_shape(tile, shape)
+        set_space(tile, space)
+        set_data_loader(tile, data_loader)
+        set_bot_r(tile, None)
+
+    return _set_fields
+
+
+_set_tile_fields = _tile_fields_setter()
+_set_tile_diag = _tile_slot_setter("_diag")
+_set_tile_bot_r = _tile_slot_setter("_bot_r")
@@ -0,0 +1,316 @@
+"""Columnar (array backed) representation of a list of tiles."""
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+import numpy as np
+from ngio import PixelSize
+
+from ome_zarr_converters_tools._tile import (
+    OriginDict,
+    Point,
+    Tile,
+    TileLoader,
+    TileSpace,
+    Vector,
+)
+
+# Column layout of the top_l and diag arrays
+X, Y, Z, C, T = 0, 1, 2, 3, 4
+
+
+class TileCollection(Sequence[Tile]):
+    """A collection of tiles stored as one NumPy array per field.
+
+    The collection is immutable, every transformation returns a new collection
+    sharing the data loaders and the pixel sizes with the original one.
+    Indexing the collection with an integer returns a `Tile` view of the row,
+    so code written against `list[Tile]` keeps working.
+
+    Attributes:
+        top_l (np.ndarray): (n, 5) array of the top-left corners (x, y, z, c, t).
+        diag (np.ndarray): (n, 5) array of the diagonal vectors (x, y, z, c, t).
+        origin (np.ndarray): (n, 3) array of the origin references (x, y, z).
+        shape (np.ndarray): (n, 5) array of the tiles shapes (t, c, z, y, x),
+            rows with unknown shape are filled with -1.
+        pixel_size (np.ndarray): (n, 3) array of the pixel sizes (x, y, z).
+        tile_index (np.ndarray): (n,) array of the tiles indices, by default
+            the row of each tile in the collection it was built as. The indices
+            are kept by `take` and `derive`, to track the tiles through the
+            stitching transforms.
+        space (TileSpace): The space of the tiles (REAL or PIXEL).
+    """
+
+    __slots__ = (
+        "_data_loaders",
+        "_diag",
+        "_origin",
+        "_pixel_size",
+        "_pixel_sizes",
+        "_shape",
+        "_space",
+        "_tile_index",
+        "_top_l",
+    )
+
+    def __init__(
+        self,
+        top_l: np.ndarray,
+        diag: np.ndarray,
+        origin: np.ndarray,
+        shape: np.ndarray,
+        pixel_sizes: Sequence[PixelSize],
+        data_loaders: Sequence[TileLoader | None],
+        space: TileSpace = TileSpace.REAL,
+        tile_index: np.ndarray | None = None,
+    ):
+        """Initialize the collection from the per field arrays.
+
+        Args:
+            top_l (np.ndarray): (n, 5) array of the top-left corners.
+            diag (np.ndarray): (n, 5) array of the diagonal vectors.
+            origin (np.ndarray): (n, 3) array of the origin references.
+            shape (np.ndarray): (n, 5) array of the tiles shapes, -1 if unknown.
+            pixel_sizes (Sequence[PixelSize]): The pixel size of each tile.
+            data_loaders (Sequence[TileLoader | None]): The data loader of each tile.
+            space (TileSpace): The space of the tiles (REAL or PIXEL).
+            tile_index (np.ndarray | None): (n,) array of the tiles indices, by
+                default the row of each tile.
+        """
+        n = len(pixel_sizes)
+        self._top_l = np.asarray(top_l, dtype=np.float64).reshape(n, 5)
+        self._diag = np.asarray(diag, dtype=np.float64).reshape(n, 5)
+        self._origin = np.asarray(origin, dtype=np.float64).reshape(n, 3)
+        self._shape = np.asarray(shape, dtype=np.int64).reshape(n, 5)
+        self._pixel_sizes = list(pixel_sizes)
+        # The tiles usually share a few PixelSize objects, read each one once
+        sizes: dict[int, tuple[float, float, float]] = {}
+        for ps in self._pixel_sizes:
+            if id(ps) not in sizes:
+                sizes[id(ps)] = (ps.x, ps.y, ps.z)
+        self._pixel_size = np.array(
+            [sizes[id(ps)] for ps in self._pixel_sizes], dtype=np.float64
+        ).reshape(n, 3)
+        self._data_loaders = list(data_loaders)
+        self._space = space
+        if tile_index is None:
+            tile_index = np.arange(n, dtype=np.int64)
+        self._tile_index = np.asarray(tile_index, dtype=np.int64).reshape(n)
+
+        # The arrays might be shared with other collections, so they are
+        # exposed as read-only views
+        for name in (
+            "_top_l",
+            "_diag",
+            "_origin",
+            "_shape",
+            "_pixel_size",
+            "_tile_index",
+        ):
+            array = getattr(self, name).view()
+            array.flags.writeable = False
+            setattr(self, name, array)
+
+        if len(self._data_loaders) != n:
+            raise ValueError("The number of data loaders must match the tiles.")
+
+    @classmethod
+    def from_tiles(cls, tiles: "Iterable[Tile] | TileCollection") -> "TileCollection":
+        """Build a collection from a list of tiles.
+
+        If the input is already a collection it is returned as is.
+        """
+        if isinstance(tiles, TileCollection):
+            return tiles
+
+        tiles = list(tiles)
+        spaces = {tile.space for tile in tiles}
+        if len(spaces) > 1:
+            raise ValueError("All tiles in a collection must be in the same space.")
+        space = spaces.pop() if spaces else TileSpace.REAL
+
+        top_l = [(t.top_l.x, t.top_l.y, t.top_l.z, t.top_l.c, t.top_l.t) for t in tiles]
+        diag = [(t.diag.x, t.diag.y, t.diag.z, t.diag.c, t.diag.t) for t in tiles]
+        origin = [tuple(t.origin) for t in tiles]
+        shape = [
+            t._shape if t._shape is not None else (-1, -1, -1, -1, -1) for t in tiles
+        ]
+        return cls(
+            top_l=np.array(top_l, dtype=np.float64),
+            diag=np.array(diag, dtype=np.float64),
+            origin=np.array(origin, dtype=np.float64),
+            shape=np.array(shape, dtype=np.int64),
+            pixel_sizes=[t.pixel_size for t in tiles],
+            data_loaders=[t._data_loader for t in tiles],
+            space=space,
+        )
+
+    def to_tiles(self) -> list[Tile]:
+        """Return the collection as a list of tiles."""
+        return list(self)
+
+    def derive(
+        self,
+        top_l: np.ndarray | None = None,
+        diag: np.ndarray | None = None,
+        origin: np.ndarray | None = None,
+        space: TileSpace | None = None,
+        tile_index: np.ndarray | None = None,
+    ) -> "TileCollection":
+        """Create a new collection replacing some of the fields.
+
+        As for `Tile`, the diagonal of the tiles with a known shape is always
+        aligned to the shape, so a new diagonal only affects the other rows.
+        """
+        space = self._space if space is None else space
+        if diag is not None:
+            diag = self._align_diag_to_shape(np.array(diag, dtype=np.float64), space)
+        return TileCollection(
+            top_l=self._top_l if top_l is None else top_l,
+            diag=self._diag if diag is None else diag,
+            origin=self._origin if origin is None else origin,
+            shape=self._shape,
+            pixel_sizes=self._pixel_sizes,
+            data_loaders=self._data_loaders,
+            space=space,
+            tile_index=self._tile_index if tile_index is None else tile_index,
+        )
+
+    def _align_diag_to_shape(self, diag: np.ndarray, space: TileSpace) -> np.ndarray:
+        """Replace the diagonal of the rows with a known shape (in place)."""
+        has_shape = self._shape[:, 0] >= 0
+        if not has_shape.any():
+            return diag
+        diag[has_shape] = self._shape[has_shape][:, ::-1]
+        if space == TileSpace.REAL:
+            diag[has_shape, :3] *= self._pixel_size[has_shape]
+        return diag
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "TileCollection":
+        """Return a new collection with the tiles at the given indices."""
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        return TileCollection(
+            top_l=self._top_l[indices],
+            diag=self._diag[indices],
+            origin=self._origin[indices],
+            shape=self._shape[indices],
+            pixel_sizes=[self._pixel_sizes[i] for i in indices],
+            data_loaders=[self._data_loaders[i] for i in indices],
+            space=self._space,
+            tile_index=self._tile_index[indices],
+        )
+
+    def __len__(self) -> int:
+        """Return the number of tiles."""
+        return len(self._pixel_sizes)
+
+    @overload
+    def __getitem__(self, index: int) -> Tile: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TileCollection": ...
+
+    def __getitem__(self, index: int | slice) -> "Tile | TileCollection":
+        """Return a tile view of a row, or a sub-collection for slices."""
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("TileCollection index out of range")
+        return self._tile_view(index)
+
+    def __iter__(self) -> Iterator[Tile]:
+        """Iterate over the tiles views."""
+        for i in range(len(self)):
+            yield self._tile_view(i)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the collection."""
+        return f"TileCollection(num_tiles={len(self)}, space={self._space})"
+
+    def _tile_view(self, i: int) -> Tile:
+        """Build the tile corresponding to the i-th row."""
+        # The rows are validated when the collection is built from tiles and
+        # every transformation keeps them valid, so the views skip validation.
+        _cast = int if self._space == TileSpace.PIXEL else float
+        x, y, z, c, t = self._top_l[i].tolist()
+        top_l = Point._unchecked(_cast(x), _cast(y), _cast(z), int(c), int(t))
+        x, y, z, c, t = self._diag[i].tolist()
+        diag = Vector._unchecked(_cast(x), _cast(y), _cast(z), int(c), int(t))
+        shape = tuple(self._shape[i].tolist())
+        return Tile._unchecked(
+            top_l=top_l,
+            diag=diag,
+            pixel_size=self._pixel_sizes[i],
+            origin=OriginDict(*self._origin[i].tolist()),
+            shape=None if shape[0] < 0 else shape,
+            space=self._space,
+            data_loader=self._data_loaders[i],
+        )
+
+    @property
+    def top_l(self) -> np.ndarray:
+        """Return the (n, 5) array of the top-left corners."""
+        return self._top_l
+
+    @property
+    def diag(self) -> np.ndarray:
+        """Return the (n, 5) array of the diagonal vectors."""
+        return self._diag
+
+    @property
+    def origin(self) -> np.ndarray:
+        """Return the (n, 3) array of the origin references."""
+        return self._origin
+
+    @property
+    def shape(self) -> np.ndarray:
+        """Return the (n, 5) array of the tiles shapes (-1 if unknown)."""
+        return self._shape
+
+    @property
+    def pixel_size(self) -> np.ndarray:
+        """Return the (n, 3) array of the pixel sizes (x, y, z)."""
+        return self._pixel_size
+
+    @property
+    def pixel_sizes(self) -> list[PixelSize]:
+        """Return the pixel size of each tile."""
+        return self._pixel_sizes
+
+    @property
+    def data_loaders(self) -> list[TileLoader | None]:
+        """Return the data loader of each tile."""
+        return self._data_loaders
+
+    @property
+    def tile_index(self) -> np.ndarray:
+        """Return the (n,) array of the tiles indices."""
+        return self._tile_index
+
+    @property
+    def space(self) -> TileSpace:
+        """Return the space of the tiles."""
+        return self._space
+
+    def to_pixel_space(self) -> "TileCollection":
+        """Convert all the tiles to pixel space."""
+        if self._space == TileSpace.PIXEL:
+            raise ValueError("Tiles are already in pixel space")
+        top_l = self._top_l.copy()
+        diag = self._diag.copy()
+        # Same as int(v / pixel_size) on each coordinate
+        top_l[:, :3] = np.trunc(top_l[:, :3] / self._pixel_size)
+        diag[:, :3] = np.trunc(diag[:, :3] / self._pixel_size)
+        return self.derive(top_l=top_l, diag=diag, space=TileSpace.PIXEL)
+
+    def to_real_space(self) -> "TileCollection":
+        """Convert all the tiles to real space."""
+        if self._space == TileSpace.REAL:
+            raise ValueError("Tiles are already in real space")
+        top_l = self._top_l.copy()
+        diag = self._diag.copy()
+        top_l[:, :3] = top_l[:, :3] * self._pixel_size
+        diag[:, :3] = diag[:, :3] * self._pixel_size
+        return self.derive(top_l=top_l, diag=diag, space=TileSpace.REAL)
@@ -0,0 +1,286 @@
+"""Loading of the tiles data for the writers, with a bounded prefetch queue."""
+
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Hashable, Sequence
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadingStats:
+    """Statistics of the tiles loading, to tune the prefetch depth.
+
+    Attributes:
+        num_loads (int): The number of blocks loaded (blocks dropped from the
+            cache are loaded again).
+        load_time (float): The total time spent loading blocks, in seconds.
+        writer_stall_time (float): The total time the writers waited for blocks
+            to be loaded, in seconds.
+        loader_stall_time (float): The total time the loaders waited for a free
+            slot in the prefetch queue, in seconds.
+        mean_occupancy (float): The time averaged number of prefetched blocks
+            waiting for the writers.
+        max_occupancy (int): The maximum number of prefetched blocks waiting
+            for the writers.
+    """
+
+    num_loads: int = 0
+    load_time: float = 0.0
+    writer_stall_time: float = 0.0
+    loader_stall_time: float = 0.0
+    mean_occupancy: float = 0.0
+    max_occupancy: int = 0
+
+    def summary(self) -> str:
+        """Return a one line summary of the statistics."""
+        return (
+            f"{self.num_loads} blocks loaded in {self.load_time:.2f}s, "
+            f"writers stalled {self.writer_stall_time:.2f}s, "
+            f"loaders stalled {self.loader_stall_time:.2f}s, "
+            f"prefetch queue occupancy {self.mean_occupancy:.2f} "
+            f"(max {self.max_occupancy})"
+        )
+
+
+class TileDataCache:
+    """The loaded tiles data, kept only as long as the writers still need it.
+
+    The writers process work units (e.g. the chunks of the image) in order, each
+    needing some blocks of tiles data, identified by a key (e.g. the index of
+    the tile and the block). The data of a block is dropped once all the work
+    units needing it are done. When the loaded data exceeds the memory budget,
+    the blocks not in use and needed again the latest are dropped (and loaded
+    again when needed).
+
+    With a prefetch depth, loader threads load the blocks in the order they are
+    first needed, up to `prefetch_depth` blocks ahead of the writers, so that
+    loading and writing overlap. The prefetched blocks waiting for the writers
+    are kept in addition to the memory budget.
+
+    The cache is a context manager, the loader threads are stopped on exit.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[Hashable], np.ndarray],
+        work_units: Sequence[Sequence[Hashable]],
+        max_bytes: int,
+        prefetch_depth: int = 0,
+        num_loaders: int = 1,
+        serialize_loads: bool = True,
+    ):
+        """Initialize the cache.
+
+        Args:
+            load (Callable[[Hashable], np.ndarray]): The function loading the
+                block of data with the given key.
+            work_units (Sequence[Sequence[Hashable]]): The keys of the blocks
+                needed by each work unit, in the order the work units are
+                processed.
+            max_bytes (int): The maximum size of the data kept in memory.
+            prefetch_depth (int): The maximum number of blocks loaded ahead of
+                the writers. 0 disables the prefetching.
+            num_loaders (int): The number of threads prefetching the blocks.
+            serialize_loads (bool): Whether to never load two blocks at the same
+                time, for data loaders that are not thread safe.
+        """
+        if prefetch_depth < 0:
+            raise ValueError("The prefetch depth must be positive.")
+        if num_loaders < 1:
+            raise ValueError("The number of loaders must be at least 1.")
+        self._load_block = load
+        self._max_bytes = max_bytes
+        # The work units still needing each block, in order
+        self._pending: dict[Hashable, list[int]] = {}
+        for index, unit in enumerate(work_units):
+            for key in unit:
+                self._pending.setdefault(key, []).append(index)
+        # The blocks in the order they are first needed
+        self._order = list(self._pending)
+
+        self._data: dict[Hashable, np.ndarray] = {}
+        self._in_use: Counter[Hashable] = Counter()
+        self._nbytes = 0
+        self._cond = threading.Condition()
+        self._load_locks = {key: threading.Lock() for key in self._pending}
+        self._serial_load = threading.Lock() if serialize_loads else nullcontext()
+        self.stats = LoadingStats()
+
+        # Prefetching state
+        self._prefetch_depth = prefetch_depth
+        self._used: set[Hashable] = set()
+        self._prefetched: set[Hashable] = set()
+        self._reserved = 0
+        self._next = 0
+        self._stopped = False
+        self._start_time = self._occupancy_time = time.perf_counter()
+        self._occupancy_area = 0.0
+        self._threads = []
+        if prefetch_depth > 0:
+            self._threads = [
+                threading.Thread(target=self._prefetch_worker, daemon=True)
+                for _ in range(num_loaders)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> "TileDataCache":
+        """Return the cache."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop the loader threads."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop the loader threads and finalize the statistics."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        with self._cond:
+            self._update_occupancy()
+            elapsed = self._occupancy_time - self._start_time
+            if elapsed > 0:
+                self.stats.mean_occupancy = self._occupancy_area / elapsed
+
+    def acquire(self, key: Hashable) -> np.ndarray:
+        """Return a block of data, waiting for it or loading it if needed."""
+        start = time.perf_counter()
+        # A block is loaded only once at a time
+        with self._load_locks[key]:
+            with self._cond:
+                self._used.add(key)
+                data = self._data.get(key)
+                if data is not None:
+                    if key in self._prefetched:
+                        # The prefetched block was already marked in use
+                        self._update_occupancy()
+                        self._prefetched.discard(key)
+                        self._reserved -= 1
+                        self._cond.notify_all()
+                    else:
+                        self._in_use[key] += 1
+                    self.stats.writer_stall_time += time.perf_counter() - start
+                    return data
+
+            data = self._load(key)
+            with self._cond:
+                self._store(key, data)
+                self.stats.writer_stall_time += time.perf_counter() - start
+            return data
+
+    def release(self, key: Hashable, unit_index: int) -> None:
+        """Release a block used by a work unit."""
+        with self._cond:
+            self._in_use[key] -= 1
+            self._pending[key].remove(unit_index)
+            if not self._pending[key]:
+                self._drop(key)
+            self._evict()
+
+    def discard(self, key: Hashable, unit_index: int) -> None:
+        """Mark a block as not needed by a work unit, without acquiring it."""
+        with self._cond:
+            self._pending[key].remove(unit_index)
+            if self._pending[key]:
+                return None
+            if key in self._prefetched:
+                # No writer will acquire the prefetched block
+                self._update_occupancy()
+                self._prefetched.discard(key)
+                self._reserved -= 1
+                self._in_use[key] -= 1
+                self._cond.notify_all()
+            if self._in_use[key] == 0:
+                self._drop(key)
+
+    def _load(self, key: Hashable) -> np.ndarray:
+        """Load a block of data."""
+        with self._serial_load:
+            start = time.perf_counter()
+            data = np.asarray(self._load_block(key))
+            elapsed = time.perf_counter() - start
+        with self._cond:
+            self.stats.num_loads += 1
+            self.stats.load_time += elapsed
+        return data
+
+    def _store(self, key: Hashable, data: np.ndarray) -> None:
+        """Keep a block of data in use."""
+        self._data[key] = data
+        self._nbytes += data.nbytes
+        self._in_use[key] += 1
+        self._evict()
+
+    def _drop(self, key: Hashable) -> None:
+        data = self._data.pop(key, None)
+        if data is not None:
+            self._nbytes -= data.nbytes
+
+    def _evict(self) -> None:
+        """Drop the blocks needed again the latest, until within the budget."""
+        while self._nbytes > self._max_bytes:
+            candidates = [key for key in self._data if self._in_use[key] == 0]
+            if not candidates:
+                return None
+            self._drop(max(candidates, key=lambda k: self._pending[k][0]))
+
+    def _update_occupancy(self) -> None:
+        """Accumulate the occupancy of the prefetch queue since the last change."""
+        now = time.perf_counter()
+        self._occupancy_area += len(self._prefetched) * (now - self._occupancy_time)
+        self._occupancy_time = now
+
+    def _prefetch_worker(self) -> None:
+        """Load the blocks in the order they are first needed."""
+        while True:
+            with self._cond:
+                start = time.perf_counter()
+                while self._reserved >= self._prefetch_depth and not self._stopped:
+                    self._cond.wait()
+                self.stats.loader_stall_time += time.perf_counter() - start
+                if self._stopped or self._next >= len(self._order):
+                    return None
+                key = self._order[self._next]
+                self._next += 1
+                if key in self._used:
+                    continue
+                self._reserved += 1
+
+            try:
+                self._prefetch(key)
+            except Exception as e:
+                # The writer loads the block again, and gets the error
+                logger.debug(f"Could not prefetch the block {key}: {e}")
+                with self._cond:
+                    self._reserved -= 1
+                    self._cond.notify_all()
+
+    def _prefetch(self, key: Hashable) -> None:
+        """Load a block ahead of the writers."""
+        with self._load_locks[key]:
+            with self._cond:
+                if key in self._used or self._stopped:
+                    # The block was already loaded by a writer
+                    self._reserved -= 1
+                    self._cond.notify_all()
+                    return None
+
+            data = self._load(key)
+            with self._cond:
+                # Keep the block in use until a writer acquires it
+                self._store(key, data)
+                self._update_occupancy()
+                self._prefetched.add(key)
+                self.stats.max_occupancy = max(
+                    self.stats.max_occupancy, len(self._prefetched)
+                )
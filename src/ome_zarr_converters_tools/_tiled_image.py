@@ -5,6 +5,7 @@ from typing import Protocol
 from ngio import PixelSize
 
 from ome_zarr_converters_tools._tile import Tile
+from ome_zarr_converters_tools._tile_collection import TileCollection
 
 
 class PathBuilder(Protocol):
@@ -117,7 +118,7 @@ class TiledImage:
         """
         self._name = name
         self._path_builder = path_builder
-        self._tiles = []
+        self._tiles: list[Tile] = []
 
         self._channel_names = channel_names
         self._wavelength_ids = wavelength_ids
@@ -127,12 +128,22 @@ class TiledImage:
         """Return the string representation of the object."""
         return f"TiledImage(name={self._name}, path={self.path})"
 
+    @property
+    def name(self) -> str:
+        """Return the name of the tiled image."""
+        return self._name
+
     @property
     def tiles(self) -> list[Tile]:
         """Return the tiles."""
         return self._tiles
 
-    def add_tile(self, Tile):
+    @property
+    def tile_collection(self) -> TileCollection:
+        """Return the tiles as an array backed TileCollection."""
+        return TileCollection.from_tiles(self._tiles)
+
+    def add_tile(self, Tile: Tile) -> None:
         """Add a tile to the acquisition."""
         self._tiles.append(Tile)
 
@@ -0,0 +1,139 @@
+"""Split the conversion of an image in work units written in parallel."""
+
+import logging
+import os
+import shutil
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+from ome_zarr_converters_tools._tile import Tile
+from ome_zarr_converters_tools._tile_collection import TileCollection
+
+logger = logging.getLogger(__name__)
+
+SplitMode = Literal["none", "time", "channel", "z", "xy"]
+
+_SPLIT_AXES = {"time": 0, "channel": 1, "z": 2, "xy": 3}
+
+# The directory, inside the image, where the work units record their progress
+_WORK_UNITS_DIR = ".work_units"
+_FINALIZE_CLAIM = "finalize.claim"
+
+
+def plan_work_units(
+    shape: Sequence[int],
+    chunks: Sequence[int],
+    itemsize: int,
+    split_mode: SplitMode,
+    target_bytes: int,
+) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+    """Split an image in regions aligned with the chunks, along one axis.
+
+    The image is split in ranges of time points, channels or z planes, or in
+    bands of rows of chunks for the "xy" mode. Each region holds as many
+    chunks along the axis as fit in the target size (at least one).
+
+    Args:
+        shape (Sequence[int]): The (t, c, z, y, x) shape of the image.
+        chunks (Sequence[int]): The (t, c, z, y, x) chunk shape of the image.
+        itemsize (int): The size of a pixel in bytes.
+        split_mode (SplitMode): The axis to split the image along.
+        target_bytes (int): The target uncompressed size of a region.
+
+    Returns:
+        list[tuple[tuple[int, ...], tuple[int, ...]]]: The (t, c, z, y, x)
+            start and stop of each region.
+    """
+    if split_mode == "none":
+        return [((0,) * len(shape), tuple(shape))]
+    if split_mode not in _SPLIT_AXES:
+        raise ValueError(f"Unknown split mode: {split_mode}")
+    axis = _SPLIT_AXES[split_mode]
+    # The size of a slab of the image, one chunk thick along the axis
+    slab_bytes = int(np.prod(shape)) // shape[axis] * chunks[axis] * itemsize
+    step = max(1, target_bytes // max(slab_bytes, 1)) * chunks[axis]
+    regions = []
+    for a in range(0, shape[axis], step):
+        start, stop = [0] * len(shape), list(shape)
+        start[axis], stop[axis] = a, min(a + step, shape[axis])
+        regions.append((tuple(start), tuple(stop)))
+    return regions
+
+
+def tiles_in_region(
+    tiles: list[Tile] | TileCollection, start: Sequence[int], stop: Sequence[int]
+) -> list[int]:
+    """Return the indices of the tiles overlapping a (t, c, z, y, x) region.
+
+    The tiles hold all the time points and channels of the image, so only
+    their z, y and x extent is checked. As when planning the chunk writes, the
+    extent of the tiles is padded by one pixel, since the tile data can be off
+    by one pixel from the tile shape.
+    """
+    indices = []
+    for i, tile in enumerate(tiles):
+        _, _, s_z, s_y, s_x = tile.shape
+        tile_start = (int(tile.top_l.z), int(tile.top_l.y), int(tile.top_l.x))
+        if all(
+            t_start < b and t_start + length + 1 > a
+            for t_start, length, a, b in zip(
+                tile_start, (s_z, s_y, s_x), start[2:], stop[2:], strict=True
+            )
+        ):
+            indices.append(i)
+    return indices
+
+
+def _work_units_dir(zarr_url: str | Path) -> Path:
+    return Path(zarr_url) / _WORK_UNITS_DIR
+
+
+def reset_work_units(zarr_url: str | Path) -> None:
+    """Remove the progress of the work units of an image."""
+    shutil.rmtree(_work_units_dir(zarr_url), ignore_errors=True)
+
+
+def mark_work_unit_done(zarr_url: str | Path, index: int) -> None:
+    """Record that a work unit of an image is written."""
+    units_dir = _work_units_dir(zarr_url)
+    units_dir.mkdir(parents=True, exist_ok=True)
+    (units_dir / f"{index}.done").touch()
+
+
+def work_unit_done(zarr_url: str | Path, index: int) -> bool:
+    """Check if a work unit of an image is already written."""
+    return (_work_units_dir(zarr_url) / f"{index}.done").exists()
+
+
+def claim_finalization(zarr_url: str | Path, num_units: int, index: int) -> bool:
+    """Check if all the work units are written, and claim the finalization.
+
+    Each work unit calls this once done (after `mark_work_unit_done`), so the
+    last one to finish sees all the work units done. The claim is an exclusive
+    file creation, so a single work unit finalizes the image even if several
+    finish at the same time. The claim records the work unit holding it, so
+    that it can finalize the image again if it was interrupted.
+
+    Args:
+        zarr_url (str | Path): The url of the image.
+        num_units (int): The number of work units of the image.
+        index (int): The index of the work unit claiming the finalization.
+
+    Returns:
+        bool: True if the work unit must finalize the image.
+    """
+    units_dir = _work_units_dir(zarr_url)
+    if any(not work_unit_done(zarr_url, i) for i in range(num_units)):
+        return False
+    claim = units_dir / _FINALIZE_CLAIM
+    try:
+        fd = os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return claim.read_text().strip() == str(index)
+    with os.fdopen(fd, "w") as f:
+        f.write(str(index))
+    logger.info(f"All the {num_units} work units of {zarr_url} are written.")
+    return True
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from ome_zarr_converters_tools._channel_histograms import (
+    ChannelHistogram,
+    ChannelHistograms,
+)
+
+
+def _expected(chunks, q):
+    values = np.concatenate([chunk.ravel() for chunk in chunks])
+    return np.percentile(values[values > 1e-16], q, method="nearest")
+
+
+@pytest.mark.parametrize("dtype", ["uint8", "uint16", "int16"])
+def test_fixed_bins_are_exact(dtype):
+    info = np.iinfo(dtype)
+    rng = np.random.default_rng(0)
+    chunks = [
+        rng.integers(max(info.min, -100), info.max, (3, 17, 13)).astype(dtype)
+        for _ in range(5)
+    ]
+    histogram = ChannelHistogram(dtype)
+    for chunk in chunks:
+        histogram.add(chunk)
+    for q in [0, 1, 50, 99.9, 100]:
+        assert histogram.percentile(q) == _expected(chunks, q)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64", "int32"])
+def test_adaptive_bins(dtype):
+    rng = np.random.default_rng(0)
+    # The range of the values grows with the chunks, so the bins are merged
+    chunks = [
+        rng.normal(10.0**k, 10.0 ** (k - 1), (3, 17, 13)).astype(dtype)
+        for k in range(5)
+    ]
+    histogram = ChannelHistogram(dtype, num_bins=1024)
+    for chunk in chunks:
+        histogram.add(chunk)
+    values = np.concatenate([chunk.ravel() for chunk in chunks])
+    span = values.max() - values[values > 0].min()
+    for q in [1, 50, 99.9]:
+        assert abs(histogram.percentile(q) - _expected(chunks, q)) <= 2 * span / 1024
+    # The extremes are exact
+    assert histogram.percentile(0) == _expected(chunks, 0)
+    assert histogram.percentile(100) == _expected(chunks, 100)
+
+
+def test_channel_histograms():
+    data = np.zeros((1, 3, 1, 4, 4), dtype="uint16")
+    data[0, 1] = 7
+    data[0, 2, 0, 0, :2] = [1, 2]
+    histograms = ChannelHistograms(num_channels=4, dtype="uint16")
+    histograms.add(1, data)
+    starts, ends = histograms.percentiles(0, 100)
+    # The zeros are not counted
+    assert starts == [0.0, 0.0, 7.0, 1.0]
+    assert ends == [0.0, 0.0, 7.0, 2.0]
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from numcodecs import Blosc, Zstd
+from utils import generate_tiled_image
+
+from ome_zarr_converters_tools._compression import (
+    benchmark_codecs,
+    main,
+    make_compressor,
+    sample_tiles,
+)
+from ome_zarr_converters_tools._pkl_utils import create_pkl
+
+
+def test_make_compressor():
+    assert make_compressor("default") == Blosc()
+    assert make_compressor("none") is None
+    assert make_compressor("blosc-zstd", level=3, shuffle="bitshuffle") == Blosc(
+        cname="zstd", clevel=3, shuffle=Blosc.BITSHUFFLE
+    )
+    assert make_compressor("zstd", level=9) == Zstd(level=9)
+
+    with pytest.raises(ValueError):
+        make_compressor("blosc-lz4", level=10)
+    with pytest.raises(ValueError):
+        make_compressor("zstd", level=0)
+    with pytest.raises(ValueError):
+        make_compressor("gzip")  # type: ignore[arg-type]
+
+
+def test_benchmark_codecs(tmp_path, capsys):
+    rng = np.random.default_rng(0)
+    samples = [rng.integers(0, 16, (1, 1, 1, 64, 64), dtype="uint16")] * 2
+    results = benchmark_codecs(samples, repeats=1)
+    assert [r.codec for r in results] == ["blosc-lz4", "blosc-zstd", "zstd", "none"]
+    ratios = {r.codec: r.ratio for r in results}
+    assert ratios["none"] == 1
+    assert ratios["blosc-zstd"] > 1
+    assert all(r.compress_mb_s > 0 and r.decompress_mb_s > 0 for r in results)
+
+    tiled_image = generate_tiled_image("plate_1", "image_1", "A", 1, 0)
+    assert len(sample_tiles(tiled_image, num_tiles=2)) == 2
+    assert len(sample_tiles(tiled_image, num_tiles=10)) == len(tiled_image.tiles)
+
+    pickle_path = create_pkl(tmp_path, tiled_image)
+    main([str(pickle_path), "--num-tiles", "2", "--level", "3"])
+    output = capsys.readouterr().out
+    for codec in ["blosc-lz4", "blosc-zstd", "zstd", "none"]:
+        assert codec in output
@@ -1,9 +1,19 @@
+import logging
 from pathlib import Path
 
+import numpy as np
 import pytest
+from ngio import open_ome_zarr_container
 from ngio.utils import NgioFileExistsError
-from utils import generate_tiled_image
+from utils import (
+    PlatePathBuilder,
+    TiledImage,
+    generate_grid_tiles,
+    generate_tiled_image,
+)
 
+from ome_zarr_converters_tools import Tile
+from ome_zarr_converters_tools._layout_cache import LayoutCache
 from ome_zarr_converters_tools._pkl_utils import remove_pkl
 from ome_zarr_converters_tools._task_common_models import (
     AdvancedComputeOptions,
@@ -69,9 +79,8 @@ def test_compute(tmp_path):
     with pytest.raises(NgioFileExistsError):
         generic_compute_task(zarr_url=zarr_url, init_args=init_args)
 
-    # This should not raise an error since the the pickle is removed
-    # after the first run failed
-    with pytest.raises(FileNotFoundError):
+    # The pickle is kept after the failed run, to retry the conversion
+    with pytest.raises(NgioFileExistsError):
         generic_compute_task(zarr_url=zarr_url, init_args=init_args)
 
 
@@ -85,6 +94,38 @@ def test_pickle_cleanup(tmp_path):
     assert not pickle_path.parent.exists()
 
 
+def test_compute_layout_cache_opt_in(tmp_path, monkeypatch):
+    used = []
+    monkeypatch.setattr(LayoutCache, "get", lambda self, key: used.append(key) or None)
+    monkeypatch.setattr(LayoutCache, "put", lambda self, key, entry: None)
+
+    tiled_images = [
+        generate_tiled_image(
+            plate_name="plate_1",
+            row="A",
+            column=0,
+            acquisition_id=0,
+            tiled_image_name="image_1",
+        )
+    ]
+    layout_cache_dir = str(tmp_path / "layouts")
+    for options, expected in [
+        # The layouts are not cached by default
+        (AdvancedComputeOptions(), False),
+        (AdvancedComputeOptions(layout_cache_dir=layout_cache_dir), True),
+    ]:
+        used.clear()
+        par_args = build_parallelization_list(
+            zarr_dir=tmp_path / f"images_{expected}",
+            tiled_images=tiled_images,
+            overwrite=False,
+            advanced_compute_options=options,
+        )[0]
+        init_args = ConvertParallelInitArgs(**par_args["init_args"])
+        generic_compute_task(zarr_url=par_args["zarr_url"], init_args=init_args)
+        assert bool(used) == expected
+
+
 def test_compute_multi_acquisition(tmp_path):
     images_path = tmp_path / "test_write_images"
 
@@ -136,3 +177,232 @@ def test_compute_multi_acquisition(tmp_path):
         "cell_line": "cell_line_1",
         "acquisition": "1",
     }
+
+
+def test_compute_with_memory_budget(tmp_path, caplog):
+    tiled_images = [
+        generate_tiled_image(
+            plate_name="plate_1",
+            row="A",
+            column=0,
+            acquisition_id=0,
+            tiled_image_name="image_1",
+        )
+    ]
+    par_args = build_parallelization_list(
+        zarr_dir=tmp_path / "test_write_images",
+        tiled_images=tiled_images,
+        overwrite=False,
+        advanced_compute_options=AdvancedComputeOptions(max_memory_mb=256),
+    )[0]
+    init_args = ConvertParallelInitArgs(**par_args["init_args"])
+    with caplog.at_level(logging.INFO):
+        image_list_updates = generic_compute_task(
+            zarr_url=par_args["zarr_url"], init_args=init_args
+        )
+
+    # The memory is reported in the logs, not in the image attributes
+    attributes = image_list_updates["image_list_updates"][0]["attributes"]
+    assert "max_memory_mb" not in attributes
+    assert "peak_memory_mb" not in attributes
+    assert "with a budget of 256MB" in caplog.text
+
+
+class ArrayLoader:
+    def __init__(self, data):
+        self.data = data
+
+    def load(self):
+        return self.data
+
+    @property
+    def dtype(self):
+        return str(self.data.dtype)
+
+
+@pytest.mark.parametrize("split_mode", ["channel", "z", "xy"])
+def test_compute_split_image(tmp_path, split_mode):
+    tile_shape = (1, 2, 4, 16, 16)
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=tile_shape, grid_size_x=3, grid_size_y=3
+    )
+    rng = np.random.default_rng(0)
+    tiled_image = TiledImage(
+        name="image_1",
+        path_builder=PlatePathBuilder(
+            plate_name="plate_1", row="A", column=1, acquisition_id=0
+        ),
+        channel_names=["channel1", "channel2"],
+        wavelength_ids=["wavelength1", "wavelength2"],
+    )
+    for tile in tiles:
+        tiled_image.add_tile(
+            Tile(
+                top_l=tile.top_l,
+                diag=tile.diag,
+                pixel_size=tile.pixel_size,
+                shape=tile_shape,
+                data_loader=ArrayLoader(
+                    rng.integers(0, 1000, tile_shape, dtype="uint16")
+                ),
+            )
+        )
+
+    containers = []
+    for mode in ["none", split_mode]:
+        options = AdvancedComputeOptions(
+            num_levels=3,
+            max_xy_chunk=8,
+            z_chunk=2,
+            split_mode=mode,
+            target_unit_mb=1e-3,
+        )
+        par_args = build_parallelization_list(
+            zarr_dir=tmp_path / mode,
+            tiled_images=[tiled_image],
+            overwrite=False,
+            advanced_compute_options=options,
+        )
+        if mode != "none":
+            assert len(par_args) > 1
+        updates = []
+        for args in par_args:
+            init_args = ConvertParallelInitArgs(**args["init_args"])
+            result = generic_compute_task(
+                zarr_url=args["zarr_url"], init_args=init_args
+            )
+            updates.extend(result["image_list_updates"])
+        # Only the last work unit finalizes the image
+        assert len(updates) == 1
+        assert updates[0]["types"] == {"is_3D": True, "has_time": False}
+        assert updates[0]["attributes"]["well"] == "A1"
+        containers.append(open_ome_zarr_container(updates[0]["zarr_url"]))
+
+    expected, split = containers
+    for path in expected.levels_paths:
+        np.testing.assert_array_equal(
+            expected.get_image(path=path).get_array(),
+            split.get_image(path=path).get_array(),
+        )
+    for channel, split_channel in zip(
+        expected.image_meta.channels_meta.channels,
+        split.image_meta.channels_meta.channels,
+        strict=True,
+    ):
+        assert channel.channel_visualisation.start == (
+            split_channel.channel_visualisation.start
+        )
+        assert channel.channel_visualisation.end == (
+            split_channel.channel_visualisation.end
+        )
+    for table in ["well_ROI_table", "FOV_ROI_table"]:
+        assert expected.get_table(table).rois() == split.get_table(table).rois()
+
+
+class FlakyLoader(ArrayLoader):
+    # Shared by all the tiles, to fail the conversion partway
+    fail_after: int | None = None
+    loads: int = 0
+
+    def load(self):
+        if FlakyLoader.fail_after is not None and (
+            FlakyLoader.loads >= FlakyLoader.fail_after
+        ):
+            raise RuntimeError("Tile not available")
+        FlakyLoader.loads += 1
+        return self.data
+
+
+@pytest.mark.parametrize("split_mode", ["none", "xy"])
+def test_compute_resume(tmp_path, split_mode):
+    tile_shape = (1, 1, 1, 16, 16)
+    tiles = generate_grid_tiles(
+        overlap=0.1, tile_shape=tile_shape, grid_size_x=4, grid_size_y=4
+    )
+    rng = np.random.default_rng(0)
+    tiled_image = TiledImage(
+        name="image_1",
+        path_builder=PlatePathBuilder(
+            plate_name="plate_1", row="A", column=1, acquisition_id=0
+        ),
+        channel_names=["channel1"],
+        wavelength_ids=["wavelength1"],
+    )
+    for tile in tiles:
+        tiled_image.add_tile(
+            Tile(
+                top_l=tile.top_l,
+                diag=tile.diag,
+                pixel_size=tile.pixel_size,
+                shape=tile_shape,
+                data_loader=FlakyLoader(
+                    rng.integers(0, 1000, tile_shape, dtype="uint16")
+                ),
+            )
+        )
+    options = AdvancedComputeOptions(
+        num_levels=2,
+        max_xy_chunk=16,
+        num_workers=1,
+        split_mode=split_mode,
+        target_unit_mb=1e-3,
+    )
+
+    def build(zarr_dir):
+        return build_parallelization_list(
+            zarr_dir=zarr_dir,
+            tiled_images=[tiled_image],
+            overwrite=False,
+            advanced_compute_options=options,
+        )
+
+    def run(par_args):
+        updates = []
+        for args in par_args:
+            init_args = ConvertParallelInitArgs(**args["init_args"])
+            result = generic_compute_task(
+                zarr_url=args["zarr_url"], init_args=init_args
+            )
+            updates.extend(result["image_list_updates"])
+        return updates
+
+    FlakyLoader.fail_after, FlakyLoader.loads = None, 0
+    (expected,) = run(build(tmp_path / "expected"))
+    # The tiles across work units are loaded by each of them
+    full_loads = FlakyLoader.loads
+
+    # The first run fails after writing some tiles
+    par_args = build(tmp_path / "resumed")
+    FlakyLoader.fail_after, FlakyLoader.loads = 6, 0
+    with pytest.raises(RuntimeError):
+        run(par_args)
+    zarr_url = par_args[0]["zarr_url"]
+    assert (Path(zarr_url) / ".conversion_progress").exists()
+
+    # Running the conversion again resumes it
+    FlakyLoader.fail_after, FlakyLoader.loads = None, 0
+    try:
+        (resumed,) = run(build(tmp_path / "resumed"))
+    finally:
+        FlakyLoader.fail_after = None
+    assert FlakyLoader.loads < full_loads
+    assert resumed["types"] == expected["types"]
+    assert not (Path(zarr_url) / ".conversion_progress").exists()
+    assert not (Path(zarr_url) / ".work_units").exists()
+
+    expected_container = open_ome_zarr_container(expected["zarr_url"])
+    resumed_container = open_ome_zarr_container(zarr_url)
+    for path in expected_container.levels_paths:
+        np.testing.assert_array_equal(
+            expected_container.get_image(path=path).get_array(),
+            resumed_container.get_image(path=path).get_array(),
+        )
+    for table in ["well_ROI_table", "FOV_ROI_table"]:
+        assert (
+            expected_container.get_table(table).rois()
+            == resumed_container.get_table(table).rois()
+        )
+
+    # A finalized image is not converted again
+    with pytest.raises(NgioFileExistsError):
+        run(build(tmp_path / "resumed"))
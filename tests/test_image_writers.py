@@ -1,17 +1,31 @@
+import time
+from functools import partial
 from pathlib import Path
 
+import numpy as np
 import pytest
 from ngio import PixelSize, open_ome_zarr_container
 from ngio.utils import NgioFileExistsError
+from numcodecs import Blosc, Zstd
 from utils import (
     DummyLoader,
     PlatePathBuilder,
     TiledImage,
+    generate_grid_tiles,
     generate_tiled_image,
 )
 
 from ome_zarr_converters_tools import Point, Tile
-from ome_zarr_converters_tools._omezarr_image_writers import write_tiled_image
+from ome_zarr_converters_tools._omezarr_image_writers import (
+    _plan_chunk_shape,
+    _plan_chunk_writes,
+    _plan_level_chunks,
+    _plan_memory,
+    apply_stitching_pipe,
+    init_empty_ome_zarr_image,
+    write_tiled_image,
+    write_tiles_as_rois,
+)
 from ome_zarr_converters_tools._stitching import standard_stitching_pipe
 
 
@@ -166,3 +180,628 @@ def test_write_fail_overwrite(tmp_path):
             num_levels=2,
             overwrite=False,
         )
+
+
+def test_apply_stitching_pipe_shares_loaders():
+    tiled_image = generate_tiled_image(
+        plate_name="plate_1",
+        row="A",
+        column=1,
+        acquisition_id=0,
+        tiled_image_name="image_1",
+    )
+    input_tiles = list(tiled_image.tiles)
+    loaders = {id(tile._data_loader) for tile in input_tiles}
+
+    tiles = apply_stitching_pipe(tiled_image, standard_stitching_pipe)
+    # The loaders are shared by reference, and the input tiles are untouched
+    assert {id(loader) for loader in tiles.data_loaders} == loaders
+    assert tiled_image.tiles == input_tiles
+    with pytest.raises(ValueError):
+        tiles.top_l[0, 0] = 1.0
+
+
+class SlowConstantLoader:
+    def __init__(self, shape, value, delay):
+        self.shape = shape
+        self.value = value
+        self.delay = delay
+
+    def load(self):
+        time.sleep(self.delay)
+        return np.full(self.shape, self.value, dtype="uint8")
+
+    @property
+    def dtype(self):
+        return "uint8"
+
+
+@pytest.mark.parametrize("mode", ["none", "grid"])
+def test_write_tiles_concurrently(tmp_path, mode):
+    tile_shape = (1, 1, 1, 11, 10)
+    tiles = generate_grid_tiles(
+        overlap=0.7, tile_shape=tile_shape, grid_size_x=4, grid_size_y=3
+    )
+    tiled_image = TiledImage(
+        name="image_1",
+        path_builder=PlatePathBuilder(
+            plate_name="plate_1", row="A", column=1, acquisition_id=0
+        ),
+        channel_names=["channel1"],
+        wavelength_ids=["wavelength1"],
+    )
+    for i, tile in enumerate(tiles):
+        # The first tiles are the slowest to load, to shuffle the writes
+        loader = SlowConstantLoader(tile_shape, value=i + 1, delay=0.02 / (i + 1))
+        tiled_image.add_tile(
+            Tile(
+                top_l=tile.top_l,
+                diag=tile.diag,
+                pixel_size=tile.pixel_size,
+                shape=tile_shape,
+                data_loader=loader,
+            )
+        )
+
+    stitching_pipe = partial(standard_stitching_pipe, mode=mode)
+    arrays, roi_tables = [], []
+    for num_workers in [1, 4]:
+        image_url = tmp_path / f"workers_{num_workers}.zarr"
+        write_tiled_image(
+            zarr_url=image_url,
+            tiled_image=tiled_image,
+            stiching_pipe=stitching_pipe,
+            max_xy_chunk=4,
+            num_workers=num_workers,
+        )
+        container = open_ome_zarr_container(image_url)
+        arrays.append(container.get_image().get_array())
+        table = container.get_table("FOV_ROI_table", check_type="roi_table")
+        roi_tables.append(table.dataframe)
+
+    # The overlapping tiles are written in order, as with a single worker
+    assert np.array_equal(arrays[0], arrays[1])
+    assert roi_tables[0].equals(roi_tables[1])
+    assert list(roi_tables[1].index) == [f"FOV_{i}" for i in range(len(tiles))]
+
+
+def test_chunk_write_plan():
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=(1, 2, 1, 11, 10), grid_size_x=2, grid_size_y=2
+    )
+    tiles = standard_stitching_pipe(tiles, mode="none")
+    shape, chunks = (1, 2, 1, 21, 19), (1, 1, 1, 8, 8)
+    plan = _plan_chunk_writes(tiles, shape=shape, chunks=chunks)
+    # Every chunk is covered and planned once, column by column
+    assert [region.start for region in plan] == [
+        (0, c, 0, y, x) for y in (0, 8, 16) for x in (0, 8, 16) for c in (0, 1)
+    ]
+    assert plan[-1].stop == (1, 2, 1, 21, 19)
+    for region in plan:
+        assert list(region.tiles) == sorted(region.tiles)
+    # The first chunk is only covered by the first tile
+    assert plan[0].tiles == (0,)
+
+    # When streaming, the chunks are planned plane by plane
+    plan = _plan_chunk_writes(tiles, shape=shape, chunks=chunks, stream=True)
+    assert [region.start for region in plan] == [
+        (0, c, 0, y, x) for c in (0, 1) for y in (0, 8, 16) for x in (0, 8, 16)
+    ]
+
+
+def test_write_tiles_with_small_cache(tmp_path):
+    tile_shape = (1, 1, 1, 11, 10)
+    tiles = generate_grid_tiles(
+        overlap=0.7, tile_shape=tile_shape, grid_size_x=3, grid_size_y=3
+    )
+    tiled_image = TiledImage(
+        name="image_1",
+        path_builder=PlatePathBuilder(
+            plate_name="plate_1", row="A", column=1, acquisition_id=0
+        ),
+        channel_names=["channel1"],
+        wavelength_ids=["wavelength1"],
+    )
+    for i, tile in enumerate(tiles):
+        loader = SlowConstantLoader(tile_shape, value=i + 1, delay=0)
+        tiled_image.add_tile(
+            Tile(
+                top_l=tile.top_l,
+                diag=tile.diag,
+                pixel_size=tile.pixel_size,
+                shape=tile_shape,
+                data_loader=loader,
+            )
+        )
+    stitched = apply_stitching_pipe(
+        tiled_image, partial(standard_stitching_pipe, mode="none")
+    )
+
+    arrays = []
+    for max_cache_bytes in [0, 2**30]:
+        container = init_empty_ome_zarr_image(
+            zarr_url=tmp_path / f"cache_{max_cache_bytes}.zarr",
+            tiles=stitched,
+            pixel_size=tiled_image.pixel_size,
+            channel_names=tiled_image.channel_names,
+            wavelength_ids=tiled_image.wavelength_ids,
+            num_levels=1,
+            max_xy_chunk=4,
+        )
+        image = write_tiles_as_rois(
+            container, stitched, max_cache_bytes=max_cache_bytes
+        )
+        arrays.append(image.get_array())
+
+    # Overlapping tiles: the last one wins
+    expected = np.zeros_like(arrays[0])
+    for tile in stitched:
+        x, y = int(tile.top_l.x), int(tile.top_l.y)
+        expected[..., y : y + 11, x : x + 10] = tile.load()[0]
+    assert np.array_equal(arrays[0], expected)
+    assert np.array_equal(arrays[1], expected)
+
+
+class ArrayLoader:
+    def __init__(self, data):
+        self.data = data
+
+    def load(self):
+        return self.data
+
+    @property
+    def dtype(self):
+        return str(self.data.dtype)
+
+
+class RegionArrayLoader(ArrayLoader):
+    def __init__(self, data):
+        super().__init__(data)
+        self.blocks = []
+
+    def load(self):
+        raise AssertionError("The whole tile should not be loaded.")
+
+    def load_region(self, t, c, z):
+        block = self.data[t, c, z]
+        self.blocks.append(block.shape)
+        return block
+
+
+def test_write_tiles_streaming(tmp_path):
+    tile_shape = (2, 3, 5, 11, 10)
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=tile_shape, grid_size_x=2, grid_size_y=2
+    )
+    rng = np.random.default_rng(0)
+    tiles_data = [rng.integers(0, 255, tile_shape, dtype="uint8") for _ in tiles]
+
+    arrays, region_loaders = [], []
+    for loader_cls in [ArrayLoader, RegionArrayLoader]:
+        tiled_image = TiledImage(
+            name="image_1",
+            path_builder=PlatePathBuilder(
+                plate_name="plate_1", row="A", column=1, acquisition_id=0
+            ),
+            channel_names=["channel1", "channel2", "channel3"],
+            wavelength_ids=["wavelength1", "wavelength2", "wavelength3"],
+        )
+        for tile, data in zip(tiles, tiles_data, strict=True):
+            loader = loader_cls(data)
+            if isinstance(loader, RegionArrayLoader):
+                region_loaders.append(loader)
+            tiled_image.add_tile(
+                Tile(
+                    top_l=tile.top_l,
+                    diag=tile.diag,
+                    pixel_size=tile.pixel_size,
+                    shape=tile_shape,
+                    data_loader=loader,
+                )
+            )
+        image_url = tmp_path / f"{loader_cls.__name__}.zarr"
+        write_tiled_image(
+            zarr_url=image_url,
+            tiled_image=tiled_image,
+            stiching_pipe=standard_stitching_pipe,
+            num_levels=1,
+            max_xy_chunk=8,
+            z_chunk=2,
+        )
+        arrays.append(open_ome_zarr_container(image_url).get_image().get_array())
+
+    assert arrays[0].shape == (2, 3, 5, 22, 20)
+    assert np.array_equal(arrays[0], arrays[1])
+    # The tiles are streamed in blocks of one t, one c and two z chunks
+    for loader in region_loaders:
+        assert len(loader.blocks) == 2 * 3 * 3
+        assert all(block[:3] <= (1, 1, 2) for block in loader.blocks)
+
+
+@pytest.mark.parametrize(
+    "tile_shape, max_xy_chunk, num_workers",
+    [
+        ((1, 2, 1, 16, 16), 8, 1),
+        ((1, 1, 3, 11, 10), 7, 1),
+        ((2, 2, 1, 13, 9), 4, 3),
+    ],
+)
+def test_write_incremental_pyramid(tmp_path, tile_shape, max_xy_chunk, num_workers):
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=tile_shape, grid_size_x=3, grid_size_y=2
+    )
+    rng = np.random.default_rng(0)
+    tiles_data = [rng.integers(0, 65535, tile_shape, dtype="uint16") for _ in tiles]
+
+    pyramids = []
+    for pyramid_mode in ["incremental", "consolidate"]:
+        tiled_image = TiledImage(
+            name="image_1",
+            path_builder=PlatePathBuilder(
+                plate_name="plate_1", row="A", column=1, acquisition_id=0
+            ),
+            channel_names=[f"channel{i}" for i in range(tile_shape[1])],
+            wavelength_ids=[f"wavelength{i}" for i in range(tile_shape[1])],
+        )
+        for tile, data in zip(tiles, tiles_data, strict=True):
+            tiled_image.add_tile(
+                Tile(
+                    top_l=tile.top_l,
+                    diag=tile.diag,
+                    pixel_size=tile.pixel_size,
+                    shape=tile_shape,
+                    data_loader=ArrayLoader(data),
+                )
+            )
+        image_url = tmp_path / f"{pyramid_mode}.zarr"
+        write_tiled_image(
+            zarr_url=image_url,
+            tiled_image=tiled_image,
+            stiching_pipe=standard_stitching_pipe,
+            num_levels=4,
+            max_xy_chunk=max_xy_chunk,
+            z_chunk=2,
+            num_workers=num_workers,
+            pyramid_mode=pyramid_mode,
+        )
+        container = open_ome_zarr_container(image_url)
+        pyramids.append(
+            [
+                container.get_image(path=path).get_array()
+                for path in container.levels_paths
+            ]
+        )
+
+    incremental, consolidated = pyramids
+    assert len(incremental) == 4
+    for level, expected in zip(incremental, consolidated, strict=True):
+        np.testing.assert_array_equal(level, expected)
+
+
+@pytest.mark.parametrize("percentile_mode", ["histogram", "sample", None])
+def test_write_channel_percentiles(tmp_path, percentile_mode):
+    tile_shape = (1, 2, 1, 16, 16)
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=tile_shape, grid_size_x=2, grid_size_y=2
+    )
+    rng = np.random.default_rng(0)
+    tiled_image = TiledImage(
+        name="image_1",
+        path_builder=PlatePathBuilder(
+            plate_name="plate_1", row="A", column=1, acquisition_id=0
+        ),
+        channel_names=["channel1", "channel2"],
+        wavelength_ids=["wavelength1", "wavelength2"],
+    )
+    for tile in tiles:
+        data = rng.integers(0, 1000, tile_shape, dtype="uint16")
+        data[:, 1] *= 10
+        tiled_image.add_tile(
+            Tile(
+                top_l=tile.top_l,
+                diag=tile.diag,
+                pixel_size=tile.pixel_size,
+                shape=tile_shape,
+                data_loader=ArrayLoader(data),
+            )
+        )
+    image_url = tmp_path / "image.zarr"
+    kwargs = {} if percentile_mode is None else {"percentile_mode": percentile_mode}
+    write_tiled_image(
+        zarr_url=image_url,
+        tiled_image=tiled_image,
+        stiching_pipe=standard_stitching_pipe,
+        num_levels=2,
+        max_xy_chunk=8,
+        **kwargs,
+    )
+
+    container = open_ome_zarr_container(image_url)
+    channels = container.image_meta.channels_meta.channels
+    assert [channel.label for channel in channels] == ["channel1", "channel2"]
+    windows = [channel.channel_visualisation for channel in channels]
+    if percentile_mode != "histogram":
+        # The percentiles of the lowest resolution level, computed by ngio, as
+        # by default
+        container.set_channel_percentiles(start_percentile=1, end_percentile=99.9)
+        channels = container.image_meta.channels_meta.channels
+        assert windows == [channel.channel_visualisation for channel in channels]
+        return None
+
+    # The exact percentiles of the full resolution level
+    array = container.get_image().get_array()
+    for c, window in enumerate(windows):
+        values = array[c][array[c] > 0]
+        start, end = np.percentile(values, [1, 99.9], method="nearest")
+        assert (window.start, window.end) == (start, end)
+
+
+def test_plan_chunk_shape():
+    mb = 1024**2
+    # A z-stack of 2048x2048 uint16 tiles: 8 MB planes, two per chunk
+    shape = (1, 1, 50, 8000, 8000)
+    chunks = _plan_chunk_shape((1, 1, 50, 2048, 2048), shape, "uint16", 16 * mb)
+    assert chunks == (1, 1, 2, 2048, 2048)
+    # Small 2D tiles are grouped by powers of two, large ones are split
+    shape = (1, 2, 1, 8000, 8000)
+    assert _plan_chunk_shape((1, 2, 1, 512, 512), shape, "uint16", 16 * mb) == (
+        1,
+        1,
+        1,
+        2048,
+        2048,
+    )
+    assert _plan_chunk_shape((1, 2, 1, 4096, 4096), shape, "float64", 16 * mb) == (
+        1,
+        1,
+        1,
+        1024,
+        2048,
+    )
+    # The lower levels grow along z instead of getting smaller, split evenly
+    level_chunks = _plan_level_chunks((1, 2, 2048, 2048), (1, 50, 500, 500), "uint16")
+    assert level_chunks == (1, 25, 500, 500)
+
+
+def test_write_auto_chunks(tmp_path):
+    tile_shape = (1, 1, 6, 16, 16)
+    tiles = generate_grid_tiles(
+        overlap=1.0, tile_shape=tile_shape, grid_size_x=4, grid_size_y=2
+    )
+    rng = np.random.default_rng(0)
+    tiles_data = [rng.integers(0, 255, tile_shape, dtype="uint8") for _ in tiles]
+    arrays = []
+    for chunking_mode in ["fixed", "auto"]:
+        tiled_image = TiledImage(
+            name="image_1",
+            path_builder=PlatePathBuilder(
+                plate_name="plate_1", row="A", column=1, acquisition_id=0
+            ),
+            channel_names=["channel1"],
+            wavelength_ids=["wavelength1"],
+        )
+        for tile, data in zip(tiles, tiles_data, strict=True):
+            tiled_image.add_tile(
+                Tile(
+                    top_l=tile.top_l,
+                    diag=tile.diag,
+                    pixel_size=tile.pixel_size,
+                    shape=tile_shape,
+                    data_loader=ArrayLoader(data),
+                )
+            )
+        image_url = tmp_path / f"{chunking_mode}.zarr"
+        write_tiled_image(
+            zarr_url=image_url,
+            tiled_image=tiled_image,
+            stiching_pipe=standard_stitching_pipe,
+            num_levels=3,
+            chunking_mode=chunking_mode,
+            target_chunk_bytes=16 * 16 * 2,
+        )
+        container = open_ome_zarr_container(image_url)
+        arrays.append(
+            [container.get_image(path=path) for path in container.levels_paths]
+        )
+
+    fixed, auto = arrays
+    # Two z planes of a tile per chunk, more once the XY chunks get smaller
+    assert [image.chunks for image in auto] == [
+        (1, 2, 16, 16),
+        (1, 2, 16, 16),
+        (1, 3, 8, 16),
+    ]
+    for fixed_image, auto_image in zip(fixed, auto, strict=True):
+        np.testing.assert_array_equal(fixed_image.get_array(), auto_image.get_array())
+
+
+def test_write_skips_empty_chunks(tmp_path):
+    tile_shape = (1, 1, 1, 16, 16)
+    tiles = generate_grid_tiles(
+        overlap=1.0, tile_shape=tile_shape, grid_size_x=2, grid_size_y=2
+    )
+    tiled_image = TiledImage(
+        name="image_1",
+        path_builder=PlatePathBuilder(
+            plate_name="plate_1", row="A", column=1, acquisition_id=0
+        ),
+        channel_names=["channel1"],
+        wavelength_ids=["wavelength1"],
+    )
+    for i, tile in enumerate(tiles):
+        # The first tile is empty
+        data = np.full(tile_shape, i, dtype="uint8")
+        tiled_image.add_tile(
+            Tile(
+                top_l=tile.top_l,
+                diag=tile.diag,
+                pixel_size=tile.pixel_size,
+                shape=tile_shape,
+                data_loader=ArrayLoader(data),
+            )
+        )
+    image_url = tmp_path / "image.zarr"
+    write_tiled_image(
+        zarr_url=image_url,
+        tiled_image=tiled_image,
+        stiching_pipe=standard_stitching_pipe,
+        num_levels=3,
+        max_xy_chunk=8,
+    )
+
+    def num_chunk_files(level):
+        return sum(
+            1
+            for path in (image_url / level).rglob("*")
+            if path.is_file() and not path.name.startswith(".")
+        )
+
+    # 4 chunks per tile on level 0, one per tile on level 1
+    assert num_chunk_files("0") == 3 * 4
+    assert num_chunk_files("1") == 3
+    assert num_chunk_files("2") == 1
+    array = open_ome_zarr_container(image_url).get_image().get_array()
+    assert array.shape == (1, 1, 32, 32)
+    assert np.count_nonzero(array) == 3 * 16 * 16
+
+
+@pytest.mark.parametrize(
+    "compression, expected",
+    [
+        ("default", Blosc()),
+        ("zstd", Zstd(level=3)),
+        ("blosc-zstd", Blosc(cname="zstd", clevel=3, shuffle=Blosc.BITSHUFFLE)),
+        ("none", None),
+    ],
+)
+def test_write_compression(tmp_path, compression, expected):
+    tile_shape = (1, 1, 1, 16, 16)
+    tiles = generate_grid_tiles(
+        overlap=1.0, tile_shape=tile_shape, grid_size_x=2, grid_size_y=2
+    )
+    tiled_image = TiledImage(
+        name="image_1",
+        path_builder=PlatePathBuilder(
+            plate_name="plate_1", row="A", column=1, acquisition_id=0
+        ),
+        channel_names=["channel1"],
+        wavelength_ids=["wavelength1"],
+    )
+    rng = np.random.default_rng(0)
+    tiles_data = [rng.integers(0, 255, tile_shape, dtype="uint8") for _ in tiles]
+    for tile, data in zip(tiles, tiles_data, strict=True):
+        tiled_image.add_tile(
+            Tile(
+                top_l=tile.top_l,
+                diag=tile.diag,
+                pixel_size=tile.pixel_size,
+                shape=tile_shape,
+                data_loader=ArrayLoader(data),
+            )
+        )
+    image_url = tmp_path / "image.zarr"
+    write_tiled_image(
+        zarr_url=image_url,
+        tiled_image=tiled_image,
+        stiching_pipe=standard_stitching_pipe,
+        num_levels=2,
+        compression=compression,
+        compression_level=3,
+        shuffle="bitshuffle",
+    )
+    container = open_ome_zarr_container(image_url)
+    for path in container.levels_paths:
+        assert container.get_image(path=path).zarr_array.compressor == expected
+    array = container.get_image().get_array()
+    assert np.count_nonzero(array) == np.count_nonzero(tiles_data)
+
+
+def test_plan_memory():
+    mb = 1024**2
+    # A large budget keeps the settings
+    plan = _plan_memory(
+        1024 * mb,
+        worker_bytes=10 * mb,
+        block_bytes=4 * mb,
+        pyramid_bytes=100 * mb,
+        num_workers=4,
+        prefetch_depth=2,
+    )
+    assert (plan.num_workers, plan.prefetch_depth) == (4, 2)
+    assert plan.incremental_pyramid
+    assert plan.max_cache_bytes == (1024 - 100 - 4 * 10 - 2 * 4) * mb
+
+    # A small budget reduces the workers and the prefetching, and consolidates
+    plan = _plan_memory(
+        50 * mb,
+        worker_bytes=10 * mb,
+        block_bytes=4 * mb,
+        pyramid_bytes=100 * mb,
+        num_workers=4,
+        prefetch_depth=8,
+    )
+    assert (plan.num_workers, plan.prefetch_depth) == (2, 3)
+    assert not plan.incremental_pyramid
+    assert plan.max_cache_bytes == (50 - 2 * 10 - 3 * 4) * mb
+
+    # The budget cannot be met: a single worker, no prefetching nor cache
+    plan = _plan_memory(
+        5 * mb,
+        worker_bytes=10 * mb,
+        block_bytes=4 * mb,
+        pyramid_bytes=0,
+        num_workers=4,
+        prefetch_depth=2,
+    )
+    assert (plan.num_workers, plan.prefetch_depth, plan.max_cache_bytes) == (1, 0, 0)
+
+
+def test_write_with_memory_budget(tmp_path):
+    tile_shape = (1, 2, 3, 16, 16)
+    tiles = generate_grid_tiles(
+        overlap=1.0, tile_shape=tile_shape, grid_size_x=3, grid_size_y=2
+    )
+    rng = np.random.default_rng(0)
+    tiles_data = [rng.integers(0, 255, tile_shape, dtype="uint8") for _ in tiles]
+    arrays = []
+    for max_memory_bytes in [None, 2**30, 3000, 2**10]:
+        tiled_image = TiledImage(
+            name="image_1",
+            path_builder=PlatePathBuilder(
+                plate_name="plate_1", row="A", column=1, acquisition_id=0
+            ),
+            channel_names=["channel1", "channel2"],
+            wavelength_ids=["wavelength1", "wavelength2"],
+        )
+        for tile, data in zip(tiles, tiles_data, strict=True):
+            tiled_image.add_tile(
+                Tile(
+                    top_l=tile.top_l,
+                    diag=tile.diag,
+                    pixel_size=tile.pixel_size,
+                    shape=tile_shape,
+                    data_loader=ArrayLoader(data),
+                )
+            )
+        image_url = tmp_path / f"memory_{max_memory_bytes}.zarr"
+        write_tiled_image(
+            zarr_url=image_url,
+            tiled_image=tiled_image,
+            stiching_pipe=standard_stitching_pipe,
+            num_levels=3,
+            max_xy_chunk=8,
+            num_workers=4,
+            max_memory_bytes=max_memory_bytes,
+        )
+        container = open_ome_zarr_container(image_url)
+        arrays.append(
+            [
+                container.get_image(path=path).get_array()
+                for path in container.levels_paths
+            ]
+        )
+
+    # The budget changes how the image is written, not the image
+    for budgeted in arrays[1:]:
+        for expected, array in zip(arrays[0], budgeted, strict=True):
+            np.testing.assert_array_equal(expected, array)
@@ -1,9 +1,13 @@
-import pickle
 from pathlib import Path
 
 import pytest
 from utils import generate_tiled_image
 
+from ome_zarr_converters_tools._pkl_utils import (
+    create_manifest,
+    load_tiled_image,
+    remove_manifest_record,
+)
 from ome_zarr_converters_tools._task_common_models import (
     AdvancedComputeOptions,
     ConvertParallelInitArgs,
@@ -43,18 +47,22 @@ def test_build_par_list(tmp_path, overwrite, tm_dir_name):
         tmp_dir_name=tm_dir_name,
     )
 
-    for tiled_image, par_args in zip(tiled_images, par_list, strict=True):
+    for i, (tiled_image, par_args) in enumerate(
+        zip(tiled_images, par_list, strict=True)
+    ):
         init_args = par_args["init_args"]
         init_args = ConvertParallelInitArgs(**init_args)
         assert Path(init_args.tiled_image_pickled_path).exists()
+        assert init_args.tiled_image_index == i
         assert init_args.overwrite == overwrite
         assert init_args.advanced_compute_options == adv_comp_model
 
-        with open(init_args.tiled_image_pickled_path, "rb") as f:
-            tiled_image = pickle.load(f)
-            assert isinstance(tiled_image, TiledImage)
-            # This is just a proxy to check the equality of the object
-            assert str(tiled_image) == str(tiled_image)
+        loaded_image = load_tiled_image(
+            Path(init_args.tiled_image_pickled_path), index=i
+        )
+        assert isinstance(loaded_image, TiledImage)
+        # This is just a proxy to check the equality of the object
+        assert str(loaded_image) == str(tiled_image)
 
         if tm_dir_name is not None:
             assert (
@@ -93,4 +101,73 @@ def test_clenup_par_list(tmp_path):
     )
 
     assert (images_path / "_tmp_converter_dir").exists()
-    assert len(list((images_path / "_tmp_converter_dir").iterdir())) == len(par_list)
+    # A single manifest holds all the tiled images
+    assert len(par_list) == 2
+    assert len(list((images_path / "_tmp_converter_dir").iterdir())) == 1
+
+
+def test_manifest(tmp_path):
+    tiled_images = [
+        generate_tiled_image(
+            plate_name="plate_1",
+            row="A",
+            column=i,
+            acquisition_id=0,
+            tiled_image_name="image_1",
+        )
+        for i in range(1, 4)
+    ]
+    manifest_path = create_manifest(tmp_path / "manifest_dir", tiled_images)
+
+    for i in reversed(range(3)):
+        loaded_image = load_tiled_image(manifest_path, index=i)
+        assert str(loaded_image) == str(tiled_images[i])
+        assert len(loaded_image.tiles) == len(tiled_images[i].tiles)
+    with pytest.raises(IndexError):
+        load_tiled_image(manifest_path, index=3)
+
+    # The manifest is removed once all its tiled images are converted
+    remove_manifest_record(manifest_path, 2)
+    remove_manifest_record(manifest_path, 0)
+    assert manifest_path.exists()
+    remove_manifest_record(manifest_path, 1)
+    assert not manifest_path.exists()
+    assert not manifest_path.parent.exists()
+
+
+def test_build_par_list_order(tmp_path):
+    tiled_images = [
+        generate_tiled_image(
+            plate_name="plate_1",
+            row=row,
+            column=i,
+            acquisition_id=0,
+            tiled_image_name="image_1",
+        )
+        for row in ["A", "B"]
+        for i in range(1, 4)
+    ]
+    adv_comp_model = AdvancedComputeOptions(
+        max_xy_chunk=8, split_mode="xy", target_unit_mb=1e-4
+    )
+    par_list = build_parallelization_list(
+        zarr_dir=tmp_path,
+        tiled_images=tiled_images,
+        overwrite=False,
+        advanced_compute_options=adv_comp_model,
+    )
+    assert len(par_list) > len(tiled_images)
+
+    # The tasks follow the order of the tiled images, then of the work units
+    expected = [
+        (str(tmp_path / tiled_image.path), index)
+        for tiled_image in tiled_images
+        for index in range(par_list[0]["init_args"]["work_unit"]["num_units"])
+    ]
+    tasks = [
+        (par_args["zarr_url"], par_args["init_args"]["work_unit"]["index"])
+        for par_args in par_list
+    ]
+    assert tasks == expected
+    indices = [par_args["init_args"]["tiled_image_index"] for par_args in par_list]
+    assert indices == list(range(len(par_list)))
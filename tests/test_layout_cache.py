@@ -0,0 +1,60 @@
+import numpy as np
+from utils import generate_grid_tiles
+
+from ome_zarr_converters_tools._layout_cache import LayoutCache, LayoutCacheEntry
+from ome_zarr_converters_tools._stitching import standard_stitching_pipe
+from ome_zarr_converters_tools._tile import Point, Vector
+
+
+def _entry(value: float) -> LayoutCacheEntry:
+    return LayoutCacheEntry(
+        indices=np.arange(2), top_l=np.full((2, 5), value), diag=np.ones((2, 5))
+    )
+
+
+def test_layout_cache_lru(tmp_path):
+    cache = LayoutCache(maxsize=2)
+    cache.put("a", _entry(1))
+    cache.put("b", _entry(2))
+    assert cache.get("a") is not None
+    cache.put("c", _entry(3))
+    # "b" is the least recently used
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache = LayoutCache(maxsize=1, cache_dir=tmp_path / "layouts")
+    cache.put("a", _entry(1))
+    cache.put("b", _entry(2))
+    entry = cache.get("a")
+    assert entry is not None
+    assert np.array_equal(entry.top_l, _entry(1).top_l)
+
+    # A new cache (e.g. in another process) finds the persisted layouts
+    new_cache = LayoutCache(cache_dir=tmp_path / "layouts")
+    assert new_cache.get("b") is not None
+    assert new_cache.get("c") is None
+
+
+def test_stitching_pipe_with_layout_cache(tmp_path):
+    cache = LayoutCache(cache_dir=tmp_path)
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=(1, 1, 1, 11, 10), grid_size_x=3, grid_size_y=3
+    )
+    # Stage positions are decimal numbers in the microscope metadata
+    tiles = [
+        tile.move_to(Point(round(tile.top_l.x, 6), round(tile.top_l.y, 6)))
+        for tile in tiles
+    ]
+    for mode in ["auto", "grid", "free", "none"]:
+        for offset in [Vector(0, 0), Vector(1000.5, -20.25)]:
+            moved = [tile.move_by(offset) for tile in tiles]
+            expected = standard_stitching_pipe(moved, mode=mode, swap_xy=True)
+            cached = standard_stitching_pipe(
+                moved, mode=mode, swap_xy=True, layout_cache=cache
+            )
+            assert cached.to_tiles() == expected.to_tiles()
+            assert np.array_equal(cached.origin, expected.origin)
+            assert cached.data_loaders == expected.data_loaders
+
+    # The moved tiles share the layout of the original ones
+    assert len(cache) == 4
@@ -0,0 +1,47 @@
+import random
+
+from ngio import PixelSize
+
+from ome_zarr_converters_tools._spatial_index import TileGridIndex
+from ome_zarr_converters_tools._stitching import resolve_random_tiles_overlap
+from ome_zarr_converters_tools._tile import Point, Tile, Vector
+
+
+def _random_tiles(num_tiles: int, seed: int = 0) -> list[Tile]:
+    rng = random.Random(seed)
+    tiles = []
+    for _ in range(num_tiles):
+        x, y = round(rng.uniform(0, 100), 2), round(rng.uniform(0, 100), 2)
+        size = rng.choice([5.0, 10.0, 12.5])
+        tiles.append(
+            Tile(
+                top_l=Point(x, y),
+                diag=Vector(size, size, 1, 1, 1),
+                pixel_size=PixelSize(x=0.5, y=0.5, z=1),
+            )
+        )
+    return tiles
+
+
+def test_grid_index_query_is_a_superset():
+    tiles = _random_tiles(200)
+    index = TileGridIndex(tiles)
+
+    moved = tiles[0].move_by(Vector(40.0, -3.5))
+    index.update(0, moved)
+    tiles[0] = moved
+
+    for i, tile in enumerate(tiles):
+        candidates = index.query(tile)
+        assert i in candidates
+        for j, other in enumerate(tiles):
+            if tile.is_overlappingXY(other):
+                assert j in candidates
+
+
+def test_resolve_random_tiles_overlap():
+    tiles = resolve_random_tiles_overlap(_random_tiles(50))
+    assert len(tiles) == 50
+    for i, tile in enumerate(tiles):
+        for other in tiles[i + 1 :]:
+            assert not tile.is_overlappingXY(other)
@@ -1,9 +1,27 @@
 import copy
+import random
 
 import pytest
 from utils import generate_grid_tiles
 
-from ome_zarr_converters_tools._stitching import standard_stitching_pipe
+from ome_zarr_converters_tools._grid_utils import GridSetup, check_if_regular_grid
+from ome_zarr_converters_tools._stitching import (
+    _normalize_tiles,
+    invert_x_tiles,
+    invert_y_tiles,
+    remove_pixel_gaps,
+    remove_tiles_offset_xy,
+    remove_tiles_offset_zt,
+    reset_tiles_origin,
+    resolve_grid_tiles_overlap,
+    resolve_tiles_overlap,
+    sort_tiles_by_distance,
+    standard_stitching_pipe,
+    swap_xy_tiles,
+    tiles_to_pixel_space,
+)
+from ome_zarr_converters_tools._tile import Tile, Vector
+from ome_zarr_converters_tools._tile_collection import TileCollection
 
 
 @pytest.mark.parametrize("overalap", [0.1, 0.5, 0.9])
@@ -65,3 +83,216 @@ def test_xy_manipulations(invert_x, invert_y, swap_xy):
     )
     for tile in tiles_grid:
         assert tile in tiles_no_overlap
+
+
+@pytest.mark.parametrize(
+    "invert_x, invert_y, swap_xy",
+    [
+        (False, False, False),
+        (True, True, False),
+        (False, True, True),
+    ],
+)
+def test_normalize_tiles_matches_transforms(invert_x, invert_y, swap_xy):
+    tiles = generate_grid_tiles(
+        overlap=0.9,
+        tile_shape=(1, 1, 1, 11, 10),
+        invert_x=invert_x,
+        invert_y=invert_y,
+        swap_xy=swap_xy,
+    )
+    tiles = [tile.move_by(Vector(12.345, -0.1, z=1.5)) for tile in tiles[::-1]]
+
+    expected = tiles
+    if swap_xy:
+        expected = swap_xy_tiles(expected)
+    if invert_x:
+        expected = invert_x_tiles(expected)
+    if invert_y:
+        expected = invert_y_tiles(expected)
+    if any([swap_xy, invert_x, invert_y]):
+        expected = reset_tiles_origin(expected)
+    expected = sort_tiles_by_distance(expected)
+    expected = remove_tiles_offset_xy(expected)
+    expected = remove_tiles_offset_zt(expected)
+
+    normalized = _normalize_tiles(
+        TileCollection.from_tiles(tiles),
+        swap_xy=swap_xy,
+        invert_x=invert_x,
+        invert_y=invert_y,
+    )
+    assert normalized.to_tiles() == expected.to_tiles()
+    for tile, expected_tile in zip(normalized, expected, strict=True):
+        assert tile.origin == expected_tile.origin
+
+
+def test_grid_snapping_with_jitter_and_holes():
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=(1, 1, 1, 11, 10), grid_size_x=10, grid_size_y=10
+    )
+    # Small stage jitter (below the 1% tolerance) and a few missing tiles
+    tiles = [
+        tile.move_by(Vector(0.001 * (k % 3), -0.001 * (k % 2)))
+        for k, tile in enumerate(tiles)
+        if k not in (3, 42, 77)
+    ]
+    tiles_no_overlap = generate_grid_tiles(
+        overlap=1, tile_shape=(1, 1, 1, 11, 10), grid_size_x=10, grid_size_y=10
+    )
+    grid_setup = GridSetup(
+        length_x=1.0, length_y=1.1, offset_x=0.9, offset_y=0.99, num_x=10, num_y=10
+    )
+
+    tiles_grid = resolve_grid_tiles_overlap(tiles, grid_setup)
+    assert len(tiles_grid) == len(tiles)
+    assert len({(t.top_l.x, t.top_l.y) for t in tiles_grid}) == len(tiles)
+    for tile in tiles_grid:
+        assert tile in tiles_no_overlap
+
+    # Two tiles snapping to the same grid position is an error
+    with pytest.raises(ValueError):
+        resolve_grid_tiles_overlap([*tiles, tiles[0]], grid_setup)
+
+
+def test_grid_detection_with_stage_jitter():
+    tile_shape = (1, 1, 1, 2048, 2048)
+    tiles = generate_grid_tiles(
+        overlap=0.9,
+        tile_shape=tile_shape,
+        pixel_size_xy=0.325,
+        grid_size_x=5,
+        grid_size_y=4,
+    )
+    # A few hundred nanometres of stage jitter
+    rng = random.Random(0)
+    tiles = [
+        tile.move_by(Vector(rng.uniform(-0.3, 0.3), rng.uniform(-0.3, 0.3)))
+        for tile in tiles
+    ]
+    tiles_no_overlap = generate_grid_tiles(
+        overlap=1,
+        tile_shape=tile_shape,
+        pixel_size_xy=0.325,
+        grid_size_x=5,
+        grid_size_y=4,
+    )
+
+    error, grid_setup = check_if_regular_grid(
+        _normalize_tiles(TileCollection.from_tiles(tiles))
+    )
+    assert error is None
+    assert (grid_setup.num_x, grid_setup.num_y) == (5, 4)
+    assert abs(grid_setup.offset_x - 0.9 * 2048 * 0.325) < 0.3
+
+    tiles_grid = standard_stitching_pipe(tiles, mode="grid")
+    assert len(tiles_grid) == len(tiles)
+    for tile in tiles_grid:
+        assert tile.to_real_space() in tiles_no_overlap
+
+    # A jitter larger than the tolerance is not a regular grid
+    error, _ = check_if_regular_grid(
+        _normalize_tiles(
+            TileCollection.from_tiles([tiles[0].move_by(Vector(30.0, 0.0)), *tiles[1:]])
+        ),
+        tolerance_px=5,
+    )
+    assert error is not None
+
+
+@pytest.mark.parametrize("swap_xy", [False, True])
+def test_single_row_or_column_with_stage_jitter(swap_xy):
+    tile_shape = (1, 1, 1, 2048, 2048)
+    tiles = generate_grid_tiles(
+        overlap=0.9,
+        tile_shape=tile_shape,
+        pixel_size_xy=0.65,
+        grid_size_x=1,
+        grid_size_y=4,
+    )
+    # Sub-micrometre jitter on the axis with a single column
+    jitter = [0.0, 0.6, 0.3, 0.55]
+    tiles = [
+        tile.move_by(Vector(j, 0.0)) for tile, j in zip(tiles, jitter, strict=True)
+    ]
+    if swap_xy:
+        tiles = swap_xy_tiles(tiles).to_tiles()
+
+    error, grid_setup = check_if_regular_grid(
+        _normalize_tiles(TileCollection.from_tiles(tiles))
+    )
+    assert error is None
+    assert (grid_setup.num_x, grid_setup.num_y) == ((4, 1) if swap_xy else (1, 4))
+
+    for mode in ["auto", "grid"]:
+        tiles_grid = standard_stitching_pipe(tiles, mode=mode)
+        positions = sorted((tile.top_l.x, tile.top_l.y) for tile in tiles_grid)
+        expected = [(0, i * 2048) for i in range(4)]
+        if swap_xy:
+            expected = [(y, x) for x, y in expected]
+        assert positions == expected
+
+
+def test_sparse_grid_with_off_size_tiles():
+    tile_shape = (1, 1, 1, 11, 10)
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=tile_shape, grid_size_x=5, grid_size_y=4
+    )
+    # Column 2 is missing completely, and one tile is smaller than the others
+    tiles = [tile for tile in tiles if abs(tile.top_l.x - 1.8) > 1e-6]
+    small = tiles[5]
+    tiles[5] = Tile(
+        top_l=small.top_l,
+        diag=Vector(0.5, 0.5, 1, 1, 1),
+        pixel_size=small.pixel_size,
+        shape=(1, 1, 1, 5, 5),
+    )
+
+    error, grid_setup = check_if_regular_grid(
+        _normalize_tiles(TileCollection.from_tiles(tiles))
+    )
+    assert error is None
+    assert (grid_setup.num_x, grid_setup.num_y) == (5, 4)
+    assert (grid_setup.length_x, grid_setup.length_y) == (1.0, 1.1)
+
+    tiles_grid, mode = resolve_tiles_overlap(
+        _normalize_tiles(TileCollection.from_tiles(tiles)), mode="auto"
+    )
+    assert mode == "grid"
+    tiles_grid = remove_pixel_gaps(tiles_to_pixel_space(tiles_grid))
+    positions = {(tile.top_l.x, tile.top_l.y) for tile in tiles_grid}
+    assert len(positions) == len(tiles)
+    # The grid positions are multiples of the tile shape, column 2 is empty
+    assert {x for x, _ in positions} == {0, 10, 30, 40}
+    assert {y for _, y in positions} == {0, 11, 22, 33}
+    assert sorted(tile.shape[-1] for tile in tiles_grid)[0] == 5
+
+
+def test_grid_with_larger_tile_falls_back_to_free():
+    tile_shape = (1, 1, 1, 11, 10)
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=tile_shape, grid_size_x=3, grid_size_y=3
+    )
+    # A tile larger than the grid tile would overlap its neighbours on the grid
+    large = tiles[4]
+    tiles[4] = Tile(
+        top_l=large.top_l,
+        diag=Vector(1.5, 1.1, 1, 1, 1),
+        pixel_size=large.pixel_size,
+        shape=(1, 1, 1, 11, 15),
+    )
+    normalized = _normalize_tiles(TileCollection.from_tiles(tiles))
+
+    error, _ = check_if_regular_grid(normalized)
+    assert error is not None
+    assert "larger than the grid tile" in error
+
+    tiles_free, mode = resolve_tiles_overlap(normalized, mode="auto")
+    assert mode == "free"
+    assert len(tiles_free) == len(tiles)
+    for i, tile in enumerate(tiles_free):
+        for other in tiles_free[i + 1 :]:
+            assert not tile.is_overlappingXY(other)
+
+    with pytest.raises(ValueError, match="mode=free"):
+        resolve_tiles_overlap(normalized, mode="grid")
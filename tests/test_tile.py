@@ -1,7 +1,13 @@
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+
 import numpy as np
+import pytest
 from ngio import PixelSize
+from utils import DummyLoader
 
-from ome_zarr_converters_tools._tile import Point, Tile, Vector
+from ome_zarr_converters_tools._tile import Point, Tile, Vector, _find_prec, _round_ops
 
 
 def test_tile():
@@ -70,3 +76,101 @@ def test_tile():
         Point(0, 0, 0, 0, 0), Point(1, 1, 1, 1, 1), PixelSize(x=0.1, y=0.1, z=1)
     )
     assert tile3 == tile1
+
+
+def _legacy_round_ops(a, b, sign):
+    def _prec(v):
+        if isinstance(v, int):
+            return 0
+        split_v = str(v).split(".")
+        return 0 if len(split_v) == 1 else len(split_v[1])
+
+    return round(a + sign * b, max(_prec(a), _prec(b)))
+
+
+def test_round_ops_match_decimal_rounding():
+    values = [
+        0,
+        3,
+        -7,
+        0.0,
+        1.0,
+        0.1,
+        0.2,
+        0.9,
+        -0.9,
+        1.1000000000000001,
+        0.9900000000000001,
+        645.814,
+        1291.6283348666052,
+        -645.814,
+        1.195952,
+        1e-05,
+        1.5e-07,
+        123456.789012,
+        1e16,
+        2.5,
+    ]
+    for a in values:
+        for b in values:
+            for sign in (1, -1):
+                expected = _legacy_round_ops(a, b, sign)
+                result = _round_ops(a, b, sign)
+                assert result == expected, (a, b, sign)
+                assert type(result) is type(expected), (a, b, sign)
+
+    assert _find_prec(0.25) == 2
+    assert _find_prec(3.0) == 1
+    assert _find_prec(4) == 0
+
+
+def test_tile_is_immutable_and_compact():
+    tile = Tile(
+        top_l=Point(0, 0),
+        diag=Vector(10, 10, 1, 1, 1),
+        pixel_size=PixelSize(x=1.0, y=1.0, z=1.0),
+        shape=(1, 1, 1, 10, 10),
+    )
+    for obj in (tile, tile.top_l, tile.diag):
+        assert not hasattr(obj, "__dict__")
+
+    with pytest.raises(FrozenInstanceError):
+        tile.top_l.x = 1  # type: ignore[misc]
+    assert tile.bot_r == Point(10, 10, 1, 1, 1)
+    # The cached bottom-right corner can not go stale
+    with pytest.raises(FrozenInstanceError):
+        tile._top_l = Point(5, 5)
+    with pytest.raises(FrozenInstanceError):
+        del tile._diag
+
+    copied = pickle.loads(pickle.dumps(tile))
+    assert copied == tile
+    assert copied.bot_r == tile.bot_r
+    assert copy.deepcopy(tile).shape == tile.shape
+    assert Vector(1, 2) * 2 == Vector(2, 4)
+
+    # The public constructor still validates the input
+    with pytest.raises(ValueError):
+        Point(0, 0, c=1.5)  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        tile.move_by(Vector(0, 0, c=1))
+
+    moved = tile.move_by(Vector(1.5, 2.5)).to_pixel_space().reset_origin()
+    assert moved.top_l == Point(1, 2)
+    assert moved.diag == Vector(10, 10, 1, 1, 1)
+    assert moved.origin.x_micrometer_original == 1
+    assert tile.origin.x_micrometer_original == 0
+
+
+def test_tile_load_region():
+    tile = Tile(
+        top_l=Point(0, 0),
+        diag=Vector(x=1, y=1, z=4, c=2, t=1),
+        pixel_size=PixelSize(x=0.1, y=0.1, z=1),
+        shape=(1, 2, 4, 10, 10),
+        data_loader=DummyLoader(shape=(1, 2, 4, 10, 10)),
+    )
+    assert not tile.supports_region_loading
+    # Without region loading, the whole tile is loaded and sliced
+    data = tile.load_region(c=slice(1, 2), z=slice(2, None))
+    assert data.shape == (1, 1, 2, 10, 10)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from utils import generate_grid_tiles
+
+from ome_zarr_converters_tools._stitching import (
+    invert_x_tiles,
+    resolve_tiles_overlap,
+    swap_xy_tiles,
+    tiles_to_pixel_space,
+)
+from ome_zarr_converters_tools._tile import TileSpace
+from ome_zarr_converters_tools._tile_collection import TileCollection
+
+
+def test_tile_collection_round_trip():
+    tiles = generate_grid_tiles(overlap=0.9, tile_shape=(1, 1, 1, 11, 10))
+    collection = TileCollection.from_tiles(tiles)
+
+    assert len(collection) == len(tiles)
+    assert TileCollection.from_tiles(collection) is collection
+    assert collection.top_l.shape == (4, 5)
+    assert collection.diag.shape == (4, 5)
+    assert collection.origin.shape == (4, 3)
+    assert collection.pixel_size.shape == (4, 3)
+
+    for tile, tile_view in zip(tiles, collection, strict=True):
+        assert tile == tile_view
+        assert tile.origin == tile_view.origin
+        assert tile_view._data_loader is tile._data_loader
+
+    assert collection[-1] == tiles[-1]
+    assert isinstance(collection[1:], TileCollection)
+    assert collection[1:].to_tiles() == tiles[1:]
+    with pytest.raises(IndexError):
+        collection[4]
+
+
+def test_tile_collection_transforms():
+    tiles = generate_grid_tiles(overlap=0.9, tile_shape=(1, 1, 1, 11, 10))
+    collection = TileCollection.from_tiles(tiles)
+
+    swapped = swap_xy_tiles(collection)
+    assert np.array_equal(swapped.top_l[:, 0], collection.top_l[:, 1])
+    assert np.array_equal(swapped.diag[:, 1], collection.diag[:, 0])
+    # The input collection is never modified
+    assert collection.to_tiles() == tiles
+
+    inverted = invert_x_tiles(tiles)
+    assert np.array_equal(inverted.top_l[:, 0], -collection.top_l[:, 0])
+
+    pixel_tiles = tiles_to_pixel_space(collection)
+    assert pixel_tiles.space == TileSpace.PIXEL
+    for tile, tile_view in zip(tiles, pixel_tiles, strict=True):
+        assert tile.to_pixel_space() == tile_view
+        assert tile.to_pixel_space().shape == tile_view.shape
+    real_tiles = pixel_tiles.to_real_space()
+    assert real_tiles.space == TileSpace.REAL
+    for tile, tile_view in zip(tiles, real_tiles, strict=True):
+        assert tile.to_pixel_space().to_real_space() == tile_view
+
+
+@pytest.mark.parametrize("mode", ["auto", "grid", "free"])
+def test_tile_collection_index(mode):
+    tiles = generate_grid_tiles(
+        overlap=0.9, tile_shape=(1, 1, 1, 11, 10), grid_size_x=3, grid_size_y=3
+    )
+    collection = TileCollection.from_tiles(tiles[::-1])
+    assert np.array_equal(collection.tile_index, np.arange(9))
+
+    # The indices follow the tiles through take and derive
+    taken = collection.take([2, 0]).derive(top_l=np.zeros((2, 5)))
+    assert np.array_equal(taken.tile_index, [2, 0])
+    assert taken.derive(tile_index=np.array([5, 6])).tile_index.tolist() == [5, 6]
+    assert not collection.tile_index.flags.writeable
+
+    # And through the stitching transforms
+    resolved, _ = resolve_tiles_overlap(collection, mode=mode)
+    assert sorted(resolved.tile_index.tolist()) == list(range(9))
+    for i, data_loader in zip(resolved.tile_index, resolved.data_loaders, strict=True):
+        assert data_loader is collection.data_loaders[i]
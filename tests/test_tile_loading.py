@@ -0,0 +1,93 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ome_zarr_converters_tools._tile_loading import TileDataCache
+
+
+class CountingLoader:
+    """Load blocks, checking that two blocks are never loaded at the same time."""
+
+    def __init__(self, delay=0.005):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, key):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return np.full((1, 1, 1, 4, 4), key, dtype="uint8")
+
+
+@pytest.mark.parametrize("prefetch_depth", [0, 1, 3])
+@pytest.mark.parametrize("max_bytes", [0, 2**20])
+def test_tile_data_cache(prefetch_depth, max_bytes):
+    loader = CountingLoader()
+    # Each work unit needs two consecutive blocks
+    work_units = [(i, i + 1) for i in range(9)]
+    with TileDataCache(
+        loader,
+        work_units=work_units,
+        max_bytes=max_bytes,
+        prefetch_depth=prefetch_depth,
+        num_loaders=2,
+    ) as cache:
+        for index, unit in enumerate(work_units):
+            for key in unit:
+                data = cache.acquire(key)
+                assert data.shape == (1, 1, 1, 4, 4)
+                assert np.all(data == key)
+            for key in unit:
+                cache.release(key, index)
+
+    assert loader.max_active == 1
+    assert cache.stats.max_occupancy <= prefetch_depth
+    if max_bytes > 0:
+        # Each block is loaded once
+        assert cache.stats.num_loads == 10
+    else:
+        # Without memory budget, the blocks shared by two units are loaded twice
+        assert cache.stats.num_loads >= 10
+    assert "blocks loaded" in cache.stats.summary()
+
+
+def test_tile_data_cache_discard():
+    loader = CountingLoader(delay=0)
+    work_units = [(0, 1), (1,), (2,)]
+    with TileDataCache(
+        loader, work_units=work_units, max_bytes=2**20, prefetch_depth=3
+    ) as cache:
+        cache.acquire(0)
+        cache.release(0, 0)
+        # The first unit does not need the block 1 after all
+        cache.discard(1, 0)
+        cache.acquire(1)
+        cache.release(1, 1)
+        cache.acquire(2)
+        cache.release(2, 2)
+    assert cache.stats.num_loads == 3
+
+
+def test_tile_data_cache_prefetch_overlaps_loading():
+    loader = CountingLoader(delay=0.02)
+    work_units = [(i,) for i in range(8)]
+
+    with TileDataCache(
+        loader, work_units=work_units, max_bytes=0, prefetch_depth=8
+    ) as cache:
+        # Let the loaders run ahead of the writer
+        time.sleep(0.3)
+        for index, (key,) in enumerate(work_units):
+            cache.acquire(key)
+            cache.release(key, index)
+
+    assert cache.stats.num_loads == 8
+    assert cache.stats.max_occupancy == 8
+    assert cache.stats.writer_stall_time < cache.stats.load_time
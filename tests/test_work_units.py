@@ -0,0 +1,68 @@
+import pytest
+from pydantic import ValidationError
+from utils import generate_grid_tiles
+
+from ome_zarr_converters_tools._stitching import tiles_to_pixel_space
+from ome_zarr_converters_tools._task_common_models import WorkUnit
+from ome_zarr_converters_tools._work_units import (
+    claim_finalization,
+    mark_work_unit_done,
+    plan_work_units,
+    reset_work_units,
+    tiles_in_region,
+    work_unit_done,
+)
+
+
+def test_plan_work_units():
+    shape, chunks = (2, 3, 10, 64, 64), (1, 1, 4, 16, 16)
+    # One slab of z chunks is 2 * 3 * 4 * 64 * 64 bytes
+    slab = 2 * 3 * 4 * 64 * 64
+    assert plan_work_units(shape, chunks, 1, "none", slab) == [((0, 0, 0, 0, 0), shape)]
+    assert plan_work_units(shape, chunks, 1, "z", 2 * slab) == [
+        ((0, 0, 0, 0, 0), (2, 3, 8, 64, 64)),
+        ((0, 0, 8, 0, 0), (2, 3, 10, 64, 64)),
+    ]
+    # At least one chunk per work unit
+    assert len(plan_work_units(shape, chunks, 1, "channel", 1)) == 3
+    assert len(plan_work_units(shape, chunks, 1, "time", 1)) == 2
+    regions = plan_work_units(shape, chunks, 2, "xy", 2 * 3 * 10 * 32 * 64 * 2)
+    assert [(start[3], stop[3]) for start, stop in regions] == [(0, 32), (32, 64)]
+
+
+def test_tiles_in_region():
+    tiles = tiles_to_pixel_space(
+        generate_grid_tiles(
+            overlap=1.0, tile_shape=(1, 1, 1, 10, 10), grid_size_x=2, grid_size_y=2
+        )
+    )
+    # The tiles start at y = 0 and y = 10, their extent is padded by one pixel
+    assert tiles_in_region(tiles, (0, 0, 0, 0, 0), (1, 1, 1, 8, 20)) == [0, 2]
+    assert tiles_in_region(tiles, (0, 0, 0, 8, 0), (1, 1, 1, 12, 20)) == [0, 1, 2, 3]
+    assert tiles_in_region(tiles, (0, 0, 0, 12, 0), (1, 1, 1, 20, 20)) == [1, 3]
+
+
+def test_claim_finalization(tmp_path):
+    zarr_url = tmp_path / "image.zarr"
+    mark_work_unit_done(zarr_url, 1)
+    assert not claim_finalization(zarr_url, 2, index=1)
+    mark_work_unit_done(zarr_url, 0)
+    assert work_unit_done(zarr_url, 0)
+    assert claim_finalization(zarr_url, 2, index=0)
+    # A single work unit finalizes the image, again if it was interrupted
+    assert not claim_finalization(zarr_url, 2, index=1)
+    assert claim_finalization(zarr_url, 2, index=0)
+
+    reset_work_units(zarr_url)
+    assert not work_unit_done(zarr_url, 0)
+    assert not claim_finalization(zarr_url, 2, index=0)
+
+
+def test_work_unit_region():
+    work_unit = WorkUnit(
+        index=0, num_units=1, start=(0, 0, 0, 0, 0), stop=(1, 1, 1, 8, 8)
+    )
+    assert work_unit.stop == (1, 1, 1, 8, 8)
+    # The regions are (t, c, z, y, x)
+    with pytest.raises(ValidationError):
+        WorkUnit(index=0, num_units=1, start=(0, 0, 0, 0), stop=(1, 1, 8, 8))